@@ -0,0 +1,298 @@
+# coding:utf-8
+"""
+Command Line Interface
+命令行构建入口 - 无需图形界面，按构建记录重新构建MOD
+
+Usage:
+    python -m app.cli list --record FMMxMOD-Creator_build-record.jsonl
+    python -m app.cli list --record FMMxMOD-Creator_build-record.sqlite --author someone
+    python -m app.cli build --record FMMxMOD-Creator_build-record.jsonl --index 3
+    python -m app.cli build --record FMMxMOD-Creator_build-record.jsonl --all --build-type 7z
+    python -m app.cli plan --record FMMxMOD-Creator_build-record.jsonl --index 3 --files
+    python -m app.cli trace --record FMMxMOD-Creator_build-record.jsonl --all --output trace.json
+
+Exit codes: 0 success, 1 at least one build failed, 2 bad arguments or
+record file, 130 interrupted (Ctrl+C cancels the running build cleanly).
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from .common.config import cfg
+from .service.build_pipeline import BuildPipeline, validate_build_data, plan_build
+from .service.build_plan import BuildPlan
+from .service.build_progress import BuildCancelled
+from .service.build_metrics import BuildMetrics
+from .service.build_record_service import BuildRecordService
+from .service.resource_budget import ResourceBudget
+
+EXIT_OK = 0
+EXIT_BUILD_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="FMMxMOD Creator headless builder")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list the records in a build-record file")
+    list_parser.add_argument("--record", required=True, help="path to FMMxMOD-Creator_build-record.jsonl (or .sqlite, or a legacy .json array)")
+    list_parser.add_argument("--name", help="only records with this MOD name (case-insensitive)")
+    list_parser.add_argument("--author", help="only records by this author (case-insensitive)")
+    list_parser.add_argument("--category", help="only records in this category (case-insensitive)")
+
+    build_parser = commands.add_parser("build", help="rebuild MODs from a build-record file")
+    build_parser.add_argument("--record", required=True, help="path to FMMxMOD-Creator_build-record.jsonl (or .sqlite, or a legacy .json array)")
+    selection = build_parser.add_mutually_exclusive_group()
+    selection.add_argument("--index", type=int, action="append", help="record index to build (repeatable)")
+    selection.add_argument("--all", action="store_true", help="build every record in the file")
+    build_parser.add_argument("--build-type", choices=("zip", "7z", "rar"), help="override the archive format")
+    build_parser.add_argument("--output-dir", help="override the build directory")
+    build_parser.add_argument("--cache-dir", help="override the cache directory")
+    build_parser.add_argument("--split-mb", type=int,
+                              help="split .zip/.7z archives into volumes of this many MB (0: single file)")
+    build_parser.add_argument("--save-record", action="store_true",
+                              help="append a new build record like the GUI does")
+    build_parser.add_argument("--quiet", action="store_true", help="only print output paths")
+    build_parser.add_argument("--trace", help="write the stage timings of these builds as Chrome trace JSON")
+
+    plan_parser = commands.add_parser("plan", help="show what a build would produce without copying anything")
+    plan_parser.add_argument("--record", required=True, help="path to FMMxMOD-Creator_build-record.jsonl (or .sqlite, or a legacy .json array)")
+    plan_parser.add_argument("--index", type=int, help="record index to plan (default: the latest record)")
+    plan_parser.add_argument("--build-type", choices=("zip", "7z", "rar"), help="override the archive format")
+    plan_parser.add_argument("--files", action="store_true", help="list every file of the archive")
+    plan_parser.add_argument("--no-estimate", action="store_true", help="skip sampling the compressed size")
+    plan_parser.add_argument("--json", action="store_true", help="print the plan as JSON")
+
+    trace_parser = commands.add_parser("trace", help="export recorded stage timings as Chrome trace JSON")
+    trace_parser.add_argument("--record", required=True, help="path to FMMxMOD-Creator_build-record.jsonl (or .sqlite, or a legacy .json array)")
+    trace_selection = trace_parser.add_mutually_exclusive_group()
+    trace_selection.add_argument("--index", type=int, action="append", help="record index to export (repeatable)")
+    trace_selection.add_argument("--all", action="store_true", help="export every record that has timings")
+    trace_parser.add_argument("--output", required=True, help="trace file to write (open in Perfetto or chrome://tracing)")
+    return parser.parse_args(argv)
+
+
+def _load_records(record_path: str) -> Optional[List[Dict]]:
+    """读取构建记录，失败时返回None"""
+    try:
+        return BuildRecordService.load_records(record_path)
+    except (OSError, ValueError, json.JSONDecodeError, sqlite3.DatabaseError) as e:
+        print(f"error: cannot read build record {record_path}: {e}", file=sys.stderr)
+        return None
+
+
+def _list_records(records: List[Dict], args: argparse.Namespace) -> int:
+    """列出记录（可按名称、作者、分类筛选，序号仍为在整个文件中的序号）"""
+    filters = {"name": args.name, "author": args.author, "category": args.category}
+    selected = None
+    if any(value is not None for value in filters.values()):
+        if BuildRecordService.open_record_file(args.record) is not None:
+            # Journals and databases answer the filter themselves (an indexed query for SQLite)
+            selected = {record["record_id"] for record in BuildRecordService.find_records(args.record, **filters)}
+        else:
+            selected = {record.get("record_id", id(record)) for record in records
+                        if BuildRecordService.match_record(record, **filters)}
+    for index, record in enumerate(records):
+        if selected is not None and record.get("record_id", id(record)) not in selected:
+            continue
+        mod_info = record.get("mod_info", {})
+        build_time = record.get("build_info", {}).get("build_time", "")
+        print(f"{index}\t{mod_info.get('name', '')}\tv{mod_info.get('version', '')}\t{build_time}")
+    return EXIT_OK
+
+
+def _trace_label(record: Dict) -> str:
+    """Chrome trace中构建轨道的名称"""
+    mod_info = record.get("mod_info", {})
+    build_time = record.get("build_info", {}).get("build_time", "")
+    return f"{mod_info.get('name', '')} v{mod_info.get('version', '')} {build_time}".strip()
+
+
+def _export_trace(records: List[Dict], args: argparse.Namespace) -> int:
+    """导出构建记录中的阶段度量"""
+    indexes = args.index if args.index else range(len(records)) if args.all else [len(records) - 1]
+    reports = []
+    for index in indexes:
+        if not -len(records) <= index < len(records):
+            print(f"error: record index {index} out of range (0-{len(records) - 1})", file=sys.stderr)
+            return EXIT_USAGE
+        metrics = records[index].get("build_info", {}).get("metrics")
+        if metrics:
+            reports.append((_trace_label(records[index]), metrics))
+        elif not args.all:
+            print(f"error: record {index} has no stage timings", file=sys.stderr)
+            return EXIT_USAGE
+
+    if not reports:
+        print("error: no record has stage timings", file=sys.stderr)
+        return EXIT_USAGE
+    BuildMetrics.export_chrome_trace(reports, args.output)
+    print(args.output)
+    return EXIT_OK
+
+
+def _format_size(size: int) -> str:
+    """格式化字节数"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _print_plan(plan: BuildPlan, list_files: bool):
+    """打印构建计划"""
+    print(f"{plan.mod_name} v{plan.version} ({plan.build_type})")
+    for folder in plan.folders:
+        print(f"{folder.name}/\t{folder.files} files\t{_format_size(folder.bytes)}")
+        for line in folder.modinfo.strip().splitlines():
+            print(f"    {line.strip()}")
+        if list_files:
+            for entry in plan.entries:
+                if entry.arcname.startswith(f"{folder.name}/"):
+                    print(f"  {entry.arcname}\t{_format_size(entry.size)}")
+    print(f"total: {len(plan.entries)} files, {_format_size(plan.total_bytes)}")
+    if plan.estimated_size is not None:
+        print(f"estimated archive: {_format_size(plan.estimated_size)} "
+              f"(sampled {plan.sampled_files} files)")
+
+
+def _plan_record(records: List[Dict], args: argparse.Namespace) -> int:
+    """试运行：打印一条记录的构建计划"""
+    index = args.index if args.index is not None else len(records) - 1
+    if not -len(records) <= index < len(records):
+        print(f"error: record index {index} out of range (0-{len(records) - 1})", file=sys.stderr)
+        return EXIT_USAGE
+    if args.build_type:
+        cfg.override("build_type", args.build_type)
+
+    try:
+        plan = plan_build(BuildRecordService.record_to_build_data(records[index]), not args.no_estimate)
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_BUILD_FAILED
+    if args.json:
+        print(json.dumps(plan.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        _print_plan(plan, args.files)
+    return EXIT_OK
+
+
+def _run_pipeline(pipeline: BuildPipeline) -> str:
+    """在后台线程运行构建，主线程等待以便响应Ctrl+C"""
+    result = {}
+
+    def target():
+        try:
+            result["output_path"] = pipeline.run()
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, name="build-pipeline", daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        pipeline.cancel()
+        thread.join()
+        raise BuildCancelled()
+
+    if "error" in result:
+        raise result["error"]
+    return result["output_path"]
+
+
+def _build_record(record: Dict, label: str, budget: ResourceBudget, args: argparse.Namespace,
+                  traces: List) -> str:
+    """构建单条记录，返回输出路径"""
+    build_data = BuildRecordService.record_to_build_data(record)
+    error_msg = validate_build_data(build_data["mod_info"], build_data["cover_data"], build_data["sorted_blocks"])
+    if error_msg:
+        raise ValueError(error_msg)
+
+    def on_status(status: str):
+        if not args.quiet:
+            print(f"{label} {status}", file=sys.stderr)
+
+    pipeline = BuildPipeline(build_data, budget, on_status=on_status)
+    output_path = _run_pipeline(pipeline)
+    traces.append((label.rstrip(":"), pipeline.build_report["metrics"]))
+
+    if args.save_record:
+        BuildRecordService().generate_build_record(build_data, output_path, pipeline.temp_dir,
+                                                   pipeline.build_report)
+    return output_path
+
+
+def _build_records(records: List[Dict], args: argparse.Namespace) -> int:
+    """按选择构建记录"""
+    if args.all:
+        indexes = list(range(len(records)))
+    elif args.index:
+        indexes = args.index
+    elif len(records) == 1:
+        indexes = [0]
+    else:
+        print("error: the record file holds several records, pass --index N or --all", file=sys.stderr)
+        return EXIT_USAGE
+
+    for index in indexes:
+        if not -len(records) <= index < len(records):
+            print(f"error: record index {index} out of range (0-{len(records) - 1})", file=sys.stderr)
+            return EXIT_USAGE
+
+    if args.build_type:
+        cfg.override("build_type", args.build_type)
+    if args.output_dir:
+        cfg.override("build_directory", args.output_dir)
+    if args.cache_dir:
+        cfg.override("cache_directory", args.cache_dir)
+    if args.split_mb is not None:
+        cfg.override("split_volume_mb", args.split_mb)
+
+    budget = ResourceBudget(cfg.zipWorkers, int(cfg.ioBudgetMbps * 1024 * 1024))
+    exit_code = EXIT_OK
+    traces = []
+    for position, index in enumerate(indexes, start=1):
+        name = records[index].get("mod_info", {}).get("name", "")
+        label = f"[{position}/{len(indexes)}] {name}:"
+        try:
+            output_path = _build_record(records[index], label, budget, args, traces)
+        except BuildCancelled:
+            print(f"{label} cancelled", file=sys.stderr)
+            return EXIT_CANCELLED
+        except Exception as e:
+            print(f"{label} failed: {e}", file=sys.stderr)
+            exit_code = EXIT_BUILD_FAILED
+            continue
+        print(output_path)
+
+    if args.trace and traces:
+        BuildMetrics.export_chrome_trace(traces, args.trace)
+    return exit_code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行主函数"""
+    args = _parse_args(argv)
+    records = _load_records(args.record)
+    if records is None:
+        return EXIT_USAGE
+
+    if args.command == "list":
+        return _list_records(records, args)
+    if args.command == "trace":
+        return _export_trace(records, args)
+    if args.command == "plan":
+        return _plan_record(records, args)
+    return _build_records(records, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
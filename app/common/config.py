@@ -68,7 +68,24 @@ class Config(QObject):
             "build_directory": default_build_dir,
             "cache_directory": default_cache_dir,
             "cache_enabled": True,
+            "cache_max_size_gb": 20,
+            "cache_max_age_days": 30,
+            "resume_builds": True,
+            "verify_builds": True,
             "build_type": "zip",
+            "zip_workers": 0,
+            "compression_policy": {},
+            "sevenzip_preset": "normal",
+            "sevenzip_options": {},
+            "split_volume_mb": 0,
+            "image_optimize": False,
+            "image_max_size": 1920,
+            "image_format": "auto",
+            "image_quality": 85,
+            "max_concurrent_builds": 2,
+            "io_budget_mbps": 0,
+            "watch_debounce_ms": 800,
+            "record_backend": "journal",
             "edit_tips_shown": False,
             "qfluent_theme_color": "#ff10893E",
             "qfluent_theme_mode": "Dark"
@@ -114,6 +131,10 @@ class Config(QObject):
             self._save_config()
             self.configChanged.emit(key, value)
     
+    def override(self, key: str, value: Any):
+        """仅在当前进程内覆盖配置项（不写入配置文件，供命令行使用）"""
+        self._config[key] = value
+    
     def get_all(self) -> Dict[str, Any]:
         """获取所有配置"""
         return self._config.copy()
@@ -164,6 +185,30 @@ class Config(QObject):
     def cacheDirectory(self, value):
         self.set("cache_directory", value)
     
+    @property
+    def cacheMaxSizeGb(self):
+        # 0 means no size limit
+        size = self.get("cache_max_size_gb", 20)
+        if not isinstance(size, (int, float)) or size < 0:
+            return 20
+        return size
+    
+    @cacheMaxSizeGb.setter
+    def cacheMaxSizeGb(self, value):
+        self.set("cache_max_size_gb", value)
+    
+    @property
+    def cacheMaxAgeDays(self):
+        # 0 means builds are never evicted for age
+        days = self.get("cache_max_age_days", 30)
+        if not isinstance(days, (int, float)) or days < 0:
+            return 30
+        return days
+    
+    @cacheMaxAgeDays.setter
+    def cacheMaxAgeDays(self, value):
+        self.set("cache_max_age_days", value)
+    
     @property
     def cacheEnabled(self):
         return self.get("cache_enabled", True)
@@ -172,6 +217,24 @@ class Config(QObject):
     def cacheEnabled(self, value):
         self.set("cache_enabled", value)
     
+    @property
+    def verifyBuilds(self):
+        # Re-read the finished archive and write a .sha256 sidecar
+        return self.get("verify_builds", True)
+    
+    @verifyBuilds.setter
+    def verifyBuilds(self, value):
+        self.set("verify_builds", value)
+    
+    @property
+    def resumeBuilds(self):
+        # Continue an interrupted build of the same MOD instead of starting over
+        return self.get("resume_builds", True)
+    
+    @resumeBuilds.setter
+    def resumeBuilds(self, value):
+        self.set("resume_builds", value)
+    
     @property
     def buildType(self):
         return self.get("build_type", "zip")
@@ -180,6 +243,142 @@ class Config(QObject):
     def buildType(self, value):
         self.set("build_type", value)
     
+    @property
+    def zipWorkers(self):
+        workers = self.get("zip_workers", 0)
+        if not isinstance(workers, int) or workers <= 0:
+            # 0 means one compression thread per CPU core
+            return os.cpu_count() or 1
+        return workers
+    
+    @zipWorkers.setter
+    def zipWorkers(self, value):
+        self.set("zip_workers", value)
+    
+    @property
+    def maxConcurrentBuilds(self):
+        workers = self.get("max_concurrent_builds", 2)
+        if not isinstance(workers, int) or workers <= 0:
+            return 1
+        return workers
+    
+    @maxConcurrentBuilds.setter
+    def maxConcurrentBuilds(self, value):
+        self.set("max_concurrent_builds", value)
+    
+    @property
+    def ioBudgetMbps(self):
+        # Disk read budget shared by all running builds, 0 means unlimited
+        budget = self.get("io_budget_mbps", 0)
+        if not isinstance(budget, (int, float)) or budget <= 0:
+            return 0
+        return budget
+    
+    @ioBudgetMbps.setter
+    def ioBudgetMbps(self, value):
+        self.set("io_budget_mbps", value)
+    
+    @property
+    def watchDebounceMs(self):
+        # Quiet time after the last file change before watch mode rebuilds
+        delay = self.get("watch_debounce_ms", 800)
+        if not isinstance(delay, int) or delay < 100:
+            return 800
+        return delay
+    
+    @watchDebounceMs.setter
+    def watchDebounceMs(self, value):
+        self.set("watch_debounce_ms", value)
+    
+    @property
+    def recordBackend(self):
+        # Where build records are kept: "journal" (JSON lines) or "sqlite"
+        backend = self.get("record_backend", "journal")
+        return backend if backend in ("journal", "sqlite") else "journal"
+    
+    @recordBackend.setter
+    def recordBackend(self, value):
+        self.set("record_backend", value)
+    
+    @property
+    def compressionPolicy(self):
+        # Overrides merged over compression_policy.DEFAULT_POLICY_TABLE
+        policy = self.get("compression_policy", {})
+        return policy if isinstance(policy, dict) else {}
+    
+    @compressionPolicy.setter
+    def compressionPolicy(self, value):
+        self.set("compression_policy", value)
+    
+    @property
+    def sevenZipPreset(self):
+        return self.get("sevenzip_preset", "normal")
+    
+    @sevenZipPreset.setter
+    def sevenZipPreset(self, value):
+        self.set("sevenzip_preset", value)
+    
+    @property
+    def sevenZipOptions(self):
+        # Overrides merged over the preset (dict_size_mb, solid_block_mb, memory_limit_mb, level)
+        options = self.get("sevenzip_options", {})
+        return options if isinstance(options, dict) else {}
+    
+    @sevenZipOptions.setter
+    def sevenZipOptions(self, value):
+        self.set("sevenzip_options", value)
+    
+    @property
+    def splitVolumeMb(self):
+        # Volume size of split .zip/.7z archives, 0 writes a single file
+        size = self.get("split_volume_mb", 0)
+        if not isinstance(size, int) or size <= 0:
+            return 0
+        return size
+    
+    @splitVolumeMb.setter
+    def splitVolumeMb(self, value):
+        self.set("split_volume_mb", value)
+    
+    @property
+    def imageOptimize(self):
+        return self.get("image_optimize", False)
+    
+    @imageOptimize.setter
+    def imageOptimize(self, value):
+        self.set("image_optimize", value)
+    
+    @property
+    def imageMaxSize(self):
+        # Longest edge of optimized preview images, in pixels
+        size = self.get("image_max_size", 1920)
+        if not isinstance(size, int) or size <= 0:
+            return 1920
+        return size
+    
+    @imageMaxSize.setter
+    def imageMaxSize(self, value):
+        self.set("image_max_size", value)
+    
+    @property
+    def imageFormat(self):
+        return self.get("image_format", "auto")
+    
+    @imageFormat.setter
+    def imageFormat(self, value):
+        self.set("image_format", value)
+    
+    @property
+    def imageQuality(self):
+        quality = self.get("image_quality", 85)
+        if not isinstance(quality, int) or not 1 <= quality <= 100:
+            return 85
+        return quality
+    
+    @imageQuality.setter
+    def imageQuality(self, value):
+        self.set("image_quality", value)
+    
     @property
     def micaEnabled(self):
         return self.get("mica_enabled", True)
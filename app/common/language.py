@@ -177,6 +177,39 @@ class LanguageManager(QObject):
                 "choose_folder": "择取府库",
                 "build_type": "构筑类型",
                 "build_type_desc": "选择被打包的格式",
+                "sevenzip_preset": "7z压缩之法",
+                "sevenzip_preset_desc": "构筑类型为.7z时所用之压缩等级、字典与固实块大小",
+                "split_volume": "分卷大小",
+                "split_volume_desc": "构筑.zip或.7z时边写边分为定长之卷（name.zip.001、.002……），以7-Zip开首卷即可",
+                "split_volume_off": "不分卷",
+                "image_optimize": "图片精炼",
+                "image_optimize_desc": "构筑时缩放封面、警示与预览之图，重新编码并去其元数据；所得存于缓存，再筑不复重做",
+                "image_max_size": "图片最大边长",
+                "image_max_size_desc": "预览之图长边逾此则按比例缩小",
+                "image_format": "图片格式",
+                "image_format_desc": "自动：透明之图用PNG，余者用JPEG",
+                "record_backend": "记录存储",
+                "record_backend_desc": "构筑记录存于JSON Lines日志或SQLite库，切换之时迁移旧有记录",
+                "record_backend_failed": "迁移构筑记录失败：{error}",
+                "cache_enabled": "存留构筑缓存",
+                "cache_enabled_desc": "启之则誊录文件于缓存府库；闭之则源文径入压缩之包",
+                "cache_usage": "缓存所占",
+                "cache_usage_calculating": "正核算缓存之大小……",
+                "cache_usage_desc": "已占 {size}，上限 {limit}；{pinned} 份最新构筑固存不删",
+                "clean_cache": "清理缓存",
+                "cache_max_size": "缓存上限",
+                "cache_max_size_desc": "逾此则先删最久未用之构筑缓存；各MOD最新一次构筑恒存",
+                "cache_max_age": "缓存存期",
+                "cache_max_age_desc": "久未使用逾此天数之构筑缓存，构筑后自行删除",
+                "unlimited": "不限",
+                "days_count": "{days} 天",
+                "cache_cleaned": "缓存已清",
+                "cache_cleaned_content": "删去 {count} 项，腾出 {size}",
+                "transfer_progress_tip": "已处理 {done} / {total} MB · {speed} MB/s · 约余 {eta} 秒\n{file}",
+                "resume_builds": "中断续建",
+                "resume_builds_desc": "构筑中途辍止，再筑同一MOD时承其已暂存、已压缩之文件，不复从头",
+                "verify_builds": "构筑校验",
+                "verify_builds_desc": "构筑既成，复读压缩之包核对各文件之CRC，并生成.sha256校验文件",
                 "theme_setting": "主题设置",
                 "theme_mode": "玄明流转",
                 "theme_mode_desc": "调整应用程序的外观",
@@ -248,12 +281,21 @@ class LanguageManager(QObject):
                 "build_zip": "构筑MOD",
                 "start_build": "开始构筑",
                 "clear_all_area": "区块净除",
+                "cancel_build": "中止构筑",
+                "start_watch": "监视重构",
+                "stop_watch": "停止监视",
+                "watch_status_watching": "监视中 · {count} 处路径",
+                "watch_status_rebuilding": "{modules} 个区块有变，增量重构中……",
+                "watch_status_rebuilt": "{modules} 个区块已重构 · 耗时 {seconds} 秒 · 监视中 {count} 处路径",
+                "watch_status_failed": "重构未竟：{error}",
                 
                 # 构建相关
                 "build_success_title": "幸甚至哉",
                 "build_success_content": "MOD 已然告成构筑，输出于",
                 "build_failed_title": "悲夫哀哉",
                 "build_failed_content": "MOD 构筑之际，舛误乍现",
+                "build_cancelled_title": "构筑已止",
+                "build_cancelled_content": "构筑已中止，未成之压缩包已除，再筑可承续暂存之文件",
                 "build_success": "幸甚至哉",
                 "build_failed": "悲夫哀哉",
                 "mod_name_required": "MOD名称 不可阙如",
@@ -268,7 +310,12 @@ class LanguageManager(QObject):
                 "creating_cover_folder": "正建封面之府库",
                 "creating_block_folders": "正建区块之府库",
                 "creating_archive_file": "正造压缩之文件",
+                "optimizing_images": "正精炼图片",
+                "verifying_archive": "正校验压缩之包",
+                "archive_verify_failed": "压缩之包校验未过，已删之",
                 "moving_to_output": "正徙于输出之府库",
+                "cancelling_build": "正中止构筑",
+                "build_cancelled": "构筑已止",
                 "build_completed": "构筑完成，幸甚至哉",
                 "cover_data_missing": "封面之数据阙如"
             },
@@ -431,6 +478,39 @@ class LanguageManager(QObject):
                 "choose_folder": "Select folder",
                 "build_type": "Build Type",
                 "build_type_desc": "Select the packaging format",
+                "sevenzip_preset": "7z Compression Preset",
+                "sevenzip_preset_desc": "Compression level, dictionary size and solid block size used for .7z builds",
+                "split_volume": "Split Volume Size",
+                "split_volume_desc": ".zip and .7z builds are written as volumes of this size (name.zip.001, .002, ...), open the first one with 7-Zip",
+                "split_volume_off": "Off",
+                "image_optimize": "Optimize Images",
+                "image_optimize_desc": "Resize, re-encode and strip metadata from cover, warning and screenshot images when building; results are cached for rebuilds",
+                "image_max_size": "Maximum Image Size",
+                "image_max_size_desc": "Preview images whose longest edge exceeds this are scaled down",
+                "image_format": "Image Format",
+                "image_format_desc": "Auto: PNG for images with transparency, JPEG for the rest",
+                "record_backend": "Record Storage",
+                "record_backend_desc": "Keep build records in a JSON Lines journal or an SQLite database; switching migrates existing records",
+                "record_backend_failed": "Failed to migrate build records: {error}",
+                "cache_enabled": "Keep build cache",
+                "cache_enabled_desc": "When off, source files are streamed straight into the archive without a copy in the cache folder",
+                "cache_usage": "Cache Usage",
+                "cache_usage_calculating": "Calculating cache size...",
+                "cache_usage_desc": "{size} used of {limit}; {pinned} latest builds are pinned",
+                "clean_cache": "Clean cache",
+                "cache_max_size": "Cache Size Limit",
+                "cache_max_size_desc": "Least recently used builds are removed first when the cache grows past this; the latest build of each MOD is kept",
+                "cache_max_age": "Cache Retention",
+                "cache_max_age_desc": "Build caches unused for longer than this are removed after a build",
+                "unlimited": "Unlimited",
+                "days_count": "{days} days",
+                "cache_cleaned": "Cache cleaned",
+                "cache_cleaned_content": "Removed {count} items, freed {size}",
+                "transfer_progress_tip": "{done} / {total} MB · {speed} MB/s · about {eta}s left\n{file}",
+                "resume_builds": "Resume interrupted builds",
+                "resume_builds_desc": "Rebuilding a MOD after an interrupted build reuses the files that were already staged or compressed",
+                "verify_builds": "Verify Builds",
+                "verify_builds_desc": "Re-read the finished archive to check every entry's CRC, and write a .sha256 checksum file next to it",
                 "theme_setting": "Theme Settings",
                 "theme_mode": "Theme Mode",
                 "theme_mode_desc": "Change the application theme",
@@ -492,12 +572,21 @@ class LanguageManager(QObject):
                 "build_zip": "Build ZIP",
                 "start_build": "Start build",
                 "clear_all_area": "Clear all Area",
+                "cancel_build": "Cancel build",
+                "start_watch": "Watch & rebuild",
+                "stop_watch": "Stop watching",
+                "watch_status_watching": "Watching · {count} paths",
+                "watch_status_rebuilding": "{modules} block(s) changed, rebuilding...",
+                "watch_status_rebuilt": "Rebuilt {modules} block(s) in {seconds}s · watching {count} paths",
+                "watch_status_failed": "Rebuild failed: {error}",
                 
                 # Build related
                 "build_success_title": "Build Success",
                 "build_success_content": "MOD has been successfully built, output path",
                 "build_failed_title": "Build Failed",
                 "build_failed_content": "An error occurred during MOD building",
+                "build_cancelled_title": "Build cancelled",
+                "build_cancelled_content": "The build was cancelled and the partial archive removed; staged files are kept for the next build",
                 "build_success": "Build Successful",
                 "build_failed": "Build Failed",
                 "mod_name_required": "MOD name cannot be empty",
@@ -512,7 +601,12 @@ class LanguageManager(QObject):
                 "creating_cover_folder": "Creating cover folder",
                 "creating_block_folders": "Creating block folders",
                 "creating_archive_file": "Creating archive file",
+                "optimizing_images": "Optimizing images",
+                "verifying_archive": "Verifying archive",
+                "archive_verify_failed": "Archive verification failed, the archive was removed",
                 "moving_to_output": "Moving to output directory",
+                "cancelling_build": "Cancelling build",
+                "build_cancelled": "Build cancelled",
                 "build_completed": "Build completed",
                 "cover_data_missing": "Cover data missing"
             },
@@ -675,6 +769,39 @@ class LanguageManager(QObject):
                 "choose_folder": "フォルダを選択",
                 "build_type": "ビルドタイプ",
                 "build_type_desc": "パッケージ形式を選択",
+                "sevenzip_preset": "7z圧縮プリセット",
+                "sevenzip_preset_desc": ".7zビルドで使用する圧縮レベル、辞書サイズ、ソリッドブロックサイズ",
+                "split_volume": "分割ボリュームサイズ",
+                "split_volume_desc": ".zip と .7z のビルドをこのサイズのボリューム（name.zip.001、.002…）に分割して書き込みます。7-Zip で最初のボリュームを開いてください",
+                "split_volume_off": "分割しない",
+                "image_optimize": "画像の最適化",
+                "image_optimize_desc": "ビルド時にカバー・警告・スクリーンショット画像を縮小・再エンコードし、メタデータを削除します（結果は再ビルド用にキャッシュされます）",
+                "image_max_size": "画像の最大サイズ",
+                "image_max_size_desc": "長辺がこの値を超えるプレビュー画像は縮小されます",
+                "image_format": "画像形式",
+                "image_format_desc": "自動：透過画像はPNG、それ以外はJPEG",
+                "record_backend": "記録の保存先",
+                "record_backend_desc": "ビルド記録をJSON LinesジャーナルまたはSQLiteデータベースに保存します。切り替え時に既存の記録を移行します",
+                "record_backend_failed": "ビルド記録の移行に失敗しました：{error}",
+                "cache_enabled": "ビルドキャッシュを保持",
+                "cache_enabled_desc": "オフにすると、キャッシュフォルダにコピーせずソースファイルを直接アーカイブへ書き込みます",
+                "cache_usage": "キャッシュ使用量",
+                "cache_usage_calculating": "キャッシュサイズを計算中...",
+                "cache_usage_desc": "{size} 使用中（上限 {limit}）、最新ビルド {pinned} 件は固定",
+                "clean_cache": "キャッシュを削除",
+                "cache_max_size": "キャッシュ上限",
+                "cache_max_size_desc": "超過すると最も長く使われていないビルドから削除します（各MODの最新ビルドは保持）",
+                "cache_max_age": "キャッシュ保持期間",
+                "cache_max_age_desc": "この日数以上使われていないビルドキャッシュはビルド後に削除されます",
+                "unlimited": "無制限",
+                "days_count": "{days} 日",
+                "cache_cleaned": "キャッシュを削除しました",
+                "cache_cleaned_content": "{count} 件を削除し、{size} を解放しました",
+                "transfer_progress_tip": "{done} / {total} MB · {speed} MB/s · 残り約 {eta} 秒\n{file}",
+                "resume_builds": "中断したビルドを再開",
+                "resume_builds_desc": "中断後に同じMODを再ビルドすると、ステージ済み・圧縮済みのファイルを再利用します",
+                "verify_builds": "ビルドの検証",
+                "verify_builds_desc": "完成したアーカイブを読み直して各エントリのCRCを確認し、.sha256チェックサムファイルを出力します",
                 "theme_setting": "テーマ設定",
                 "theme_mode": "テーマモード",
                 "theme_mode_desc": "アプリケーション外観を調整",
@@ -740,6 +867,13 @@ class LanguageManager(QObject):
                 "build_zip": "ZIPビルド",
                 "start_build": "ビルド開始",
                 "clear_all_area": "全領域削除",
+                "cancel_build": "ビルドを中止",
+                "start_watch": "監視して再ビルド",
+                "stop_watch": "監視を停止",
+                "watch_status_watching": "監視中 · {count} 件のパス",
+                "watch_status_rebuilding": "{modules} 個のブロックが変更されました。差分ビルド中...",
+                "watch_status_rebuilt": "{modules} 個のブロックを再ビルド · {seconds} 秒 · {count} 件のパスを監視中",
+                "watch_status_failed": "再ビルドに失敗しました: {error}",
 
                 # ビルド関連
                 "build_success": "ビルド成功",
@@ -756,7 +890,14 @@ class LanguageManager(QObject):
                 "creating_cover_folder": "カバーフォルダを作成中",
                 "creating_block_folders": "ブロックフォルダを作成中",
                 "creating_archive_file": "アーカイブファイルを作成中",
+                "optimizing_images": "画像を最適化中",
+                "verifying_archive": "アーカイブを検証中",
+                "archive_verify_failed": "アーカイブの検証に失敗したため削除しました",
                 "moving_to_output": "出力ディレクトリに移動中",
+                "cancelling_build": "ビルドを中止しています",
+                "build_cancelled": "ビルド中止",
+                "build_cancelled_title": "ビルド中止",
+                "build_cancelled_content": "ビルドを中止し、未完成のアーカイブを削除しました。ステージ済みファイルは次回のビルドで再利用されます",
                 "build_completed": "ビルド完了",
                 "cover_data_missing": "カバーデータが不足しています"
             },
@@ -919,6 +1060,39 @@ class LanguageManager(QObject):
                 "choose_folder": "폴더 선택",
                 "build_type": "빌드 타입",
                 "build_type_desc": "패키지 형식을 선택",
+                "sevenzip_preset": "7z 압축 프리셋",
+                "sevenzip_preset_desc": ".7z 빌드에 사용할 압축 수준, 사전 크기 및 솔리드 블록 크기",
+                "split_volume": "분할 볼륨 크기",
+                "split_volume_desc": ".zip 및 .7z 빌드를 이 크기의 볼륨(name.zip.001, .002...)으로 나누어 씁니다. 7-Zip으로 첫 번째 볼륨을 여세요",
+                "split_volume_off": "분할 안 함",
+                "image_optimize": "이미지 최적화",
+                "image_optimize_desc": "빌드 시 커버, 경고, 스크린샷 이미지를 축소·재인코딩하고 메타데이터를 제거합니다 (결과는 재빌드를 위해 캐시됨)",
+                "image_max_size": "최대 이미지 크기",
+                "image_max_size_desc": "긴 변이 이 값을 넘는 미리보기 이미지는 축소됩니다",
+                "image_format": "이미지 형식",
+                "image_format_desc": "자동: 투명 이미지는 PNG, 나머지는 JPEG",
+                "record_backend": "기록 저장소",
+                "record_backend_desc": "빌드 기록을 JSON Lines 저널 또는 SQLite 데이터베이스에 저장합니다. 전환 시 기존 기록을 옮깁니다",
+                "record_backend_failed": "빌드 기록 이전 실패: {error}",
+                "cache_enabled": "빌드 캐시 유지",
+                "cache_enabled_desc": "끄면 캐시 폴더에 복사하지 않고 원본 파일을 아카이브에 직접 기록합니다",
+                "cache_usage": "캐시 사용량",
+                "cache_usage_calculating": "캐시 크기 계산 중...",
+                "cache_usage_desc": "{size} 사용 중 (한도 {limit}), 최신 빌드 {pinned}개 고정",
+                "clean_cache": "캐시 정리",
+                "cache_max_size": "캐시 크기 한도",
+                "cache_max_size_desc": "한도를 넘으면 가장 오래 사용하지 않은 빌드부터 삭제합니다 (각 MOD의 최신 빌드는 유지)",
+                "cache_max_age": "캐시 보존 기간",
+                "cache_max_age_desc": "이 기간 이상 사용하지 않은 빌드 캐시는 빌드 후 삭제됩니다",
+                "unlimited": "무제한",
+                "days_count": "{days}일",
+                "cache_cleaned": "캐시 정리 완료",
+                "cache_cleaned_content": "{count}개 항목을 삭제하여 {size}를 확보했습니다",
+                "transfer_progress_tip": "{done} / {total} MB · {speed} MB/s · 약 {eta}초 남음\n{file}",
+                "resume_builds": "중단된 빌드 이어서 하기",
+                "resume_builds_desc": "중단된 후 같은 MOD를 다시 빌드하면 이미 준비되었거나 압축된 파일을 재사용합니다",
+                "verify_builds": "빌드 검증",
+                "verify_builds_desc": "완성된 아카이브를 다시 읽어 각 항목의 CRC를 확인하고 .sha256 체크섬 파일을 생성합니다",
                 "theme_setting": "테마 설정",
                 "theme_mode": "테마 모드",
                 "theme_mode_desc": "애플리케이션 외관을 조정",
@@ -984,6 +1158,13 @@ class LanguageManager(QObject):
                 "build_zip": "ZIP 빌드",
                 "start_build": "빌드 시작",
                 "clear_all_area": "모든 영역 지우기",
+                "cancel_build": "빌드 취소",
+                "start_watch": "감시 후 재빌드",
+                "stop_watch": "감시 중지",
+                "watch_status_watching": "감시 중 · 경로 {count}개",
+                "watch_status_rebuilding": "블록 {modules}개 변경됨, 증분 빌드 중...",
+                "watch_status_rebuilt": "블록 {modules}개 재빌드 · {seconds}초 · 경로 {count}개 감시 중",
+                "watch_status_failed": "재빌드 실패: {error}",
 
                 # 构建相关
                 "build_success": "빌드 성공",
@@ -1000,7 +1181,14 @@ class LanguageManager(QObject):
                 "creating_cover_folder": "커버 폴더 생성 중",
                 "creating_block_folders": "블록 폴더 생성 중",
                 "creating_archive_file": "아카이브 파일 생성 중",
+                "optimizing_images": "이미지 최적화 중",
+                "verifying_archive": "아카이브 검증 중",
+                "archive_verify_failed": "아카이브 검증에 실패하여 삭제했습니다",
                 "moving_to_output": "출력 디렉토리로 이동 중",
+                "cancelling_build": "빌드 취소 중",
+                "build_cancelled": "빌드 취소됨",
+                "build_cancelled_title": "빌드 취소됨",
+                "build_cancelled_content": "빌드를 취소하고 미완성 압축 파일을 삭제했습니다. 준비된 파일은 다음 빌드에서 재사용됩니다",
                 "build_completed": "빌드 완료",
                 "cover_data_missing": "커버 데이터가 누락되었습니다"
             }
@@ -189,6 +189,7 @@ class FileItemWidget(QWidget):
 
 class FileDisplayWidget(QWidget):
     """文件展示组件"""
+    filesChanged = Signal()     # Files or folders added or removed
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -225,6 +226,7 @@ class FileDisplayWidget(QWidget):
             if file_path not in [item.getFilePath() for item in self.file_items]:
                 self._addFileItem(file_path)
         self._updatePlaceholderVisibility()
+        self.filesChanged.emit()
     
     def addFolders(self, folder_paths):
         """添加文件夹"""
@@ -232,6 +234,7 @@ class FileDisplayWidget(QWidget):
             if folder_path not in [item.getFilePath() for item in self.file_items]:
                 self._addFileItem(folder_path)
         self._updatePlaceholderVisibility()
+        self.filesChanged.emit()
     
     def _addFileItem(self, file_path):
         """添加文件项"""
@@ -268,6 +271,7 @@ class FileDisplayWidget(QWidget):
             self.mainLayout.removeWidget(file_item)
             file_item.deleteLater()
             self._updatePlaceholderVisibility()
+            self.filesChanged.emit()
     
     def _renameFileItem(self, file_item, new_name):
         """重命名文件项"""
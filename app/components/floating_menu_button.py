@@ -16,12 +16,15 @@ class FloatingMenuButton(QWidget):
     """浮层菜单按钮"""
     startBuildRequested = Signal()      # Start building signals
     clearAllAreaRequested = Signal()    # Clear all block signals
+    cancelBuildRequested = Signal()     # Cancel running build signals
+    watchModeToggled = Signal(bool)     # Watch mode switched on or off
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_widget = parent
         self.progressBar = None
         self.is_building = False
+        self.is_watching = False
         self._initUI()
         self._connectSignals()
         self._updatePosition()
@@ -68,14 +71,23 @@ class FloatingMenuButton(QWidget):
         button_width = self.buildButton.width()
         menu_width = button_width - 10
         menu.setFixedWidth(menu_width)
-        start_build_action = Action(FIF.ZIP_FOLDER, lang.get_text("start_build"))
-        menu.addAction(start_build_action)
+        if self.is_building:
+            cancel_build_action = Action(FIF.CLOSE, lang.get_text("cancel_build"))
+            menu.addAction(cancel_build_action)
+            cancel_build_action.triggered.connect(self.cancelBuildRequested.emit)
+        else:
+            start_build_action = Action(FIF.ZIP_FOLDER, lang.get_text("start_build"))
+            menu.addAction(start_build_action)
+            start_build_action.triggered.connect(self._onStartBuildClicked)
+        watch_action = Action(FIF.VIEW if not self.is_watching else FIF.PAUSE,
+                              lang.get_text("stop_watch" if self.is_watching else "start_watch"))
+        menu.addAction(watch_action)
+        watch_action.triggered.connect(self._onWatchClicked)
         menu.addSeparator()
         clear_all_action = Action(FIF.BROOM, lang.get_text("clear_all_area"))
         menu.addAction(clear_all_action)
         
         # Connect menu item signal
-        start_build_action.triggered.connect(self._onStartBuildClicked)
         clear_all_action.triggered.connect(self.clearAllAreaRequested.emit)
         
         # Get the global position and size of the button
@@ -128,12 +140,23 @@ class FloatingMenuButton(QWidget):
         # Show build progress bar
         self._startProgressBar()
     
+    def _onWatchClicked(self):
+        """监视重构菜单项点击处理"""
+        self.is_watching = not self.is_watching
+        self.watchModeToggled.emit(self.is_watching)
+    
+    def startProgress(self):
+        """显示构建进度条（由监视模式自动开始的构建）"""
+        self._startProgressBar()
+    
     def connectBuildService(self, build_service):
         """连接构建服务"""
         build_service.buildStarted.connect(self._onBuildStarted)
         build_service.progressChanged.connect(self._onProgressChanged)
+        build_service.transferProgressChanged.connect(self._onTransferProgressChanged)
         build_service.buildCompleted.connect(self._onBuildCompleted)
         build_service.buildFailed.connect(self._onBuildFailed)
+        build_service.buildCancelled.connect(self._onBuildCancelled)
     
     def _onBuildStarted(self):
         """构建开始处理"""
@@ -144,6 +167,19 @@ class FloatingMenuButton(QWidget):
         if self.progressBar is not None:
             self.progressBar.setValue(progress)
     
+    def _onTransferProgressChanged(self, snapshot: dict):
+        """字节进度变化处理，在进度条提示中显示吞吐量与剩余时间"""
+        if self.progressBar is None:
+            return
+        eta = snapshot["eta_seconds"]
+        self.progressBar.setToolTip(lang.get_text("transfer_progress_tip").format(
+            done=f"{snapshot['bytes_done'] / (1024 * 1024):.1f}",
+            total=f"{snapshot['bytes_total'] / (1024 * 1024):.1f}",
+            speed=snapshot["speed_mbps"],
+            eta=int(eta) if eta >= 0 else "--",
+            file=snapshot["current_file"]
+        ))
+    
     def _onBuildCompleted(self, output_path: str):
         """构建完成处理"""
         self._finishProgress()
@@ -152,6 +188,10 @@ class FloatingMenuButton(QWidget):
         """构建失败处理"""
         self._finishProgress()
     
+    def _onBuildCancelled(self):
+        """构建取消处理"""
+        self._finishProgress()
+    
     def _startProgressBar(self):
         """开始显示进度条"""
         if self.progressBar is not None:
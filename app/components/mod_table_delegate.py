@@ -0,0 +1,110 @@
+# coding:utf-8
+"""
+MOD Table Delegate
+MOD表格委托 - 按需绘制封面与操作按钮，代替每行的单元格控件
+"""
+from PySide6.QtCore import Qt, Signal, QEvent, QModelIndex, QPoint, QRect, QRectF
+from PySide6.QtGui import QPainter, QColor
+from PySide6.QtWidgets import QStyle
+from qfluentwidgets import TableItemDelegate, FluentIcon as FIF, Theme, ThemeColor, themeColor, isDarkTheme
+from ..common.language import lang
+from ..service.thumbnail_service import thumbnailService, THUMBNAIL_HEIGHT
+from .mod_table_model import COVER_COLUMN, OPERATIONS_COLUMN
+
+BUTTON_WIDTH = 64
+BUTTON_HEIGHT = 32
+
+
+class ModTableDelegate(TableItemDelegate):
+    """MOD表格委托
+
+    Paints the cover thumbnail and the operations drop-down button of the
+    rows the view actually shows, so no widget exists per row. Covers come
+    from the thumbnail service; until one arrives a placeholder is painted
+    and the viewport repaints when it is ready. A click on the painted
+    button emits `operationsRequested` and the table opens the menu there.
+    """
+    operationsRequested = Signal(QModelIndex, QPoint)   # index, global position below the button
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        thumbnailService.thumbnailReady.connect(self._onThumbnailReady)
+
+    def clearCoverCache(self):
+        """重试加载失败的封面并重新加载文件已变化的封面（记录整体变化后调用）"""
+        thumbnailService.refresh()
+
+    def paint(self, painter: QPainter, option, index: QModelIndex):
+        super().paint(painter, option, index)
+        if index.column() == COVER_COLUMN:
+            self._drawCover(painter, option, index)
+        elif index.column() == OPERATIONS_COLUMN:
+            self._drawOperationsButton(painter, option)
+
+    def editorEvent(self, event, model, option, index: QModelIndex) -> bool:
+        if (index.column() == OPERATIONS_COLUMN and event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            rect = self._buttonRect(option.rect)
+            if rect.contains(event.position().toPoint()):
+                view = self.parent()
+                self.operationsRequested.emit(index, view.viewport().mapToGlobal(rect.bottomLeft()))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def _drawCover(self, painter: QPainter, option, index: QModelIndex):
+        """绘制封面缩略图（加载中绘制占位框，不存在或无法解码时绘制提示文本）"""
+        record = index.data(Qt.ItemDataRole.UserRole) or {}
+        image_path = record.get("cover_block", {}).get("image_path", "")
+        pixmap = thumbnailService.thumbnail(image_path) if image_path else None
+        error = thumbnailService.error(image_path) if image_path else "missing"
+
+        painter.save()
+        painter.setClipRect(option.rect)
+        if pixmap is not None:
+            size = pixmap.deviceIndependentSize()
+            x = option.rect.x() + (option.rect.width() - size.width()) / 2
+            y = option.rect.y() + (option.rect.height() - size.height()) / 2
+            painter.drawPixmap(QRectF(x, y, size.width(), size.height()), pixmap, QRectF(pixmap.rect()))
+        elif error:
+            text = lang.get_text("image_load_failed" if error == "failed" else "no_cover")
+            painter.setPen(option.palette.text().color())
+            painter.setFont(option.font)
+            painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, text)
+        else:
+            # Placeholder while the thumbnail is decoded
+            c = 255 if isDarkTheme() else 0
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(c, c, c, 15))
+            rect = QRectF(0, 0, THUMBNAIL_HEIGHT, THUMBNAIL_HEIGHT)
+            rect.moveCenter(QRectF(option.rect).center())
+            painter.drawRoundedRect(rect, 8, 8)
+        painter.restore()
+
+    def _onThumbnailReady(self, image_path: str):
+        """缩略图加载完成：重绘可见区域（只有可见行会被绘制）"""
+        self.parent().viewport().update()
+
+    def _buttonRect(self, cell: QRect) -> QRect:
+        """操作按钮在单元格中的位置"""
+        return QRect(cell.x() + (cell.width() - BUTTON_WIDTH) // 2, cell.y() + (cell.height() - BUTTON_HEIGHT) // 2,
+                     BUTTON_WIDTH, BUTTON_HEIGHT)
+
+    def _drawOperationsButton(self, painter: QPainter, option):
+        """按PrimaryDropDownToolButton的样式绘制操作按钮"""
+        rect = self._buttonRect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        if hovered:
+            color = ThemeColor.DARK_1.color() if isDarkTheme() else ThemeColor.LIGHT_1.color()
+        else:
+            color = themeColor()
+        iconTheme = Theme.LIGHT if isDarkTheme() else Theme.DARK    # Dark text on a dark-mode primary button
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(QRectF(rect), 5, 5)
+        FIF.EDIT.render(painter, QRectF(rect.x() + (rect.width() - 22 - 16) / 2 + 4, rect.center().y() - 7.5, 16, 16), iconTheme)
+        FIF.ARROW_DOWN.render(painter, QRectF(rect.right() - 22, rect.center().y() - 4.5, 10, 10), iconTheme)
+        painter.restore()
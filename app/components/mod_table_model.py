@@ -0,0 +1,144 @@
+# coding:utf-8
+"""
+MOD Table Model
+MOD表格模型 - 记录仓库之上的表格模型，视图只向它请求可见行的数据
+"""
+from datetime import datetime
+from typing import Optional
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from ..common.language import lang
+
+COVER_COLUMN = 4
+OPERATIONS_COLUMN = 7
+HEADER_KEYS = [
+    "serial_number", "mod_name", "author", "category",
+    "cover_image", "version", "create_date", "operations"
+]
+EDITABLE_COLUMNS = {1: "name", 2: "author", 3: "category", 5: "version"}   # column -> mod_info key
+
+
+class ModTableModel(QAbstractTableModel):
+    """MOD表格模型
+
+    Rows are the records of a RecordRepository in list order; nothing is
+    copied or pre-rendered, `data()` formats a cell when the view paints it.
+    The repository's row signals become row insertions, removals and
+    `dataChanged`, so a view only repaints what changed. Edits are written
+    back through the repository, which then reports the updated row.
+    """
+    def __init__(self, repository, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+        self.edit_mode = False
+        repository.recordsReset.connect(self.reset)
+        repository.recordAdded.connect(self._onRecordAdded)
+        repository.recordRemoved.connect(self._onRecordRemoved)
+        repository.recordUpdated.connect(self._onRecordUpdated)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.repository.count()
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADER_KEYS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.repository.record(index.row())
+        if record is None:
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self._cellText(index.row(), index.column(), record)
+        if role == Qt.ItemDataRole.UserRole:
+            return record
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() != 1:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return lang.get_text(HEADER_KEYS[section])
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        flags = super().flags(index)
+        if self.edit_mode and index.column() in EDITABLE_COLUMNS:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        if role != Qt.ItemDataRole.EditRole or index.column() not in EDITABLE_COLUMNS:
+            return False
+        record = self.repository.record(index.row())
+        if record is None:
+            return False
+
+        # Work on a copy, the repository keeps the old record if saving fails
+        mod_info = dict(record.get("mod_info", {}))
+        mod_info[EDITABLE_COLUMNS[index.column()]] = str(value)
+        if mod_info == record.get("mod_info"):
+            return True
+
+        # One appended line or one updated row, never a rewrite; the view hears back through recordUpdated
+        return self.repository.update({**record, "mod_info": mod_info})
+
+    def setEditMode(self, enabled: bool):
+        """设置编辑模式（只影响可编辑标志，不重建任何行）"""
+        self.edit_mode = enabled
+
+    def reset(self):
+        """仓库整体变化后重置模型"""
+        self.beginResetModel()
+        self.endResetModel()
+
+    def retranslate(self):
+        """语言切换后刷新表头与文本"""
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(HEADER_KEYS) - 1)
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, len(HEADER_KEYS) - 1))
+
+    def _cellText(self, row: int, column: int, record: dict) -> Optional[str]:
+        """单元格显示的文本"""
+        mod_info = record.get("mod_info", {})
+        if column == 0:
+            return str(row + 1)
+        if column == 5:
+            version_text = mod_info.get("version", "")
+            if version_text and (".jpg" in version_text.lower() or ".png" in version_text.lower() or ".gif" in version_text.lower()):
+                from ..common import version_info
+                version_text = version_info.VERSION_STRING
+            return version_text
+        if column == 6:
+            build_time = record.get("build_info", {}).get("build_time", "")
+            if not build_time:
+                return ""
+            try:
+                return datetime.fromisoformat(build_time.replace('Z', '+00:00')).strftime("%Y-%m-%d %H:%M")
+            except ValueError:
+                return build_time
+        if column in EDITABLE_COLUMNS:
+            return mod_info.get(EDITABLE_COLUMNS[column], "")
+        return None     # Cover and operations are painted by the delegate
+
+    def _onRecordAdded(self, row: int, record: dict):
+        """仓库新增记录"""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.endInsertRows()
+        self._renumberFrom(row + 1)
+
+    def _onRecordRemoved(self, row: int, record_id: str):
+        """仓库删除记录"""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.endRemoveRows()
+        self._renumberFrom(row)
+
+    def _onRecordUpdated(self, row: int, record: dict):
+        """仓库更新记录"""
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADER_KEYS) - 1))
+
+    def _renumberFrom(self, row: int):
+        """序号列从row行开始变化"""
+        last = self.rowCount() - 1
+        if row <= last:
+            self.dataChanged.emit(self.index(row, 0), self.index(last, 0), [Qt.ItemDataRole.DisplayRole])
@@ -0,0 +1,239 @@
+# coding:utf-8
+"""
+Archive Verifier
+压缩包校验模块 - 重新读取输出的压缩包，核对每个条目的CRC并生成校验文件
+"""
+import io
+import os
+import lzma
+import time
+import zlib
+import zipfile
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import py7zr
+import py7zr.exceptions
+from .entry_stream import CHUNK_SIZE
+from .split_volumes import VolumeReader, volume_path
+
+
+class ArchiveVerifyError(Exception):
+    """压缩包校验失败"""
+    pass
+
+
+class ArchiveVerifier:
+    """压缩包校验器
+
+    The writers record the CRC-32 and SHA-256 of every entry from the bytes
+    they compress, so the sources are never read twice. Verification then
+    re-reads the finished archive: its directory (ZIP central directory or 7z
+    header) must list exactly the expected entries with the expected sizes
+    and CRCs, and every entry is decompressed on a thread pool (ZIP: one task
+    per batch of entries; 7z: one task per solid block) and its CRC compared.
+    One more task hashes the whole archive for the `.sha256` sidecar.
+
+    A split archive is verified through its joined `volumes`; the sidecar
+    then lists the hash of every volume.
+    """
+    def __init__(self, archive_path: str, expected: Dict[str, Dict], workers: int = 0,
+                 check_cancelled: Optional[Callable[[], None]] = None, volumes: Optional[List[str]] = None):
+        self.archive_path = archive_path
+        self.volumes = list(volumes or [])
+        self.expected = expected    # arcname -> {"crc", "file_size", "sha256"}
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.check_cancelled = check_cancelled or (lambda: None)
+        self.archive_sha256 = ""
+        self.volume_sha256 = []     # SHA-256 of every volume of a split archive
+        self._lock = threading.Lock()
+        self._errors = []
+
+    def verify_zip(self) -> Dict:
+        """校验ZIP（以及扩展名为.rar的ZIP）压缩包"""
+        started = time.perf_counter()
+        try:
+            with self._open() as f, zipfile.ZipFile(f, 'r') as archive:
+                infos = archive.infolist()
+        except (OSError, zipfile.BadZipFile) as e:
+            raise ArchiveVerifyError(f"cannot read the central directory: {e}")
+        self._check_directory({info.filename: (info.file_size, info.CRC) for info in infos})
+
+        batches = [infos[index::self.workers] for index in range(self.workers)]
+        self._run([lambda batch=batch: self._verify_zip_batch(batch) for batch in batches if batch])
+        return self._report(len(infos), started)
+
+    def verify_7z(self, layout: List[Dict]) -> Dict:
+        """校验7z压缩包，layout来自SevenZipWriter.layout()"""
+        started = time.perf_counter()
+        try:
+            with self._open() as f, py7zr.SevenZipFile(f, 'r') as archive:
+                infos = archive.list()
+        except (OSError, py7zr.exceptions.ArchiveError, lzma.LZMAError) as e:
+            raise ArchiveVerifyError(f"cannot read the 7z header: {e}")
+        self._check_directory({info.filename: (info.uncompressed, info.crc32 or 0) for info in infos})
+
+        self._run([lambda block=block: self._verify_7z_block(block) for block in layout])
+        return self._report(len(infos), started)
+
+    def write_sidecar(self, archive_path: Optional[str] = None) -> str:
+        """写入sha256sum格式的校验文件，返回其路径
+
+        `archive_path` is where the verified archive was moved to, when it was
+        verified under a temporary name. For a split archive it is the path
+        without the volume number, and every volume gets a line.
+        """
+        archive_path = archive_path or self.archive_path
+        sidecar_path = f"{archive_path}.sha256"
+        temp_path = f"{sidecar_path}.tmp"
+        if self.volumes:
+            lines = [(sha256, os.path.basename(volume_path(archive_path, index)))
+                     for index, sha256 in enumerate(self.volume_sha256, start=1)]
+        else:
+            lines = [(self.archive_sha256, os.path.basename(archive_path))]
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(f"{sha256} *{name}\n" for sha256, name in lines)
+        os.replace(temp_path, sidecar_path)
+        return sidecar_path
+
+    def digests(self) -> Dict[str, Dict]:
+        """每个条目的SHA-256与CRC，写入构建记录"""
+        return {arcname: {"sha256": result.get("sha256", ""), "crc": f"{result['crc']:08x}"}
+                for arcname, result in sorted(self.expected.items())}
+
+    def _open(self):
+        """以只读方式打开压缩包（分卷按顺序拼接）"""
+        if self.volumes:
+            return io.BufferedReader(VolumeReader(self.volumes), CHUNK_SIZE)
+        return open(self.archive_path, 'rb')
+
+    def _check_directory(self, listed: Dict[str, tuple]):
+        """核对目录中的条目列表、大小与CRC"""
+        missing = sorted(set(self.expected) - set(listed))
+        unexpected = sorted(set(listed) - set(self.expected))
+        if missing or unexpected:
+            raise ArchiveVerifyError(f"entry list mismatch, missing {missing[:5]}, unexpected {unexpected[:5]}")
+        for arcname, (size, crc) in listed.items():
+            expected = self.expected[arcname]
+            if size != expected["file_size"] or (size and crc != expected["crc"]):
+                raise ArchiveVerifyError(f"{arcname}: directory does not match the written entry")
+
+    def _run(self, tasks: List[Callable[[], None]]):
+        """并行执行校验任务（另加一个计算整包哈希的任务）"""
+        with ThreadPoolExecutor(max_workers=self.workers + 1) as executor:
+            futures = [executor.submit(self._hash_archive)] + [executor.submit(task) for task in tasks]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+        if self._errors:
+            raise ArchiveVerifyError("; ".join(self._errors[:5]))
+
+    def _fail(self, message: str):
+        """记录一个校验错误"""
+        with self._lock:
+            self._errors.append(message)
+
+    def _hash_archive(self):
+        """计算整个压缩包（及每个分卷）的SHA-256"""
+        sha256 = hashlib.sha256()
+        volume_sha256 = []
+        for path in self.volumes or [self.archive_path]:
+            # A single archive is hashed once, volumes also on their own
+            volume_hash = hashlib.sha256() if self.volumes else None
+            with open(path, 'rb') as f:
+                while True:
+                    self.check_cancelled()
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha256.update(chunk)
+                    if volume_hash is not None:
+                        volume_hash.update(chunk)
+            if volume_hash is not None:
+                volume_sha256.append(volume_hash.hexdigest())
+        self.archive_sha256 = sha256.hexdigest()
+        self.volume_sha256 = volume_sha256
+
+    def _verify_zip_batch(self, infos: List[zipfile.ZipInfo]):
+        """解压一批ZIP条目并核对CRC（每个线程使用独立的文件句柄）"""
+        with self._open() as f, zipfile.ZipFile(f, 'r') as archive:
+            for info in infos:
+                crc = 0
+                try:
+                    with archive.open(info) as f:
+                        while True:
+                            self.check_cancelled()
+                            chunk = f.read(CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            crc = zlib.crc32(chunk, crc)
+                except (OSError, zipfile.BadZipFile, zlib.error, EOFError) as e:
+                    self._fail(f"{info.filename}: {e}")
+                    continue
+                if crc != self.expected[info.filename]["crc"]:
+                    self._fail(f"{info.filename}: CRC mismatch")
+
+    def _verify_7z_block(self, block: Dict):
+        """解码一个7z固实块并核对其中每个条目的CRC"""
+        entries = iter(block["entries"])
+        current = next(entries, None)
+        remaining = current[1] if current else 0
+        crc = 0
+
+        def consume(data: bytes):
+            nonlocal current, remaining, crc
+            view = memoryview(data)
+            while view and current is not None:
+                part = view[:remaining]
+                crc = zlib.crc32(part, crc)
+                remaining -= len(part)
+                view = view[len(part):]
+                if remaining == 0:
+                    if crc != current[2]:
+                        self._fail(f"{current[0]}: CRC mismatch")
+                    current = next(entries, None)
+                    remaining = current[1] if current else 0
+                    crc = 0
+            if view:
+                self._fail(f"block at {block['offset']}: more data than expected")
+
+        decompressor = None
+        if block["filters"]:
+            decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=block["filters"])
+        packed = block["pack_size"]
+        try:
+            with self._open() as f:
+                f.seek(block["offset"])
+                while True:
+                    self.check_cancelled()
+                    if decompressor is None or decompressor.needs_input:
+                        data = f.read(min(CHUNK_SIZE, packed))
+                        packed -= len(data)
+                        if not data:
+                            break
+                    else:
+                        data = b""
+                    consume(decompressor.decompress(data, CHUNK_SIZE) if decompressor else data)
+                    if decompressor is not None and decompressor.eof:
+                        break
+        except (OSError, lzma.LZMAError) as e:
+            self._fail(f"block at {block['offset']}: {e}")
+            return
+        if current is not None:
+            self._fail(f"{current[0]}: block ended early")
+
+    def _report(self, entries: int, started: float) -> Dict:
+        """校验统计"""
+        report = {
+            "status": "ok",
+            "entries": entries,
+            "archive_sha256": self.archive_sha256,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        if self.volumes:
+            report["volume_sha256"] = list(self.volume_sha256)
+        return report
@@ -0,0 +1,199 @@
+# coding:utf-8
+"""
+Build Journal
+构建日志模块 - 记录进行中的构建，供中断后续建
+"""
+import os
+import json
+import threading
+import zipfile
+from typing import Dict, Optional, Tuple
+
+JOURNAL_VERSION = 1
+
+
+class PartialArchive:
+    """中断构建留下的半成品压缩包
+
+    The central directory of an interrupted ZIP may be missing, so the entries
+    are rebuilt from the journal instead. Only `NameToInfo`, `fp` and `close`
+    are provided, which is all ParallelZipWriter needs to copy raw entries.
+    """
+    def __init__(self, archive_path: str, records: Dict[str, Dict]):
+        self.fp = open(archive_path, 'rb')
+        self.NameToInfo = {}
+        archive_size = os.fstat(self.fp.fileno()).st_size
+        for arcname, record in records.items():
+            zinfo = zipfile.ZipInfo(arcname, tuple(record["date_time"]))
+            zinfo.compress_type = record["compress_type"]
+            zinfo.external_attr = record["external_attr"]
+            zinfo.create_system = record["create_system"]
+            zinfo.CRC = record["crc"]
+            zinfo.file_size = record["file_size"]
+            zinfo.compress_size = record["compress_size"]
+            zinfo.header_offset = record["header_offset"]
+            # Skip entries whose data did not fully reach the disk
+            if zinfo.header_offset + len(zinfo.FileHeader()) + zinfo.compress_size > archive_size:
+                continue
+            self.NameToInfo[arcname] = zinfo
+
+    def close(self):
+        """关闭文件"""
+        self.fp.close()
+
+
+class BuildJournal:
+    """构建日志
+
+    One JSON-lines journal is kept per MOD name under `<cache>/journals`. The
+    first line describes the build (cache folder, archive, build type); every
+    following line is appended and flushed right after a ZIP entry has been
+    written. After a crash or failure the next build of the same MOD picks the
+    journal up, reuses the cache folder (so staged files are kept) and copies
+    the journaled entries out of the partial archive instead of recompressing.
+    """
+    def __init__(self, journal_path: str, header: Dict, records: Optional[Dict[str, Dict]] = None):
+        self.journal_path = journal_path
+        self.header = header
+        self.records = records or {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def get_journal_path(cache_dir: str, mod_name: str) -> str:
+        """获取MOD对应的日志文件路径"""
+        return os.path.join(cache_dir, "journals", f"{mod_name}.jsonl")
+
+    @property
+    def temp_dir(self) -> str:
+        return self.header.get("temp_dir", "")
+
+    @property
+    def build_type(self) -> str:
+        return self.header.get("build_type", "")
+
+    @property
+    def archive_path(self) -> str:
+        return self.header.get("archive_path", "")
+
+    @classmethod
+    def load(cls, cache_dir: str, mod_name: str) -> Optional["BuildJournal"]:
+        """加载中断构建的日志，不存在或损坏时返回None"""
+        journal_path = cls.get_journal_path(cache_dir, mod_name)
+        if not os.path.exists(journal_path):
+            return None
+
+        header = None
+        records = {}
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line is expected after a crash
+                        break
+                    if header is None:
+                        header = data
+                    else:
+                        records[data["arcname"]] = data
+        except (IOError, KeyError, TypeError):
+            return None
+
+        if not header or header.get("version") != JOURNAL_VERSION:
+            return None
+        return cls(journal_path, header, records)
+
+    @classmethod
+    def create(cls, cache_dir: str, mod_name: str, temp_dir: str, build_type: str) -> "BuildJournal":
+        """为新构建创建日志（覆盖旧日志）"""
+        header = {"version": JOURNAL_VERSION, "temp_dir": temp_dir, "build_type": build_type, "archive_path": ""}
+        journal = cls(cls.get_journal_path(cache_dir, mod_name), header)
+        journal._rewrite()
+        return journal
+
+    def begin_archive(self, archive_path: str):
+        """开始写入压缩包，清空旧的条目记录"""
+        self.header["archive_path"] = archive_path
+        self.records = {}
+        self._rewrite()
+
+    def resume_candidate(self, entry: Dict) -> Optional[Dict]:
+        """判断条目能否从半成品压缩包中复用"""
+        if not entry["source"]:
+            return None
+
+        record = self.records.get(entry["arcname"])
+        if not record or record.get("source") != entry["source"]:
+            return None
+
+        try:
+            stat = os.stat(entry["source"])
+        except OSError:
+            return None
+
+        if (stat.st_size != record.get("source_size", record.get("file_size"))
+                or stat.st_mtime_ns != record.get("mtime_ns")):
+            return None
+
+        return {"sha256": record.get("sha256", ""), "verify": False, "resume": True,
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def open_partial(self, partial_path: str) -> Optional[PartialArchive]:
+        """打开半成品压缩包"""
+        if not self.records or not os.path.isfile(partial_path):
+            return None
+        try:
+            return PartialArchive(partial_path, self.records)
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+    def record(self, zinfo: zipfile.ZipInfo, source: Optional[str], sha256: str,
+               stat: Optional[Tuple[int, int]]):
+        """追加一条已写入条目的记录（线程安全）；stat为读取源文件之前取得的(大小, 修改时间)"""
+        if not source or stat is None:
+            return
+
+        record = {
+            "arcname": zinfo.filename,
+            "source": source,
+            "source_size": stat[0],
+            "mtime_ns": stat[1],
+            "sha256": sha256,
+            "crc": zinfo.CRC,
+            "file_size": zinfo.file_size,
+            "compress_size": zinfo.compress_size,
+            "compress_type": zinfo.compress_type,
+            "date_time": list(zinfo.date_time),
+            "external_attr": zinfo.external_attr,
+            "create_system": zinfo.create_system,
+            "header_offset": zinfo.header_offset
+        }
+        with self._lock:
+            self.records[zinfo.filename] = record
+            if self._file is None:
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """构建完成后删除日志"""
+        self.close()
+        try:
+            os.remove(self.journal_path)
+        except OSError:
+            pass
+
+    def _rewrite(self):
+        """只保留头部重写日志"""
+        self.close()
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        with open(self.journal_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.header, ensure_ascii=False) + "\n")
@@ -0,0 +1,136 @@
+# coding:utf-8
+"""
+Build Manifest
+构建清单模块 - 记录每个压缩条目的来源信息，供增量构建复用
+"""
+import os
+import json
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+class BuildManifest:
+    """构建清单
+
+    One manifest is kept per MOD name under `<cache>/manifests`. It remembers the
+    last archive written for that MOD and, for every entry, the source path, size,
+    mtime and content hash (in-memory entries such as modinfo.ini only keep
+    size and hash), so a rebuild can copy unchanged compressed entries
+    straight out of the previous archive. For a 7z archive it also keeps the
+    solid block layout, since only whole blocks can be copied there.
+    """
+    def __init__(self, manifest_path: str, data: Optional[Dict] = None):
+        self.manifest_path = manifest_path
+        data = data or {}
+        self.archive_path = data.get("archive_path", "")
+        self.build_type = data.get("build_type", "")
+        self.entries = data.get("entries", {})
+        self.blocks = data.get("blocks", [])     # SevenZipWriter.layout() of a 7z archive
+
+    @staticmethod
+    def get_manifest_path(cache_dir: str, mod_name: str) -> str:
+        """获取MOD对应的清单文件路径"""
+        return os.path.join(cache_dir, "manifests", f"{mod_name}.json")
+
+    @classmethod
+    def load(cls, cache_dir: str, mod_name: str) -> "BuildManifest":
+        """加载清单，不存在或损坏时返回空清单"""
+        manifest_path = cls.get_manifest_path(cache_dir, mod_name)
+        data = None
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != MANIFEST_VERSION:
+                    data = None
+            except (json.JSONDecodeError, IOError, AttributeError):
+                data = None
+        return cls(manifest_path, data)
+
+    def previous_archive(self, build_types: Iterable[str]) -> Optional[str]:
+        """返回可复用的上一次压缩包路径"""
+        if self.build_type in build_types and self.archive_path and os.path.isfile(self.archive_path):
+            return self.archive_path
+        return None
+
+    def reuse_candidate(self, entry: Dict) -> Optional[Dict]:
+        """判断源文件条目能否复用上一次的压缩数据
+
+        Returns None when the entry must be recompressed. Otherwise returns the
+        expected content hash and whether the source has to be hashed first
+        (size matches but mtime changed).
+        """
+        record = self.entries.get(entry["arcname"])
+        if not record or record.get("source") != entry["source"]:
+            return None
+
+        if not entry["source"]:
+            # In-memory data is small, compare its content directly
+            data = entry["data"]
+            if len(data) != record.get("size") or hashlib.sha256(data).hexdigest() != record.get("sha256"):
+                return None
+            return {"sha256": record["sha256"], "verify": False}
+
+        try:
+            stat = os.stat(entry["source"])
+        except OSError:
+            return None
+
+        if stat.st_size != record.get("size"):
+            return None
+
+        # The writers hash the source again if it no longer has this size and mtime when read
+        return {
+            "sha256": record.get("sha256", ""),
+            "verify": stat.st_mtime_ns != record.get("mtime_ns"),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+    def update(self, archive_path: str, build_type: str, entries: Iterable[Dict], results: Dict[str, Dict],
+               blocks: Optional[List[Dict]] = None):
+        """用本次构建结果刷新清单
+
+        Sizes and mtimes come from `results`, where the writers put the stat
+        they took before reading each source, never from a stat taken now:
+        a file edited during the build must not look unchanged next time.
+        """
+        self.archive_path = archive_path
+        self.build_type = build_type
+        self.blocks = blocks or []
+        self.entries = {}
+        for entry in entries:
+            result = results.get(entry["arcname"])
+            if not result:
+                continue
+            if not entry["source"]:
+                self.entries[entry["arcname"]] = {"source": None, "size": len(entry["data"]),
+                                                  "sha256": result.get("sha256", "")}
+                continue
+            if "mtime_ns" not in result:
+                continue
+            self.entries[entry["arcname"]] = {
+                "source": entry["source"],
+                "size": result["source_size"],
+                "mtime_ns": result["mtime_ns"],
+                "sha256": result.get("sha256", ""),
+                "crc": result.get("crc", 0),
+                "compress_size": result.get("compress_size", 0)
+            }
+
+    def save(self):
+        """保存清单"""
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "archive_path": self.archive_path,
+            "build_type": self.build_type,
+            "entries": self.entries,
+            "blocks": self.blocks
+        }
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
@@ -0,0 +1,145 @@
+# coding:utf-8
+"""
+Build Metrics
+构建度量模块 - 记录每个构建阶段的耗时、CPU、读写字节与内存峰值
+"""
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    class _IoCounters(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_ulonglong) for name in (
+            "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+            "ReadTransferCount", "WriteTransferCount", "OtherTransferCount")]
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+else:
+    import resource
+
+
+def _io_counters() -> Tuple[int, int]:
+    """进程累计读写字节数（不支持的平台返回0）"""
+    if sys.platform == "win32":
+        counters = _IoCounters()
+        kernel32 = ctypes.windll.kernel32
+        if kernel32.GetProcessIoCounters(kernel32.GetCurrentProcess(), ctypes.byref(counters)):
+            return counters.ReadTransferCount, counters.WriteTransferCount
+        return 0, 0
+    try:
+        with open("/proc/self/io", 'r') as f:
+            values = dict(line.split(": ") for line in f.read().splitlines())
+        return int(values["rchar"]), int(values["wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _peak_rss() -> int:
+    """进程常驻内存峰值（字节）"""
+    if sys.platform == "win32":
+        counters = _MemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BuildMetrics:
+    """构建阶段度量
+
+    Each `stage()` records wall time, CPU time, bytes read/written and the
+    peak RSS at its end. CPU, I/O and memory are process-wide counters, so
+    when several builds run at once (or the UI is busy) a stage also carries
+    the work of the others; worker processes (image optimizer) are not
+    included. `report()` is stored in build_info["metrics"]; `chrome_trace()`
+    turns such a report into a trace for chrome://tracing or Perfetto.
+    """
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._stages = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """度量一个构建阶段（异常时同样记录）"""
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        read_start, write_start = _io_counters()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            end = time.perf_counter()
+            read_end, write_end = _io_counters()
+            with self._lock:
+                self._stages.append({
+                    "name": name,
+                    "start_ms": round((start - self._origin) * 1000, 3),
+                    "wall_ms": round((end - start) * 1000, 3),
+                    "cpu_ms": round((time.process_time() - cpu_start) * 1000, 3),
+                    "read_bytes": read_end - read_start,
+                    "write_bytes": write_end - write_start,
+                    "peak_rss": _peak_rss(),
+                    "thread": threading.current_thread().name,
+                    "status": status
+                })
+
+    def report(self) -> Dict:
+        """阶段度量结果（写入build_info）"""
+        with self._lock:
+            stages = list(self._stages)
+        return {
+            "started_at": self.started_at,
+            "wall_ms": round(sum(stage["wall_ms"] for stage in stages), 3),
+            "cpu_ms": round(sum(stage["cpu_ms"] for stage in stages), 3),
+            "peak_rss": max((stage["peak_rss"] for stage in stages), default=0),
+            "stages": stages
+        }
+
+    @staticmethod
+    def chrome_trace(report: Dict, label: str = "build", pid: Optional[int] = None) -> Dict:
+        """把度量结果转换为Chrome Trace Event格式"""
+        pid = pid if pid is not None else os.getpid()
+        start_us = report.get("started_at", 0) * 1000000
+        threads = {}
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": label}}]
+        for stage in report.get("stages", []):
+            tid = threads.setdefault(stage.get("thread", ""), len(threads) + 1)
+            ts = start_us + stage["start_ms"] * 1000
+            args = {key: stage[key] for key in ("cpu_ms", "read_bytes", "write_bytes", "peak_rss", "status")
+                    if key in stage}
+            events.append({"name": stage["name"], "cat": "build", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": ts, "dur": stage["wall_ms"] * 1000, "args": args})
+            events.append({"name": "peak_rss", "ph": "C", "pid": pid, "tid": tid,
+                           "ts": ts + stage["wall_ms"] * 1000, "args": {"bytes": stage.get("peak_rss", 0)}})
+        for name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    @classmethod
+    def export_chrome_trace(cls, reports: List[Tuple[str, Dict]], trace_path: str):
+        """导出一个或多个构建的Chrome Trace JSON（每个构建占一个进程轨道）"""
+        events = []
+        for pid, (label, report) in enumerate(reports, start=1):
+            events.extend(cls.chrome_trace(report, label, pid)["traceEvents"])
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
@@ -0,0 +1,556 @@
+# coding:utf-8
+"""
+Build Pipeline
+构建流水线模块 - 不依赖Qt事件循环的构建流程，供工作线程与命令行共用
+"""
+import os
+import errno
+import shutil
+from datetime import datetime
+from typing import Callable, Collection, Dict, List, Optional
+from ..common.language import lang
+from ..common.config import cfg
+from .parallel_zip import ParallelZipWriter
+from .sevenzip_writer import SevenZipWriter
+from .build_manifest import BuildManifest
+from .cache_manager import CacheManager
+from .archive_verifier import ArchiveVerifier, ArchiveVerifyError
+from .build_metrics import BuildMetrics
+from .build_plan import BuildPlan, BuildPlanner, restore_image_names
+from .content_dedup import ContentDedup
+from .image_optimizer import ImageOptimizer
+from .compression_policy import CompressionPolicy
+from .staging import StagingStrategy
+from .build_progress import BuildProgress, BuildCancelled
+from .build_journal import BuildJournal
+from .resource_budget import ResourceBudget
+from .split_volumes import volume_path, remove_archive
+
+MB = 1024 * 1024
+
+
+class BuildPipeline:
+    """构建流水线
+
+    Runs the whole build (layout, staging, archive, output) in the calling
+    thread and reports through plain callbacks, so it needs no QApplication.
+    BuildWorker runs it on a QThread and turns the callbacks into signals; the
+    command line entry point runs it directly.
+    """
+    def __init__(self, build_data: Dict, budget: Optional[ResourceBudget] = None,
+                 on_progress: Optional[Callable[[int], None]] = None,
+                 on_status: Optional[Callable[[str], None]] = None,
+                 on_transfer: Optional[Callable[[Dict], None]] = None,
+                 plan: Optional[BuildPlan] = None):
+        self.build_data = build_data
+        self.plan = plan                # Layout to build, planned from build_data when not given
+        self.budget = budget or ResourceBudget()   # CPU/disk budget shared with other jobs
+        self.on_progress = on_progress or (lambda progress: None)
+        self.on_status = on_status or (lambda status: None)
+        self.on_transfer = on_transfer or (lambda snapshot: None)
+        self.temp_dir = None
+        self.output_path = None
+        self.entries = {}               # Archive layout: arcname -> entry
+        self.entry_results = {}         # arcname -> written entry info (crc/size/hash)
+        self.stage_enabled = cfg.cacheEnabled
+        self.manifest = None
+        self.build_report = {}          # Extra build statistics stored with the build record
+        self.metrics = BuildMetrics()   # Per-stage timings, stored as build_report["metrics"]
+        self.progress = BuildProgress(self._emit_transfer_progress)
+        self._last_percent = -1
+        self.journal = None             # Journal of this build, kept until it completes
+        self.resumed = False            # Whether an interrupted build is being continued
+        self.archive_path = None
+        self.writing_path = None        # Archive currently being written
+        self.partial_path = None        # Archive left behind by the interrupted build
+        self.image_optimizer = None
+        if cfg.imageOptimize:
+            self.image_optimizer = ImageOptimizer(cfg.cacheDirectory, cfg.imageMaxSize, cfg.imageFormat,
+                                                  cfg.imageQuality, self._image_workers())
+        self._image_entries = []        # Image entries handed to the optimizer
+        self.sevenzip_layout = None     # Solid blocks of a 7z archive, used to verify it
+        self.verifier = None            # Verifier of the finished archive, writes the .sha256 sidecar
+        self.volume_size = 0            # Size of the volumes of a split archive, 0 for a single file
+        self.volume_paths = []          # Volumes written for the archive, in order
+    
+    def _image_workers(self) -> int:
+        """图片优化进程数（受共享CPU配额限制）"""
+        if self.budget.cpu_slots > 0:
+            return min(cfg.zipWorkers, self.budget.cpu_slots)
+        return cfg.zipWorkers
+    
+    def cancel(self):
+        """请求取消构建，复制与压缩会在下一个数据块边界停止（可在任意线程调用）"""
+        self.progress.cancel()
+    
+    def run(self) -> str:
+        """执行构建，返回输出文件路径
+        
+        Raises BuildCancelled after cancel(), or the original exception when the
+        build fails (the journal and partial archive are then kept for resume).
+        """
+        try:
+            # Step 1: Create a temporary directory
+            self.on_status(lang.get_text("creating_temp_dir"))
+            self.on_progress(10)
+            with self.metrics.stage("temp_dir"):
+                self._create_temp_directory()
+            self.progress.check_cancelled()
+            
+            # Step 2: Plan the cover and block folders
+            self.on_status(lang.get_text("creating_cover_folder"))
+            self.on_progress(20)
+            with self.metrics.stage("plan"):
+                self._create_layout()
+            self.progress.check_cancelled()
+            
+            # Step 3: Prepare the block folders
+            self.on_status(lang.get_text("creating_block_folders"))
+            self.on_progress(40)
+            with self.metrics.stage("images"):
+                self._optimize_images()
+            self._start_progress()
+            with self.metrics.stage("staging"):
+                self._stage_entries()
+            with self.metrics.stage("dedup"):
+                self._find_duplicates()
+            
+            # Step 4: Create an archive file
+            self.on_status(lang.get_text("creating_archive_file"))
+            with self.metrics.stage("archive"):
+                self._create_archive_file()
+            self.progress.finish()
+            self.progress.check_cancelled()
+            
+            # Step 5: Verify, then swap into the output directory
+            self.on_progress(90)
+            with self.metrics.stage("verify"):
+                self._verify_output()
+            self.on_status(lang.get_text("moving_to_output"))
+            with self.metrics.stage("move"):
+                self._move_to_output()
+            with self.metrics.stage("finalize"):
+                self._save_manifest()
+                self._finish_journal()
+                self._cleanup_temp_directory()
+            self.build_report["metrics"] = self.metrics.report()
+            
+            # Step 6: Build completion
+            self.on_status(lang.get_text("build_completed"))
+            self.on_progress(100)
+            return self.output_path
+            
+        except BuildCancelled:
+            self._discard_partial_archive()
+            self.on_status(lang.get_text("build_cancelled"))
+            raise
+        except Exception:
+            # Keep the journal and partial archive so the next build can resume
+            if self.journal is not None:
+                self.journal.close()
+            raise
+    
+    def _create_temp_directory(self):
+        """创建临时目录（流式构建时仅确定路径，不落盘；续建时沿用中断构建的目录）"""
+        mod_name = self.build_data["mod_info"]["name"]
+        
+        cache_dir = cfg.cacheDirectory
+        os.makedirs(cache_dir, exist_ok=True)
+        build_type = cfg.buildType.lower()
+        
+        journal = BuildJournal.load(cache_dir, mod_name)
+        if (cfg.resumeBuilds and journal is not None and journal.build_type == build_type
+                and os.path.normcase(os.path.dirname(journal.temp_dir)) == os.path.normcase(cache_dir)):
+            self.temp_dir = journal.temp_dir
+            self.journal = journal
+            self.resumed = True
+        else:
+            if journal is not None:
+                self._remove_stale_archive(journal.archive_path, cache_dir)
+            self.temp_dir = os.path.join(cache_dir, self._unique_folder_name(cache_dir, mod_name))
+            self.journal = BuildJournal.create(cache_dir, mod_name, self.temp_dir, build_type)
+        
+        if self.stage_enabled:
+            os.makedirs(self.temp_dir, exist_ok=True)
+    
+    @staticmethod
+    def _remove_stale_archive(archive_path: str, cache_dir: str):
+        """删除不再续建的中断构建写在输出目录中的半成品（缓存目录中的由缓存管理器淘汰）"""
+        if not archive_path or os.path.normcase(os.path.dirname(archive_path)) == os.path.normcase(cache_dir):
+            return
+        for path in (archive_path, f"{archive_path}.partial"):
+            remove_archive(path)
+    
+    def _unique_folder_name(self, cache_dir: str, mod_name: str) -> str:
+        """生成本次构建独占的目录名（同一秒内的多次构建追加序号）"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        folder_name = f"{mod_name}-{timestamp}"
+        suffix = 1
+        while any(os.path.exists(os.path.join(cache_dir, name))
+                  for name in (folder_name, f"{folder_name}.zip", f"{folder_name}.7z", f"{folder_name}.rar",
+                               f"{folder_name}.zip.001", f"{folder_name}.7z.001")):
+            suffix += 1
+            folder_name = f"{mod_name}-{timestamp}-{suffix}"
+        return folder_name
+    
+    def _start_progress(self):
+        """预扫描布局，统计需要处理的总字节数与文件数"""
+        passes = 2 if self.stage_enabled else 1
+        total_bytes = sum(entry["size"] for entry in self.entries.values())
+        self.progress.start(total_bytes * passes, len(self.entries) * passes)
+    
+    def _report_bytes(self, count: int, arcname: str):
+        """扣除磁盘带宽配额并累加进度"""
+        self.budget.consume_io(count)
+        self.progress.add_bytes(count, arcname)
+    
+    def _emit_transfer_progress(self, snapshot: Dict):
+        """转发字节进度，并映射到40%~90%的总体进度"""
+        self.on_transfer(snapshot)
+        percent = 40 + int(50 * snapshot["fraction"])
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.on_progress(percent)
+    
+    def _create_layout(self):
+        """生成构建计划（已传入计划时直接使用），并据此登记压缩包条目"""
+        if self.plan is None:
+            self.plan = create_planner(self.image_optimizer).plan(self.build_data)
+            self.entries = {entry.arcname: entry.to_entry() for entry in self.plan.entries}
+        else:
+            # Files may have changed since the dry run, take their current sizes
+            self.entries = {}
+            for planned in self.plan.entries:
+                entry = planned.to_entry()
+                if entry["source"]:
+                    entry["size"] = os.path.getsize(entry["source"])
+                self.entries[planned.arcname] = entry
+        self._image_entries = [self.entries[entry.arcname] for entry in self.plan.entries
+                               if entry.image and self.image_optimizer is not None]
+    
+    def _stage_entries(self):
+        """按缓存设置将布局写入缓存目录（优先硬链接/内核拷贝）"""
+        if not self.stage_enabled:
+            return
+        
+        staging = StagingStrategy(self.temp_dir)
+        for entry in self.entries.values():
+            dest_path = os.path.join(self.temp_dir, *entry["arcname"].split("/"))
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            arcname = entry["arcname"]
+            if entry["source"]:
+                staging.stage_file(entry["source"], dest_path,
+                                   lambda count, arcname=arcname: self._report_bytes(count, arcname))
+            else:
+                with open(dest_path, 'wb') as f:
+                    f.write(entry["data"])
+                self.progress.add_bytes(entry["size"], arcname)
+            self.progress.file_done(arcname)
+        
+        self.build_report["staging"] = staging.report()
+    
+    def _optimize_images(self):
+        """在进程池中缩放并重新编码预览图片"""
+        if not self._image_entries:
+            return
+        self.on_status(lang.get_text("optimizing_images"))
+        renamed = self.image_optimizer.optimize(self._image_entries, self.progress.check_cancelled)
+        self.entries = restore_image_names(self.entries, renamed)
+        self.build_report["images"] = self.image_optimizer.report()
+    
+    def _find_duplicates(self):
+        """找出不同模块中内容相同的条目，压缩时每份内容只处理一次"""
+        dedup = ContentDedup(self.budget, lambda count: self.progress.check_cancelled())
+        dedup.mark_duplicates(self.entries.values())
+        self.build_report["dedup"] = dedup.report()
+    
+    def _create_archive_file(self):
+        """根据配置的打包格式创建压缩文件"""
+        # Get configuration pack format
+        build_type = cfg.buildType.lower()
+        
+        # Compression file name and temporary folder name same
+        folder_name = os.path.basename(self.temp_dir)
+        if build_type not in ("zip", "rar", "7z"):
+            build_type = "zip"
+        archive_name = f"{folder_name}.{build_type}"
+        
+        # Get .cache directory path
+        cache_dir = os.path.dirname(self.temp_dir)
+        build_dir = self._output_directory()
+        self.output_path = os.path.join(build_dir, archive_name)
+        
+        if self._same_volume(cache_dir, build_dir):
+            # Renaming out of the cache is free on the same volume
+            archive_path = os.path.join(cache_dir, archive_name)
+        else:
+            # Write next to the output so that publishing it is a rename, not a second copy
+            archive_path = os.path.join(build_dir, f"{archive_name}.tmp")
+        self.build_report["output"] = {"written_in_place": archive_path != os.path.join(cache_dir, archive_name)}
+        
+        # .rar builds are ZIP data under another name, only real .zip and .7z are split
+        self.volume_size = cfg.splitVolumeMb * MB if build_type in ("zip", "7z") else 0
+        if self.volume_size:
+            # Volumes left by an interrupted build may outnumber the new ones
+            remove_archive(archive_path)
+            self.build_report["output"]["volume_size"] = self.volume_size
+        
+        if build_type == "rar":
+            self._create_rar(archive_path)
+        elif build_type == "7z":
+            self._create_7z(archive_path)
+        else:
+            self._create_zip(archive_path)
+        
+        self.archive_path = archive_path
+        self.build_report["budget"] = self.budget.report()
+    
+    def _create_zip(self, archive_path: str):
+        """创建ZIP文件（多线程并行压缩，复用上一次构建或中断构建中未变化的条目）"""
+        self.manifest = BuildManifest.load(cfg.cacheDirectory, self.build_data["mod_info"]["name"])
+        previous_archive = self.manifest.previous_archive(("zip", "rar"))
+        resume_archive = self._open_partial_archive(archive_path)
+        
+        for entry in self.entries.values():
+            entry["reuse"] = self.journal.resume_candidate(entry) if resume_archive else None
+            if not entry["reuse"] and previous_archive:
+                entry["reuse"] = self.manifest.reuse_candidate(entry)
+        
+        self.journal.begin_archive(archive_path)
+        self.writing_path = archive_path
+        policy = CompressionPolicy(cfg.compressionPolicy)
+        with ParallelZipWriter(archive_path, workers=cfg.zipWorkers,
+                               spool_dir=os.path.dirname(archive_path),
+                               previous_archive=previous_archive, policy=policy,
+                               progress=self.progress, resume_archive=resume_archive,
+                               journal=self.journal, budget=self.budget, volume_size=self.volume_size) as writer:
+            writer.write_entries(self.entries.values())
+        
+        self.entry_results = writer.results
+        self.volume_paths = writer.volume_paths
+        self.build_report["compression"] = policy.report()
+        self.build_report["dedup"]["archive"] = writer.dedup
+    
+    def _create_rar(self, archive_path: str):
+        """创建RAR文件"""
+        # Because the rarfile library can only read rar files, not create them.  
+        # Here, we're actually creating a zip file and then changing the extension to rar.
+        base, suffix = (archive_path[:-len(".tmp")], ".tmp") if archive_path.endswith(".tmp") else (archive_path, "")
+        zip_path = f"{os.path.splitext(base)[0]}.zip{suffix}"
+        self._create_zip(zip_path)
+        # Rename to rar extension (still zip format)
+        if os.path.exists(zip_path):
+            os.replace(zip_path, archive_path)
+    
+    def _open_partial_archive(self, archive_path: str):
+        """续建时打开中断构建留下的压缩包，供原样拷贝已写入的条目（分卷时不续建）"""
+        if not self.resumed or self.journal.archive_path != archive_path or self.volume_size:
+            return None
+        
+        self.partial_path = f"{archive_path}.partial"
+        if os.path.exists(archive_path):
+            os.replace(archive_path, self.partial_path)
+        return self.journal.open_partial(self.partial_path)
+    
+    def _create_7z(self, archive_path: str):
+        """创建7Z文件（按预设切分固实块，多线程LZMA2压缩，整块复用上一次构建中未变化的固实块）"""
+        self.manifest = BuildManifest.load(cfg.cacheDirectory, self.build_data["mod_info"]["name"])
+        previous_archive = self.manifest.previous_archive(("7z",))
+        
+        for entry in self.entries.values():
+            entry["reuse"] = self.manifest.reuse_candidate(entry) if previous_archive else None
+        
+        self.journal.begin_archive(archive_path)
+        self.writing_path = archive_path
+        policy = CompressionPolicy(cfg.compressionPolicy)
+        with SevenZipWriter(archive_path, cfg.sevenZipPreset, cfg.sevenZipOptions,
+                            workers=cfg.zipWorkers, spool_dir=os.path.dirname(archive_path),
+                            policy=policy, progress=self.progress, budget=self.budget,
+                            volume_size=self.volume_size, previous_archive=previous_archive,
+                            previous_blocks=self.manifest.blocks) as writer:
+            writer.write_entries(self.entries.values())
+        
+        self.entry_results = writer.results
+        self.volume_paths = writer.volume_paths
+        self.sevenzip_layout = writer.layout()
+        self.build_report["compression"] = policy.report()
+        self.build_report["sevenzip"] = writer.report()
+        self.build_report["dedup"]["archive"] = writer.dedup
+    
+    def _output_directory(self) -> str:
+        """输出目录（不存在时创建）"""
+        build_dir = cfg.buildDirectory
+        if not build_dir or not build_dir.strip():
+            build_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "output")
+            build_dir = os.path.normpath(build_dir)
+        
+        os.makedirs(build_dir, exist_ok=True)
+        return build_dir
+    
+    @staticmethod
+    def _same_volume(path: str, other_path: str) -> bool:
+        """两个已存在的目录是否位于同一卷（同一卷上重命名无需复制数据）"""
+        try:
+            return os.stat(path).st_dev == os.stat(other_path).st_dev
+        except OSError:
+            return False
+    
+    def _move_to_output(self):
+        """把完成的压缩包（或其每个分卷）原子替换到输出位置（新包完成前旧包一直可用）"""
+        if not self.volume_paths:
+            self._replace_file(self.archive_path, self.output_path)
+        else:
+            output_paths = [volume_path(self.output_path, index)
+                            for index in range(1, len(self.volume_paths) + 1)]
+            for path, output_path in zip(self.volume_paths, output_paths):
+                self._replace_file(path, output_path)
+            self.build_report["output"]["volumes"] = output_paths
+        
+        if self.verifier is not None:
+            self.build_report["verification"]["sidecar"] = self.verifier.write_sidecar(self.output_path)
+        if self.volume_paths:
+            # A split archive is opened from its first volume
+            self.output_path = volume_path(self.output_path, 1)
+    
+    @staticmethod
+    def _replace_file(path: str, output_path: str):
+        """把一个文件原子替换到输出位置"""
+        try:
+            os.replace(path, output_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Volumes told apart wrongly (e.g. a junction): copy next to the output, then swap
+            staging_path = f"{output_path}.tmp"
+            shutil.copyfile(path, staging_path)
+            os.replace(staging_path, output_path)
+            os.remove(path)
+    
+    def _verify_output(self):
+        """在替换到输出位置之前重新读取压缩包核对每个条目"""
+        if not cfg.verifyBuilds:
+            return
+        
+        self.on_status(lang.get_text("verifying_archive"))
+        verifier = ArchiveVerifier(self.archive_path, self.entry_results, cfg.zipWorkers,
+                                   self.progress.check_cancelled, self.volume_paths)
+        try:
+            if self.sevenzip_layout is not None:
+                report = verifier.verify_7z(self.sevenzip_layout)
+            else:
+                report = verifier.verify_zip()
+        except ArchiveVerifyError as e:
+            # Never publish a corrupt archive, the previous output stays as it is
+            remove_archive(self.archive_path)
+            raise ArchiveVerifyError(f"{lang.get_text('archive_verify_failed')}: {e}")
+        
+        self.verifier = verifier
+        self.build_report["verification"] = report
+        self.build_report["digests"] = verifier.digests()
+    
+    def _save_manifest(self):
+        """保存本次构建的条目清单，供下次增量构建使用"""
+        if self.manifest is None:
+            return
+        
+        try:
+            self.manifest.update(self.output_path, cfg.buildType.lower(), self.entries.values(), self.entry_results,
+                                 self.sevenzip_layout)
+            self.manifest.save()
+        except OSError:
+            # A missing manifest only disables reuse for the next build
+            pass
+    
+    def _finish_journal(self):
+        """构建完成后删除构建日志与中断留下的压缩包"""
+        if self.journal is not None:
+            self.journal.discard()
+        if self.partial_path and os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+    
+    def _discard_partial_archive(self):
+        """取消构建时删除未完成的压缩包（保留缓存目录中已暂存的文件供续建）"""
+        for path in (self.writing_path, self.partial_path):
+            if path:
+                remove_archive(path)
+        if self.journal is not None:
+            try:
+                self.journal.begin_archive("")
+            except OSError:
+                self.journal.discard()
+    
+    def _cleanup_temp_directory(self):
+        """清理缓存：未启用缓存时删除暂存目录，再按大小与时限淘汰旧的构建缓存"""
+        if not self.stage_enabled:
+            if os.path.isdir(self.temp_dir):
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+        else:
+            CacheManager.touch(self.temp_dir)
+        
+        try:
+            manager = CacheManager(cfg.cacheDirectory, cfg.cacheMaxSizeGb, cfg.cacheMaxAgeDays)
+            self.build_report["cache"] = manager.enforce(in_use=[self.temp_dir])
+        except OSError:
+            # Eviction is retried after the next build
+            pass
+
+
+def validate_build_data(mod_info: Dict, cover_data: Optional[Dict], sorted_blocks: List[Dict]) -> Optional[str]:
+    """验证构建数据，返回错误信息或None"""
+    if not mod_info.get("name", "").strip():
+        return lang.get_text("mod_name_required")
+    
+    if not mod_info.get("version", "").strip():
+        return lang.get_text("version_required")
+    
+    if not mod_info.get("author", "").strip():
+        return lang.get_text("author_required")
+    
+    # Note: The MOD category is a non-essential input item and is allowed to be empty
+    
+    if not cover_data:
+        return lang.get_text("cover_block_required")
+    
+    if cover_data.get("image_path") and not os.path.exists(cover_data["image_path"]):
+        return lang.get_text("cover_image_not_found")
+    
+    for block in sorted_blocks:
+        if block.get("type") == "mod_file":
+            files = block.get("files", [])
+            for file_info in files:
+                if isinstance(file_info, tuple) and len(file_info) >= 2:
+                    file_path, file_name = file_info[0], file_info[1]
+                    if not os.path.exists(file_path):
+                        return f"{lang.get_text('file_not_found')}: {file_name}"
+                elif isinstance(file_info, dict):
+                    if not os.path.exists(file_info.get("path", "")):
+                        return f"{lang.get_text('file_not_found')}: {file_info.get('name', '未知文件')}"
+    
+    if not sorted_blocks:
+        return lang.get_text("content_block_required")
+    
+    return None
+
+
+def create_planner(image_optimizer: Optional[ImageOptimizer] = None) -> BuildPlanner:
+    """按当前配置创建构建计划器（构建与试运行共用）"""
+    return BuildPlanner(cfg.buildType.lower(), image_optimizer, CompressionPolicy(cfg.compressionPolicy),
+                        cfg.sevenZipPreset, cfg.sevenZipOptions)
+
+
+def plan_build(build_data: Dict, estimate: bool = True, previous: Optional[BuildPlan] = None,
+               changed: Optional[Collection[int]] = None) -> BuildPlan:
+    """试运行：生成构建计划并估算压缩后大小，不复制任何文件（数据无效时抛出ValueError）
+    
+    `previous` and `changed` plan incrementally, see BuildPlanner.plan().
+    """
+    error_msg = validate_build_data(build_data["mod_info"], build_data["cover_data"], build_data["sorted_blocks"])
+    if error_msg:
+        raise ValueError(error_msg)
+    
+    image_optimizer = None
+    if cfg.imageOptimize:
+        image_optimizer = ImageOptimizer(cfg.cacheDirectory, cfg.imageMaxSize, cfg.imageFormat, cfg.imageQuality)
+    planner = create_planner(image_optimizer)
+    plan = planner.plan(build_data, previous, changed)
+    return planner.estimate(plan) if estimate else plan
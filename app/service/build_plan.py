@@ -0,0 +1,449 @@
+# coding:utf-8
+"""
+Build Plan
+构建计划模块 - 由构建数据生成不可变的压缩包布局，并抽样估算压缩后大小
+"""
+import os
+import lzma
+import math
+import zlib
+from typing import Callable, Collection, Dict, List, NamedTuple, Optional, Tuple
+from ..common.language import lang
+from ..common import version_info
+from .compression_policy import CompressionPolicy, STORE
+from .image_optimizer import ImageOptimizer
+from .sevenzip_writer import SEVENZIP_PRESETS, DEFAULT_PRESET
+
+MB = 1024 * 1024
+SAMPLE_SIZE = 64 * 1024             # Bytes compressed from the start of a sampled file
+SAMPLE_BUDGET = 64 * MB             # Total bytes read for samples, files are skipped evenly above it
+ZIP_ENTRY_OVERHEAD = 76 + 22        # Local and central headers plus the data descriptor
+SEVENZIP_ENTRY_OVERHEAD = 24        # Sizes, CRC, attributes and time in the header
+
+
+class PlannedEntry(NamedTuple):
+    """计划中的一个压缩包条目"""
+    arcname: str
+    source: Optional[str]           # Source file, or None for generated data
+    data: Optional[bytes]           # Generated content (modinfo.ini)
+    size: int
+    image: bool = False             # Preview image handed to the image optimizer
+
+    def to_entry(self) -> Dict:
+        """转换为构建流程使用的可变条目"""
+        return {"arcname": self.arcname, "source": self.source, "data": self.data, "size": self.size}
+
+
+class PlannedFolder(NamedTuple):
+    """计划中的一个顶层文件夹（一个区块）"""
+    name: str                       # "00-cover", "01-warning", "02-separator-Name", "03-Module"
+    kind: str                       # cover, warning, separator or mod_file
+    modinfo: str                    # Content of its modinfo.ini
+    files: int
+    bytes: int
+
+
+class BuildPlan(NamedTuple):
+    """不可变的构建计划
+
+    The single description of what a build produces: every folder with its
+    modinfo.ini, every archive entry with its source and size, and, after
+    `BuildPlanner.estimate()`, the estimated archive size. BuildPipeline
+    builds exactly `entries`; a dry run shows the same plan without copying.
+    """
+    mod_name: str
+    version: str
+    build_type: str
+    folders: Tuple[PlannedFolder, ...]
+    entries: Tuple[PlannedEntry, ...]
+    total_bytes: int
+    estimated_size: Optional[int] = None
+    sampled_files: int = 0
+
+    @property
+    def archive_extension(self) -> str:
+        """压缩包扩展名"""
+        return f".{self.build_type}"
+
+    def to_dict(self) -> Dict:
+        """转换为可序列化的摘要（不含文件内容）"""
+        return {
+            "mod_name": self.mod_name,
+            "version": self.version,
+            "build_type": self.build_type,
+            "files": len(self.entries),
+            "bytes": self.total_bytes,
+            "estimated_size": self.estimated_size,
+            "sampled_files": self.sampled_files,
+            "folders": [folder._asdict() for folder in self.folders],
+            "entries": [{"arcname": entry.arcname, "source": entry.source, "size": entry.size}
+                        for entry in self.entries]
+        }
+
+
+class BuildPlanner:
+    """构建计划器
+
+    Turns mod_info/cover_data/sorted_blocks into a BuildPlan. Only file sizes
+    are read while planning (plus image headers when the image optimizer is
+    on, since it may change the image extensions). `estimate()` compresses
+    the first 64 KB of the files with the method the build would use and
+    scales the files by the sample ratio. ZIP samples are deflated one by one
+    at the compression policy's level; 7z samples of one extension share an
+    LZMA2 stream at the preset's level, since solid blocks compress similar
+    files together. Above a 64 MB read budget files are sampled evenly and
+    the others use the ratio of their extension. Deduplication and image
+    optimization usually make the real archive smaller than the estimate.
+    """
+    def __init__(self, build_type: str = "zip", image_optimizer: Optional[ImageOptimizer] = None,
+                 policy: Optional[CompressionPolicy] = None, sevenzip_preset: str = DEFAULT_PRESET,
+                 sevenzip_options: Optional[Dict] = None):
+        self.build_type = build_type if build_type in ("zip", "rar", "7z") else "zip"
+        self.image_optimizer = image_optimizer
+        self.policy = policy or CompressionPolicy()
+        settings = dict(SEVENZIP_PRESETS.get(sevenzip_preset, SEVENZIP_PRESETS[DEFAULT_PRESET]))
+        settings.update(sevenzip_options or {})
+        self.sevenzip_level = int(settings["level"])
+
+    def plan(self, build_data: Dict, previous: Optional[BuildPlan] = None,
+             changed: Optional[Collection[int]] = None) -> BuildPlan:
+        """生成构建计划（不复制任何文件）
+
+        With `previous` and `changed` (block indexes whose files changed, 0 for
+        the cover) the folders added to the blocks that did not change are not
+        walked again: their file lists are taken from `previous` as long as the
+        folder name and source folder are the same.
+        """
+        reuse = {}                  # Top folder -> previous entries, for blocks that did not change
+        if previous is not None and changed is not None:
+            for entry in previous.entries:
+                folder = entry.arcname.split("/", 1)[0]
+                index = folder.split("-", 1)[0]
+                if index.isdigit() and int(index) not in changed:
+                    reuse.setdefault(folder, []).append(entry)
+        layout = _Layout(build_data["mod_info"], self.image_optimizer, reuse)
+        layout.add_cover(build_data["cover_data"])
+        for index, block_data in enumerate(build_data["sorted_blocks"], start=1):
+            block_type = block_data["type"]
+            if block_type == "warning":
+                layout.add_warning(block_data, index)
+            elif block_type == "separator":
+                layout.add_separator(block_data, index)
+            elif block_type == "mod_file":
+                layout.add_mod_file(block_data, index)
+
+        entries = tuple(layout.entries.values())
+        totals = {}                 # folder -> [files, bytes]
+        for entry in entries:
+            folder_totals = totals.setdefault(entry.arcname.split("/", 1)[0], [0, 0])
+            folder_totals[0] += 1
+            folder_totals[1] += entry.size
+        folders = tuple(PlannedFolder(name, kind, modinfo, *totals.get(name, (0, 0)))
+                        for name, kind, modinfo in layout.folders)
+        return BuildPlan(
+            mod_name=build_data["mod_info"]["name"],
+            version=layout.version,
+            build_type=self.build_type,
+            folders=folders,
+            entries=entries,
+            total_bytes=sum(entry.size for entry in entries)
+        )
+
+    def estimate(self, plan: BuildPlan, check_cancelled: Optional[Callable[[], None]] = None) -> BuildPlan:
+        """抽样压缩文件开头，返回带有估算大小的新计划"""
+        check_cancelled = check_cancelled or (lambda: None)
+        sourced = [entry for entry in plan.entries if entry.source and entry.size > 0]
+        stride = max(1, math.ceil(sum(min(entry.size, SAMPLE_SIZE) for entry in sourced) / SAMPLE_BUDGET))
+        sampled = {entry.arcname for entry in sourced[::stride]}
+
+        ratios = {}                 # extension -> [sampled bytes, compressed bytes]
+        file_ratios = {}            # arcname -> compression ratio of its sample
+        solid = {}                  # extension -> [LZMA2 stream shared by the samples like a solid block, in, out]
+        solid_files = {}            # arcname -> extension of its solid stream
+        estimated = 0
+        for entry in plan.entries:
+            if entry.source is None:
+                estimated += self._compressed_size(entry.arcname, entry.size, entry.data)
+                continue
+            if entry.arcname not in sampled:
+                continue
+            check_cancelled()
+            try:
+                with open(entry.source, 'rb') as f:
+                    head = f.read(SAMPLE_SIZE)
+            except OSError:
+                continue
+            if not head:
+                continue
+            ext = os.path.splitext(entry.arcname)[1].lower()
+            totals = ratios.setdefault(ext, [0, 0])
+            totals[0] += len(head)
+            if self._is_solid(entry.arcname, entry.size, head):
+                if ext not in solid:
+                    solid[ext] = [lzma.LZMACompressor(format=lzma.FORMAT_RAW, filters=self._sample_filters()), 0, 0]
+                stream = solid[ext]
+                compressed = len(stream[0].compress(head))
+                stream[1] += len(head)
+                stream[2] += compressed
+                totals[1] += compressed
+                solid_files[entry.arcname] = ext
+            else:
+                compressed = self._compressed_size(entry.arcname, entry.size, head)
+                totals[1] += compressed
+                file_ratios[entry.arcname] = compressed / len(head)
+        for ext, stream in solid.items():
+            flushed = len(stream[0].flush())
+            stream[2] += flushed
+            ratios[ext][1] += flushed
+        for arcname, ext in solid_files.items():
+            file_ratios[arcname] = solid[ext][2] / solid[ext][1]
+
+        sampled_in = sum(totals[0] for totals in ratios.values())
+        overall = sum(totals[1] for totals in ratios.values()) / sampled_in if sampled_in else 1.0
+        for entry in sourced:
+            ratio = file_ratios.get(entry.arcname)
+            if ratio is None:
+                totals = ratios.get(os.path.splitext(entry.arcname)[1].lower())
+                ratio = totals[1] / totals[0] if totals and totals[0] else overall
+            estimated += round(entry.size * ratio)
+
+        overhead = ZIP_ENTRY_OVERHEAD if self.build_type != "7z" else SEVENZIP_ENTRY_OVERHEAD
+        estimated += sum(overhead + 2 * len(entry.arcname.encode('utf-8')) for entry in plan.entries)
+        return plan._replace(estimated_size=estimated, sampled_files=len(sampled))
+
+    def _is_solid(self, arcname: str, size: int, head: bytes) -> bool:
+        """样本是否按7z固实块的方式与同类文件一起压缩"""
+        if self.build_type != "7z" or self.sevenzip_level == 0:
+            return False
+        return self.policy.choose(arcname, size, head[:self.policy.probe_size]) != STORE
+
+    def _sample_filters(self) -> List[Dict]:
+        """压缩样本用的LZMA2过滤器（较小的字典足以覆盖样本，编码器开销也低）"""
+        return [{"id": lzma.FILTER_LZMA2, "preset": self.sevenzip_level, "dict_size": 16 * MB}]
+
+    def _compressed_size(self, arcname: str, size: int, head: bytes) -> int:
+        """用构建时的压缩方式单独压缩样本，返回压缩后字节数"""
+        if not head:
+            return 0
+        policy = self.policy.choose(arcname, size, head[:self.policy.probe_size])
+        if policy == STORE:
+            return len(head)
+        if self.build_type == "7z":
+            if self.sevenzip_level == 0:
+                return len(head)
+            return min(len(head), len(lzma.compress(head, format=lzma.FORMAT_RAW, filters=self._sample_filters())))
+        level = self.policy.zip_method(policy)[1]
+        compressor = zlib.compressobj(-1 if level is None else level, zlib.DEFLATED, -15)
+        return min(len(head), len(compressor.compress(head) + compressor.flush()))
+
+
+def restore_image_names(entries: Dict[str, Dict], renamed: Dict[str, str]) -> Dict[str, Dict]:
+    """图片优化失败时，把条目改回源文件扩展名并同步modinfo.ini中的screenshot行，返回新的条目表
+
+    `entries` maps arcnames to build entries whose image entries already carry
+    the restored arcname; order is kept. As in planning, a file of the module
+    with the restored name replaces the image.
+    """
+    if not renamed:
+        return entries
+    restored = {}
+    for arcname, entry in entries.items():
+        if arcname in renamed:
+            if renamed[arcname] not in entries:
+                restored[renamed[arcname]] = entry
+            continue
+        restored[arcname] = entry
+    for planned, arcname in renamed.items():
+        folder, planned_name = planned.rsplit("/", 1)
+        modinfo = restored.get(f"{folder}/modinfo.ini")
+        if modinfo is None or modinfo["source"]:
+            continue
+        modinfo["data"] = modinfo["data"].replace(
+            f"screenshot={planned_name}{os.linesep}".encode('utf-8'),
+            f"screenshot={arcname.rsplit('/', 1)[1]}{os.linesep}".encode('utf-8'))
+        modinfo["size"] = len(modinfo["data"])
+    return restored
+
+
+class _Layout:
+    """按区块收集文件夹与条目（构建计划器内部使用）"""
+    def __init__(self, mod_info: Dict, image_optimizer: Optional[ImageOptimizer],
+                 reuse: Optional[Dict[str, List[PlannedEntry]]] = None):
+        self.mod_info = mod_info
+        self.image_optimizer = image_optimizer
+        self.reuse = reuse or {}                          # Top folder -> entries of the previous plan
+        self.version = self._format_version(mod_info["version"])
+        self.folders: List[Tuple[str, str, str]] = []     # (folder, kind, modinfo.ini content)
+        self.entries: Dict[str, PlannedEntry] = {}        # arcname -> entry, a later file replaces an earlier one
+
+    def add_cover(self, cover_data: Optional[Dict]):
+        """封面文件夹"""
+        if not cover_data:
+            raise Exception(lang.get_text("cover_data_missing"))
+
+        # The 00-cover folder
+        cover_folder = "00-cover"
+
+        # Cover image
+        cover_image_name = ""
+        if cover_data["image_path"]:
+            image_path = cover_data["image_path"]
+            if os.path.exists(image_path):
+                cover_image_name = self._add_image_entry(cover_folder, "cover", image_path)
+            else:
+                raise Exception(f"{lang.get_text('cover_image_not_found')}: {image_path}")
+
+        self._add_folder(cover_folder, "cover",
+                         name="00 --------------Cover--------------",
+                         description=cover_data["description"],
+                         screenshot=cover_image_name)
+
+    def add_warning(self, warning_data: Dict, index: int):
+        """警告文件夹"""
+        # Folder name: Serial number -warning
+        folder_path = f"{index:02d}-warning"
+
+        # Warning image (if available)
+        screenshot_name = ""
+        if warning_data.get("image_path") and os.path.exists(warning_data["image_path"]):
+            screenshot_name = self._add_image_entry(folder_path, "warning", warning_data["image_path"])
+
+        self._add_folder(folder_path, "warning",
+                         name=f"{index:02d} --------------Warning--------------",
+                         description=warning_data.get("description", ""),
+                         screenshot=screenshot_name)
+
+    def add_separator(self, separator_data: Dict, index: int):
+        """分割线文件夹"""
+        separator_name = separator_data.get("separator_name", "separator").strip()
+
+        # If the separator name is empty, use "separator"
+        if not separator_name:
+            separator_name = "separator"
+
+        # Folder name: Serial number -separator- Separator name
+        folder_path = f"{index:02d}-separator-{separator_name}"
+        self._add_folder(folder_path, "separator",
+                         name=f"{index:02d} ----------------Separator {separator_name}----------------",
+                         description="This is a separator.",
+                         screenshot="")
+
+    def add_mod_file(self, mod_file_data: Dict, index: int):
+        """MOD文件文件夹"""
+        # Get module name
+        module_name = mod_file_data.get("module_name", "module").strip()
+
+        # If the module name is empty, use "module"
+        if not module_name:
+            module_name = "module"
+
+        # Folder name: Serial number -module name
+        folder_path = f"{index:02d}-{module_name}"
+
+        # Screenshot (if available)
+        screenshot_name = ""
+        if mod_file_data.get("image_path") and os.path.exists(mod_file_data["image_path"]):
+            screenshot_name = self._add_image_entry(folder_path, "screenshot", mod_file_data["image_path"])
+
+        # Files and folders
+        for file_data in mod_file_data.get("files", []):
+            # Handling tuple formats (path, name)
+            if isinstance(file_data, tuple) and len(file_data) >= 2:
+                source_path, file_name = file_data[0], file_data[1]
+            elif isinstance(file_data, dict):
+                source_path = file_data["path"]
+                file_name = file_data["name"]
+            else:
+                continue
+
+            if os.path.exists(source_path):
+                if os.path.isfile(source_path):
+                    self._add_file_entry(f"{folder_path}/{file_name}", source_path)
+                elif os.path.isdir(source_path):
+                    self._add_tree_entries(f"{folder_path}/{file_name}", source_path)
+
+        self._add_folder(folder_path, "mod_file",
+                         name=f"{index:02d} {module_name}",
+                         description=mod_file_data.get("description", ""),
+                         screenshot=screenshot_name)
+
+    def _add_folder(self, folder_path: str, kind: str, name: str, description: str, screenshot: str):
+        """登记文件夹及其modinfo.ini"""
+        modinfo = self._modinfo_content(name, description, screenshot)
+        # Same bytes as the text-mode file earlier versions wrote (CRLF on Windows)
+        self._add_data_entry(f"{folder_path}/modinfo.ini", modinfo.replace("\n", os.linesep).encode('utf-8'))
+        self.folders.append((folder_path, kind, modinfo))
+
+    def _modinfo_content(self, name: str, description: str, screenshot: str) -> str:
+        """modinfo.ini内容"""
+        mod_info = self.mod_info
+        return f"""
+        name={name}
+        version=v{self.version}
+        description={description}
+        category={mod_info["category"]}
+        screenshot={screenshot}
+        author={mod_info["author"]}
+        NameAsBundle={mod_info["name"]}
+        """
+
+    def _add_file_entry(self, arcname: str, source_path: str, image: bool = False):
+        """登记一个源文件条目"""
+        self.entries[arcname] = PlannedEntry(arcname, source_path, None, os.path.getsize(source_path), image)
+
+    def _add_image_entry(self, folder_path: str, base_name: str, image_path: str) -> str:
+        """登记一张预览图片，返回打包后的文件名（开启图片优化时扩展名可能改变）"""
+        ext = self.image_optimizer.target_extension(image_path) if self.image_optimizer else None
+        image_name = f"{base_name}{ext or os.path.splitext(image_path)[1]}"
+        self._add_file_entry(f"{folder_path}/{image_name}", image_path, image=bool(ext))
+        return image_name
+
+    def _add_data_entry(self, arcname: str, data: bytes):
+        """登记一个内存生成的条目"""
+        self.entries[arcname] = PlannedEntry(arcname, None, data, len(data))
+
+    def _add_tree_entries(self, arcname: str, source_dir: str):
+        """登记文件夹下的所有文件（未变化的文件夹沿用上一次计划的文件列表）"""
+        reused = self._reused_tree(arcname, source_dir)
+        if reused is not None:
+            for entry in reused:
+                self.entries[entry.arcname] = entry
+            return
+        for root, dirs, files in os.walk(source_dir):
+            dirs.sort()
+            for file in sorted(files):
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, source_dir).replace(os.sep, "/")
+                self._add_file_entry(f"{arcname}/{rel_path}", file_path)
+
+    def _reused_tree(self, arcname: str, source_dir: str) -> Optional[List[PlannedEntry]]:
+        """上一次计划中同一文件夹的条目，没有可沿用的计划时返回None"""
+        previous = self.reuse.get(arcname.split("/", 1)[0])
+        if previous is None:
+            return None
+        prefix = f"{arcname}/"
+        source_prefix = os.path.join(source_dir, "")
+        reused = [entry for entry in previous
+                  if entry.arcname.startswith(prefix) and entry.source and entry.source.startswith(source_prefix)]
+        # An empty folder is walked again, it may have been added after the previous build
+        return reused or None
+
+    @staticmethod
+    def _format_version(version: str) -> str:
+        """格式化版本号"""
+        if not version:
+            return version_info.VERSION_STRING
+
+        # Remove prefix characters (such as v, V, etc.)
+        formatted = version.strip()
+        while formatted and not formatted[0].isdigit():
+            formatted = formatted[1:]
+
+        # Remove spaces
+        formatted = formatted.replace(" ", "")
+
+        # Only keep allowed characters: digits, points, hyphens, underscores, and letters
+        allowed_chars = "0123456789.-_abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        formatted = ''.join(c for c in formatted if c in allowed_chars)
+
+        return formatted if formatted else version_info.VERSION_STRING
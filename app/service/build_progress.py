@@ -0,0 +1,136 @@
+# coding:utf-8
+"""
+Build Progress
+构建进度统计模块 - 按字节统计进度、吞吐量与剩余时间
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class BuildCancelled(Exception):
+    """构建已被用户取消"""
+
+
+class BuildProgress:
+    """构建进度统计
+
+    Copy and compression stages report processed bytes from any thread. The
+    tracker turns them into a snapshot (bytes/files done, current file, MB/s,
+    ETA) and hands it to `callback`, at most once every `min_interval` seconds
+    so the UI thread is not flooded on MODs with many small files.
+
+    Because every copy and compression loop reports here once per chunk, the
+    tracker is also where cancellation is checked: after `cancel()` the next
+    report raises BuildCancelled in whichever thread made it.
+    """
+    def __init__(self, callback: Callable[[Dict], None], min_interval: float = 0.1):
+        self.callback = callback
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self.bytes_total = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.files_done = 0
+        self.current_file = ""
+        self._started = 0.0
+        self._last_emit = 0.0
+        self._last_bytes = 0
+        self._speed = 0.0           # Smoothed bytes per second
+        self._cancel_event = threading.Event()
+
+    def start(self, bytes_total: int, files_total: int):
+        """开始计时并设置总量"""
+        with self._lock:
+            self.bytes_total = max(0, bytes_total)
+            self.files_total = max(0, files_total)
+            self.bytes_done = 0
+            self.files_done = 0
+            self.current_file = ""
+            self._started = self._last_emit = time.monotonic()
+            self._last_bytes = 0
+            self._speed = 0.0
+        self._emit(force=True)
+
+    def cancel(self):
+        """请求取消构建（可在任意线程调用）"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """已请求取消时抛出BuildCancelled"""
+        if self._cancel_event.is_set():
+            raise BuildCancelled()
+
+    def add_bytes(self, count: int, current_file: Optional[str] = None):
+        """累加已处理字节数"""
+        self.check_cancelled()
+        with self._lock:
+            self.bytes_done += count
+            if current_file is not None:
+                self.current_file = current_file
+        self._emit()
+
+    def file_done(self, current_file: Optional[str] = None):
+        """累加已完成文件数"""
+        self.check_cancelled()
+        with self._lock:
+            self.files_done += 1
+            if current_file is not None:
+                self.current_file = current_file
+        self._emit()
+
+    def finish(self):
+        """强制发送最终进度"""
+        self._emit(force=True)
+
+    @property
+    def fraction(self) -> float:
+        """已完成比例（0~1）"""
+        if self.bytes_total > 0:
+            return min(1.0, self.bytes_done / self.bytes_total)
+        if self.files_total > 0:
+            return min(1.0, self.files_done / self.files_total)
+        return 1.0
+
+    def snapshot(self) -> Dict:
+        """当前进度快照"""
+        with self._lock:
+            return self._snapshot_locked(time.monotonic())
+
+    def _snapshot_locked(self, now: float) -> Dict:
+        """生成快照（调用方持有锁）"""
+        elapsed = max(now - self._started, 1e-6)
+        speed = self._speed or (self.bytes_done / elapsed)
+        remaining = max(self.bytes_total - self.bytes_done, 0)
+        eta = remaining / speed if speed > 0 else -1
+        return {
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "current_file": self.current_file,
+            "fraction": self.fraction,
+            "speed_mbps": round(speed / (1024 * 1024), 2),
+            "eta_seconds": round(eta, 1),
+            "elapsed_seconds": round(elapsed, 1)
+        }
+
+    def _emit(self, force: bool = False):
+        """限频发送进度"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            interval = now - self._last_emit
+            if interval > 0 and self.bytes_done > self._last_bytes:
+                instant = (self.bytes_done - self._last_bytes) / interval
+                # Exponential smoothing keeps the ETA from jumping on every file
+                self._speed = instant if self._speed == 0 else self._speed * 0.7 + instant * 0.3
+            self._last_emit = now
+            self._last_bytes = self.bytes_done
+            snapshot = self._snapshot_locked(now)
+        self.callback(snapshot)
@@ -5,15 +5,80 @@
 """
 import os
 import json
+import zipfile
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+from .record_journal import RecordJournal, SORT_KEYS
+from .record_database import RecordDatabase
+
+RECORD_FILENAME = "FMMxMOD-Creator_build-record.jsonl"
+RECORD_DATABASE_FILENAME = "FMMxMOD-Creator_build-record.sqlite"
+LEGACY_RECORD_FILENAME = "FMMxMOD-Creator_build-record.json"   # Array format, still used inside backups
+
+RecordStore = Union[RecordJournal, RecordDatabase]
 
 class BuildRecordService:
     """构建记录服务类"""
     def __init__(self):
         self.cache_dir = None
+    
+    @staticmethod
+    def get_record_dir() -> str:
+        """获取构建记录所在目录"""
+        from ..common.application import FMMApplication
+        return os.path.join(os.path.dirname(FMMApplication.getConfigPath()), ".cache")
+    
+    @classmethod
+    def open_journal(cls) -> RecordJournal:
+        """打开构建记录日志（首次打开时导入旧的JSON数组文件）"""
+        record_dir = cls.get_record_dir()
+        return RecordJournal(os.path.join(record_dir, RECORD_FILENAME),
+                             os.path.join(record_dir, LEGACY_RECORD_FILENAME))
+    
+    @classmethod
+    def open_database(cls) -> RecordDatabase:
+        """打开构建记录数据库（新建时导入日志中的记录）"""
+        return RecordDatabase(os.path.join(cls.get_record_dir(), RECORD_DATABASE_FILENAME), cls.open_journal())
+    
+    @classmethod
+    def open_record_store(cls, backend: Optional[str] = None) -> RecordStore:
+        """
+        打开设置中选择的记录存储
         
-    def generate_build_record(self, build_data: Dict, output_path: str, temp_dir: str) -> str:
+        Args:
+            backend: "journal" 或 "sqlite"，默认取设置
+            
+        Returns:
+            RecordStore: 记录日志或记录数据库（接口相同）
+        """
+        from ..common.config import cfg
+        os.makedirs(cls.get_record_dir(), exist_ok=True)
+        if (backend or cfg.recordBackend) == "sqlite":
+            return cls.open_database()
+        return cls.open_journal()
+    
+    @classmethod
+    def switch_record_backend(cls, backend: str) -> int:
+        """
+        切换记录存储，把当前记录迁移到新的存储
+        
+        Args:
+            backend: "journal" 或 "sqlite"
+            
+        Returns:
+            int: 迁移的记录数
+        """
+        from ..common.config import cfg
+        current = cfg.recordBackend
+        if backend == current:
+            return 0
+        records = cls.open_record_store(current).load()
+        cls.open_record_store(backend).rewrite(records)
+        cfg.set("record_backend", backend)
+        return len(records)
+        
+    def generate_build_record(self, build_data: Dict, output_path: str, temp_dir: str,
+                              build_report: Optional[Dict] = None) -> str:
         """
         生成构建记录配置文件
         
@@ -21,23 +86,179 @@ class BuildRecordService:
             build_data: 构建数据
             output_path: 输出文件路径
             temp_dir: 临时目录路径
+            build_report: 构建统计信息（写入build_info）
             
         Returns:
-            str: 生成的配置文件路径
+            str: 记录存储的文件路径
         """
-        from ..common.application import FMMApplication
-        self.cache_dir = os.path.join(os.path.dirname(FMMApplication.getConfigPath()), ".cache")
+        self.cache_dir = self.get_record_dir()
  
         os.makedirs(self.cache_dir, exist_ok=True)                                      # Make sure the record directory exists
-        record_data = self._create_record_data(build_data, output_path, temp_dir)       # Generate recorded data
-        config_filename = "FMMxMOD-Creator_build-record.json"
-        config_path = os.path.join(self.cache_dir, config_filename)
-
-        self._append_record_data(config_path, record_data)                              # Append data to configuration file
+        record_data = self._create_record_data(build_data, output_path, temp_dir, build_report)  # Generate recorded data
+        store = self.open_record_store()
+        store.append(record_data)                                                       # One line or one row, never a rewrite
+            
+        return store.path
+    
+    @staticmethod
+    def open_record_file(config_path: str) -> Optional[RecordStore]:
+        """按文件格式打开记录日志或记录数据库，旧的JSON数组文件返回None"""
+        if RecordDatabase.is_database(config_path):
+            return RecordDatabase(config_path)
+        if RecordJournal.is_journal(config_path):
+            return RecordJournal(config_path)
+        return None
+    
+    @classmethod
+    def load_records(cls, config_path: str) -> List[Dict]:
+        """
+        读取构建记录配置文件
+        
+        Args:
+            config_path: 配置文件路径（记录日志、记录数据库或旧的JSON数组文件）
+            
+        Returns:
+            List[Dict]: 记录列表（单条记录的旧格式会被包装成列表）
+        """
+        store = cls.open_record_file(config_path)
+        if store is not None:
+            return store.load()
+        
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            raise ValueError(f"Unsupported build record format: {config_path}")
+        
+        return data
+    
+    @classmethod
+    def find_records(cls, config_path: str, **filters: str) -> List[Dict]:
+        """
+        按名称、作者、分类筛选记录文件（不区分大小写的精确匹配）
+        
+        Args:
+            config_path: 配置文件路径
+            filters: name / author / category
+            
+        Returns:
+            List[Dict]: 匹配的记录（数据库中为索引查询）
+        """
+        store = cls.open_record_file(config_path)
+        if store is not None:
+            return store.find(**filters)
+        
+        # A legacy array is filtered in memory
+        return [record for record in cls.load_records(config_path) if cls.match_record(record, **filters)]
+    
+    @staticmethod
+    def match_record(record: Dict, **filters: str) -> bool:
+        """判断记录是否符合筛选条件（与find_records相同的规则）"""
+        return all(SORT_KEYS[field](record) == str(value).casefold()
+                   for field, value in filters.items() if value is not None)
+    
+    @classmethod
+    def export_backup(cls, backup_path: str, records: Optional[List[Dict]] = None) -> int:
+        """
+        把记录导出为备份ZIP（内含旧的JSON数组格式，旧版本也能导入）
+        
+        Args:
+            backup_path: 备份ZIP路径
+            records: 要导出的记录，默认读取当前的记录存储
+        
+        Returns:
+            int: 导出的记录数
+        """
+        if records is None:
+            records = cls.open_record_store().load()
+        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr(LEGACY_RECORD_FILENAME, json.dumps(records, ensure_ascii=False, indent=2))
+        return len(records)
+    
+    @staticmethod
+    def read_backup(backup_path: str) -> List[Dict]:
+        """
+        读取备份ZIP中的记录
+        
+        Raises:
+            KeyError: ZIP中没有构建记录文件
+        """
+        with zipfile.ZipFile(backup_path, 'r') as zipf:
+            data = json.loads(zipf.read(LEGACY_RECORD_FILENAME).decode('utf-8'))
+        
+        if isinstance(data, dict):
+            data = [data]
+        return [record for record in data if isinstance(record, dict)] if isinstance(data, list) else []
+    
+    @classmethod
+    def import_backup(cls, backup_path: str, store: Optional[RecordStore] = None) -> int:
+        """
+        用备份ZIP中的记录替换当前记录
+        
+        Returns:
+            int: 导入的记录数
             
-        return config_path
+        Raises:
+            KeyError: ZIP中没有构建记录文件
+        """
+        records = cls.read_backup(backup_path)
+        (store or cls.open_record_store()).rewrite(records)
+        return len(records)
+    
+    @staticmethod
+    def record_to_build_data(record_data: Dict) -> Dict:
+        """
+        把构建记录还原为构建数据（_create_record_data的逆过程）
+        
+        Args:
+            record_data: 记录数据
+            
+        Returns:
+            Dict: 构建数据（mod_info / cover_data / sorted_blocks）
+        """
+        mod_info = record_data.get("mod_info", {})
+        cover_block = record_data.get("cover_block", {})
+        
+        cover_data = None
+        if cover_block:
+            cover_data = {
+                "image_path": cover_block.get("image_path", ""),
+                "description": cover_block.get("description", ""),
+                "cover_tag": cover_block.get("cover_tag", "")
+            }
+        
+        sorted_blocks = []
+        for block in record_data.get("content_blocks", []):
+            block_type = block.get("type", "")
+            if block_type == "mod_file":
+                block_data = {
+                    "type": "mod_file",
+                    "module_name": block.get("module_name", ""),
+                    "area_mark": block.get("area_mark", ""),
+                    "image_path": block.get("image_path", ""),
+                    "description": block.get("description", ""),
+                    "files": [(file_info.get("file_path", ""), file_info.get("file_name", ""))
+                              for file_info in block.get("files", [])]
+                }
+            else:
+                block_data = dict(block)
+            sorted_blocks.append(block_data)
+        
+        return {
+            "mod_info": {
+                "name": mod_info.get("name", ""),
+                "version": mod_info.get("version", ""),
+                "author": mod_info.get("author", ""),
+                "category": mod_info.get("category", "")
+            },
+            "cover_data": cover_data,
+            "sorted_blocks": sorted_blocks
+        }
     
-    def _create_record_data(self, build_data: Dict, output_path: str, temp_dir: str) -> Dict:
+    def _create_record_data(self, build_data: Dict, output_path: str, temp_dir: str,
+                            build_report: Optional[Dict] = None) -> Dict:
         """
         创建记录数据
         
@@ -45,6 +266,7 @@ class BuildRecordService:
             build_data: 构建数据
             output_path: 输出文件路径
             temp_dir: 临时目录路径
+            build_report: 构建统计信息
             
         Returns:
             Dict: 记录数据
@@ -71,6 +293,9 @@ class BuildRecordService:
             "block_order": self._get_block_order(cover_data, sorted_blocks)
         }
         
+        if build_report:
+            record_data["build_info"].update(build_report)
+        
         return record_data
     
     def _process_cover_data(self, cover_data: Optional[Dict]) -> Dict:
@@ -237,29 +462,3 @@ class BuildRecordService:
                 order.append(f"{block_type}_{index + 1}")
         
         return order
-    
-    def _append_record_data(self, config_path: str, record_data: Dict) -> None:
-        """
-        追加记录数据到配置文件
-        
-        Args:
-            config_path: 配置文件路径
-            record_data: 要追加的记录数据
-        """
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                
-                if not isinstance(existing_data, list):
-                    existing_data = [existing_data]
-                
-                existing_data.append(record_data)
-                
-            except (json.JSONDecodeError, IOError):
-                existing_data = [record_data]
-        else:
-            existing_data = [record_data]
-        
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
@@ -3,382 +3,160 @@
 Build Service
 构建服务模块
 """
-import os
-import shutil
-import tempfile
-import zipfile
-import rarfile
-import py7zr
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+import uuid
+from collections import deque
+from typing import Collection, Dict, List, Optional, Tuple
 from PySide6.QtCore import QObject, Signal, QThread
-from qfluentwidgets import InfoBar, InfoBarIcon
 from ..common.language import lang
-from ..common import version_info
 from ..common.config import cfg
-from ..common.application import FMMApplication
 from .build_record_service import BuildRecordService
+from .build_pipeline import BuildPipeline, validate_build_data, plan_build
+from .build_plan import BuildPlan
+from .build_progress import BuildCancelled
+from .resource_budget import ResourceBudget
 
 class BuildWorker(QThread):
-    """构建工作线程"""
+    """构建工作线程（在QThread中运行BuildPipeline）"""
     # signal definition
     progressChanged = Signal(int)  # Progress change signal
     statusChanged = Signal(str)    # state change signal
     buildCompleted = Signal(str)   # build completion signal
     buildFailed = Signal(str)      # Build failure signal
+    buildCancelled = Signal()      # Build cancelled signal
+    transferProgressChanged = Signal(dict)  # Byte progress signal (bytes, current file, MB/s, ETA)
     
-    def __init__(self, build_data: Dict, parent=None):
+    def __init__(self, build_data: Dict, parent=None, budget: Optional[ResourceBudget] = None,
+                 plan: Optional[BuildPlan] = None):
         super().__init__(parent)
-        self.build_data = build_data
-        self.temp_dir = None
-        self.output_path = None
+        self.pipeline = BuildPipeline(
+            build_data, budget,
+            on_progress=self.progressChanged.emit,
+            on_status=self.statusChanged.emit,
+            on_transfer=self.transferProgressChanged.emit,
+            plan=plan
+        )
+    
+    @property
+    def build_data(self) -> Dict:
+        return self.pipeline.build_data
+    
+    @property
+    def temp_dir(self) -> Optional[str]:
+        return self.pipeline.temp_dir
+    
+    @property
+    def build_report(self) -> Dict:
+        return self.pipeline.build_report
+    
+    @property
+    def plan(self) -> Optional[BuildPlan]:
+        return self.pipeline.plan
+    
+    def cancel(self):
+        """请求取消构建"""
+        self.pipeline.cancel()
     
     def run(self):
         """执行构建任务"""
         try:
-            # Step 1: Create a temporary directory
-            self.statusChanged.emit(lang.get_text("creating_temp_dir"))
-            self.progressChanged.emit(10)
-            self._create_temp_directory()
-            
-            # Step 2: Create a cover folder
-            self.statusChanged.emit(lang.get_text("creating_cover_folder"))
-            self.progressChanged.emit(20)
-            self._create_cover_folder()
-            
-            # Step 3: Create other block folders
-            self.statusChanged.emit(lang.get_text("creating_block_folders"))
-            self.progressChanged.emit(40)
-            self._create_block_folders()
-            
-            # Step 4: Create an archive file
-            self.statusChanged.emit(lang.get_text("creating_archive_file"))
-            self.progressChanged.emit(70)
-            self._create_archive_file()
-            
-            # Step 5: Move to the output directory
-            self.statusChanged.emit(lang.get_text("moving_to_output"))
-            self.progressChanged.emit(90)
-            self._move_to_output()
-            
-            # Step 6: Build completion
-            self.statusChanged.emit(lang.get_text("build_completed"))
-            self.progressChanged.emit(100)
-            self.buildCompleted.emit(self.output_path)
-            
+            output_path = self.pipeline.run()
+            self.buildCompleted.emit(output_path)
+        except BuildCancelled:
+            self.buildCancelled.emit()
         except Exception as e:
             error_msg = str(e)
             self.buildFailed.emit(error_msg)
-    
-    def _create_temp_directory(self):
-        """创建临时目录"""
-        mod_name = self.build_data["mod_info"]["name"]
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        folder_name = f"{mod_name}-{timestamp}"
-        
-        from ..common.config import cfg
-        cache_dir = cfg.cacheDirectory
-        os.makedirs(cache_dir, exist_ok=True)
 
-        self.temp_dir = os.path.join(cache_dir, folder_name)
-        os.makedirs(self.temp_dir, exist_ok=True)
-    
-    def _create_cover_folder(self):
-        """创建封面文件夹"""
-        cover_data = self.build_data["cover_data"]
-        if not cover_data:
-            raise Exception(lang.get_text("cover_data_missing"))
-        
-        # Create the 00-cover folder
-        cover_folder = os.path.join(self.temp_dir, "00-cover")
-        os.makedirs(cover_folder, exist_ok=True)
-        
-        # Copy the cover image
-        if cover_data["image_path"]:
-            image_path = cover_data["image_path"]
-            if os.path.exists(image_path):
-                # Get file extension
-                _, ext = os.path.splitext(image_path)
-                cover_image_name = f"cover{ext}"
-                cover_image_path = os.path.join(cover_folder, cover_image_name)
-                shutil.copy2(image_path, cover_image_path)
-            else:
-                raise Exception(f"{lang.get_text('cover_image_not_found')}: {image_path}")
-        
-        # Create `modinfo.ini` file
-        self._create_modinfo_file(
-            folder_path=cover_folder,
-            name="00 --------------Cover--------------",
-            description=cover_data["description"],
-            screenshot=cover_image_name if cover_data["image_path"] else ""
-        )
-    
-    def _create_block_folders(self):
-        """创建其他区块文件夹"""
-        # Get the user-sorted block data
-        sorted_blocks = self.build_data["sorted_blocks"]
-        
-        for index, block_data in enumerate(sorted_blocks, start=1):
-            block_type = block_data["type"]
-            
-            if block_type == "warning":
-                self._create_warning_folder(block_data, index)
-            elif block_type == "separator":
-                self._create_separator_folder(block_data, index)
-            elif block_type == "mod_file":
-                self._create_mod_file_folder(block_data, index)
-    
-    def _create_warning_folder(self, warning_data: Dict, index: int):
-        """创建警告文件夹"""
-        # Folder name: Serial number -warning
-        folder_name = f"{index:02d}-warning"
-        folder_path = os.path.join(self.temp_dir, folder_name)
-        os.makedirs(folder_path, exist_ok=True)
-        
-        # Copy warning image (if available)
-        screenshot_name = ""
-        if warning_data.get("image_path") and os.path.exists(warning_data["image_path"]):
-            image_path = warning_data["image_path"]
-            _, ext = os.path.splitext(image_path)
-            screenshot_name = f"warning{ext}"
-            warning_image_path = os.path.join(folder_path, screenshot_name)
-            shutil.copy2(image_path, warning_image_path)
-        
-        # Create `modinfo.ini` file
-        name = f"{index:02d} --------------Warning--------------"
-        self._create_modinfo_file(
-            folder_path=folder_path,
-            name=name,
-            description=warning_data.get("description", ""),
-            screenshot=screenshot_name
-        )
-    
-    def _create_separator_folder(self, separator_data: Dict, index: int):
-        """创建分割线文件夹"""
-        separator_name = separator_data.get("separator_name", "separator").strip()
-        
-        # If the separator name is empty, use "separator"
-        if not separator_name:
-            separator_name = "separator"
-        
-        # Folder name: Serial number -separator- Separator name
-        folder_name = f"{index:02d}-separator-{separator_name}"
-        folder_path = os.path.join(self.temp_dir, folder_name)
-        os.makedirs(folder_path, exist_ok=True)
-        
-        # Create `modinfo.ini` file
-        name = f"{index:02d} ----------------Separator {separator_name}----------------"
-        self._create_modinfo_file(
-            folder_path=folder_path,
-            name=name,
-            description="This is a separator.",
-            screenshot=""
-        )
-    
-    def _create_mod_file_folder(self, mod_file_data: Dict, index: int):
-        """创建MOD文件文件夹"""
-        # Get module name
-        module_name = mod_file_data.get("module_name", "module").strip()
-        
-        # If the module name is empty, use "module"
-        if not module_name:
-            module_name = "module"
-        
-        # Folder name: Serial number -module name
-        folder_name = f"{index:02d}-{module_name}"
-        folder_path = os.path.join(self.temp_dir, folder_name)
-        os.makedirs(folder_path, exist_ok=True)
-        
-        # Copy screenshot (if available)
-        screenshot_name = ""
-        if mod_file_data.get("image_path") and os.path.exists(mod_file_data["image_path"]):
-            image_path = mod_file_data["image_path"]
-            _, ext = os.path.splitext(image_path)
-            screenshot_name = f"screenshot{ext}"
-            screenshot_path = os.path.join(folder_path, screenshot_name)
-            shutil.copy2(image_path, screenshot_path)
-        
-        # Copy files and folders
-        files_data = mod_file_data.get("files", [])
-        for file_data in files_data:
-            # Handling tuple formats (path, name)
-            if isinstance(file_data, tuple) and len(file_data) >= 2:
-                source_path, file_name = file_data[0], file_data[1]
-            elif isinstance(file_data, dict):
-                source_path = file_data["path"]
-                file_name = file_data["name"]
-            else:
-                continue
-            
-            if os.path.exists(source_path):
-                if os.path.isfile(source_path):
-                    # Copy file
-                    dest_path = os.path.join(folder_path, file_name)
-                    shutil.copy2(source_path, dest_path)
-                elif os.path.isdir(source_path):
-                    # Copy folder
-                    dest_path = os.path.join(folder_path, file_name)
-                    shutil.copytree(source_path, dest_path)
-        
-        # Create `modinfo.ini` file
-        name = f"{index:02d} {module_name}"
-        self._create_modinfo_file(
-            folder_path=folder_path,
-            name=name,
-            description=mod_file_data.get("description", ""),
-            screenshot=screenshot_name
-        )
-    
-    def _create_modinfo_file(self, folder_path: str, name: str, description: str, screenshot: str):
-        """创建modinfo.ini文件"""
-        mod_info = self.build_data["mod_info"]
-        
-        # Format version number digits
-        version = self._format_version(mod_info["version"])
-        
-        # Create ini content
-        ini_content = f"""
-        name={name}
-        version=v{version}
-        description={description}
-        category={mod_info["category"]}
-        screenshot={screenshot}
-        author={mod_info["author"]}
-        NameAsBundle={mod_info["name"]}
-        """
-        
-        # Write file
-        ini_path = os.path.join(folder_path, "modinfo.ini")
-        with open(ini_path, 'w', encoding='utf-8') as f:
-            f.write(ini_content)
-    
-    def _format_version(self, version: str) -> str:
-        """格式化版本号"""
-        if not version:
-            return version_info.VERSION_STRING
-        
-        # Remove prefix characters (such as v, V, etc.)
-        formatted = version.strip()
-        while formatted and not formatted[0].isdigit():
-            formatted = formatted[1:]
-        
-        # Remove spaces
-        formatted = formatted.replace(" ", "")
-        
-        # Only keep allowed characters: digits, points, hyphens, underscores, and letters
-        allowed_chars = "0123456789.-_abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        formatted = ''.join(c for c in formatted if c in allowed_chars)
-        
-        return formatted if formatted else version_info.VERSION_STRING
-    
-    def _create_archive_file(self):
-        """根据配置的打包格式创建压缩文件"""
-        # Get configuration pack format
-        build_type = cfg.buildType.lower()
-        
-        # Compression file name and temporary folder name same
-        folder_name = os.path.basename(self.temp_dir)
-        
-        # Get .cache directory path
-        cache_dir = os.path.dirname(self.temp_dir)
-        
-        if build_type == "zip":
-            archive_name = f"{folder_name}.zip"
-            archive_path = os.path.join(cache_dir, archive_name)
-            self._create_zip(archive_path)
-        elif build_type == "rar":
-            archive_name = f"{folder_name}.rar"
-            archive_path = os.path.join(cache_dir, archive_name)
-            self._create_rar(archive_path)
-        elif build_type == "7z":
-            archive_name = f"{folder_name}.7z"
-            archive_path = os.path.join(cache_dir, archive_name)
-            self._create_7z(archive_path)
-        else:
-            archive_name = f"{folder_name}.zip"
-            archive_path = os.path.join(cache_dir, archive_name)
-            self._create_zip(archive_path)
-        
-        self.archive_path = archive_path
-    
-    def _create_zip(self, archive_path: str):
-        """创建ZIP文件"""
-        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(self.temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, self.temp_dir)
-                    zipf.write(file_path, arcname)
-    
-    def _create_rar(self, archive_path: str):
-        """创建RAR文件"""
-        # Because the rarfile library can only read rar files, not create them.  
-        # Here, we're actually creating a zip file and then changing the extension to rar.
-        zip_path = archive_path.replace('.rar', '.zip')
-        self._create_zip(zip_path)
-        # Rename to rar extension (still zip format)
-        if os.path.exists(zip_path):
-            shutil.move(zip_path, archive_path)
-    
-    def _create_7z(self, archive_path: str):
-        """创建7Z文件"""
-        with py7zr.SevenZipFile(archive_path, 'w') as archive:
-            for root, dirs, files in os.walk(self.temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, self.temp_dir)
-                    archive.write(file_path, arcname)
-    
-    def _move_to_output(self):
-        """移动到输出目录"""
-        build_dir = cfg.buildDirectory
-        if not build_dir or not build_dir.strip():
-            build_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "output")
-            build_dir = os.path.normpath(build_dir)
-        
-        os.makedirs(build_dir, exist_ok=True)
-        archive_name = os.path.basename(self.archive_path)
-        self.output_path = os.path.join(build_dir, archive_name)
-        
-        if os.path.exists(self.output_path):
-            os.remove(self.output_path)
-        
-        shutil.move(self.archive_path, self.output_path)
+
+class BuildJob:
+    """构建任务"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
     
-    def _cleanup_temp_directory(self):
-        """清理临时目录（已禁用，保留.cache中的缓存文件）"""
-        pass
+    def __init__(self, build_data: Dict, plan: Optional[BuildPlan] = None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.build_data = build_data
+        self.plan = plan            # Layout from a dry run, planned by the worker when None
+        self.mod_name = build_data["mod_info"]["name"]
+        self.state = BuildJob.QUEUED
+        self.progress = 0
+        self.output_path = ""
+        self.worker = None
 
 
 class BuildService(QObject):
-    """构建服务"""
+    """构建服务
+    
+    Builds are queued as jobs and run on up to `cfg.maxConcurrentBuilds` workers.
+    All workers share one ResourceBudget (compression threads capped at
+    `cfg.zipWorkers`, source reads at `cfg.ioBudgetMbps`), and two jobs of the
+    same MOD never run at once because they share its manifest and journal.
+    The job* signals carry the job id; the original signals are still emitted
+    for every job, with progressChanged reporting the whole batch.
+    """
     
     buildStarted = Signal()        # Build start signal
     progressChanged = Signal(int)  # Progress change signal
     statusChanged = Signal(str)    # state change signal
     buildCompleted = Signal(str)   # build completion signal
     buildFailed = Signal(str)      # build failure signal
+    buildCancelled = Signal()      # build cancelled signal
+    transferProgressChanged = Signal(dict)  # Byte progress signal (bytes, current file, MB/s, ETA)
+    
+    jobQueued = Signal(str)                     # job id
+    jobStarted = Signal(str)                    # job id
+    jobProgressChanged = Signal(str, int)       # job id, progress
+    jobStatusChanged = Signal(str, str)         # job id, status
+    jobTransferProgressChanged = Signal(str, dict)  # job id, byte progress snapshot
+    jobCompleted = Signal(str, str)             # job id, output path
+    jobFailed = Signal(str, str)                # job id, error message
+    jobCancelled = Signal(str)                  # job id
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.worker = None
+        self.jobs = {}              # job id -> BuildJob, for the current batch
+        self.queue = deque()        # Jobs waiting for a free worker
+        self.running = {}           # job id -> BuildJob
+        self.budget = None
+        self.last_plans = {}        # MOD name -> plan of its last completed build
     
     def validate_build_data(self, mod_info: Dict, cover_data: Optional[Dict], 
                           sorted_blocks: List[Dict]) -> Tuple[bool, str]:
         """验证构建数据"""
-        error_msg = self._validate_build_data(mod_info, cover_data, sorted_blocks)
+        error_msg = validate_build_data(mod_info, cover_data, sorted_blocks)
         if error_msg:
             return False, error_msg
         
         return True, ""
     
-    def start_build(self, mod_info: Dict, cover_data: Optional[Dict], sorted_blocks: List[Dict]):
-        """开始构建"""
+    def plan_build(self, mod_info: Dict, cover_data: Optional[Dict], sorted_blocks: List[Dict],
+                   estimate: bool = True, changed: Optional[Collection[int]] = None) -> BuildPlan:
+        """试运行：生成构建计划并估算压缩后大小，不复制任何文件
+        
+        Uses the same planner and settings as the build itself, so the plan can
+        be passed to start_build() unchanged. With `changed` (indexes of the
+        blocks whose files changed, 0 for the cover) the folders of the other
+        blocks are taken from the last completed build of the MOD instead of
+        being walked again. Raises ValueError when the build data is invalid.
+        """
+        build_data = {"mod_info": mod_info, "cover_data": cover_data, "sorted_blocks": sorted_blocks}
+        previous = self.last_plans.get(mod_info.get("name")) if changed is not None else None
+        return plan_build(build_data, estimate, previous, changed)
+    
+    def start_build(self, mod_info: Dict, cover_data: Optional[Dict], sorted_blocks: List[Dict],
+                    plan: Optional[BuildPlan] = None) -> str:
+        """将构建加入队列，返回任务ID（数据无效时返回空字符串）
+        
+        A plan from plan_build() is built as it is; without one the worker plans
+        the build when it starts.
+        """
         is_valid, error_msg = self.validate_build_data(mod_info, cover_data, sorted_blocks)
         if not is_valid:
             self.buildFailed.emit(error_msg)
-            return
+            return ""
         
         build_data = {
             "mod_info": mod_info,
@@ -386,77 +164,163 @@ class BuildService(QObject):
             "sorted_blocks": sorted_blocks
         }
         
-        self.worker = BuildWorker(build_data, self)
-        self.worker.progressChanged.connect(self.progressChanged.emit)
-        self.worker.statusChanged.connect(self.statusChanged.emit)
-        self.worker.buildCompleted.connect(self._on_build_completed)
-        self.worker.buildFailed.connect(self._on_build_failed)
-        self.buildStarted.emit()
-        self.worker.start()
+        if not self.is_building():
+            # A new batch: reset the aggregate progress and re-read the budget settings
+            self.jobs.clear()
+            self.budget = ResourceBudget(cfg.zipWorkers, int(cfg.ioBudgetMbps * 1024 * 1024))
+            self.buildStarted.emit()
+        
+        job = BuildJob(build_data, plan)
+        self.jobs[job.job_id] = job
+        self.queue.append(job)
+        self.jobQueued.emit(job.job_id)
+        self._schedule()
+        return job.job_id
+    
+    def is_building(self) -> bool:
+        """是否有正在运行或排队的构建"""
+        return bool(self.running or self.queue)
+    
+    def cancel_build(self, job_id: Optional[str] = None):
+        """取消构建；不指定任务ID时取消全部任务"""
+        for job in list(self.queue):
+            if job_id is None or job.job_id == job_id:
+                self.queue.remove(job)
+                self._finish_job(job, BuildJob.CANCELLED)
+                self.jobCancelled.emit(job.job_id)
+                self.buildCancelled.emit()
+        
+        for job in list(self.running.values()):
+            if job_id is None or job.job_id == job_id:
+                self.statusChanged.emit(lang.get_text("cancelling_build"))
+                self.jobStatusChanged.emit(job.job_id, lang.get_text("cancelling_build"))
+                job.worker.cancel()
+    
+    def _schedule(self):
+        """在并发上限内启动排队的任务"""
+        limit = cfg.maxConcurrentBuilds
+        running_mods = {job.mod_name for job in self.running.values()}
+        for job in list(self.queue):
+            if len(self.running) >= limit:
+                break
+            if job.mod_name in running_mods:
+                continue
+            self.queue.remove(job)
+            running_mods.add(job.mod_name)
+            self._start_job(job)
+    
+    def _start_job(self, job: BuildJob):
+        """启动任务的工作线程"""
+        job.state = BuildJob.RUNNING
+        job.worker = BuildWorker(job.build_data, self, self.budget, job.plan)
+        job.worker.progressChanged.connect(self._on_worker_progress_changed)
+        job.worker.statusChanged.connect(self._on_worker_status_changed)
+        job.worker.transferProgressChanged.connect(self._on_worker_transfer_progress_changed)
+        job.worker.buildCompleted.connect(self._on_build_completed)
+        job.worker.buildFailed.connect(self._on_build_failed)
+        job.worker.buildCancelled.connect(self._on_build_cancelled)
+        self.running[job.job_id] = job
+        self.jobStarted.emit(job.job_id)
+        job.worker.start()
+    
+    def _job_for_sender(self) -> Optional[BuildJob]:
+        """根据发出信号的工作线程查找任务"""
+        worker = self.sender()
+        for job in self.running.values():
+            if job.worker is worker:
+                return job
+        return None
+    
+    def _on_worker_progress_changed(self, progress: int):
+        """任务进度变化处理"""
+        job = self._job_for_sender()
+        if job is None:
+            return
+        job.progress = progress
+        self.jobProgressChanged.emit(job.job_id, progress)
+        self._emit_batch_progress()
+    
+    def _on_worker_status_changed(self, status: str):
+        """任务状态变化处理"""
+        job = self._job_for_sender()
+        if job is None:
+            return
+        self.jobStatusChanged.emit(job.job_id, status)
+        self.statusChanged.emit(status)
+    
+    def _on_worker_transfer_progress_changed(self, snapshot: Dict):
+        """任务字节进度变化处理"""
+        job = self._job_for_sender()
+        if job is None:
+            return
+        snapshot = dict(snapshot, job_id=job.job_id)
+        self.jobTransferProgressChanged.emit(job.job_id, snapshot)
+        self.transferProgressChanged.emit(snapshot)
+    
+    def _emit_batch_progress(self):
+        """发送整批任务的平均进度"""
+        if self.jobs:
+            self.progressChanged.emit(sum(job.progress for job in self.jobs.values()) // len(self.jobs))
     
     def _on_build_completed(self, output_path: str):
         """构建完成处理"""
+        job = self._job_for_sender()
+        if job is None:
+            return
+        
         # Generate build record profile
         try:
             record_service = BuildRecordService()
             record_service.generate_build_record(
-                self.worker.build_data,
+                job.build_data,
                 output_path,
-                self.worker.temp_dir
+                job.worker.temp_dir,
+                job.worker.build_report
             )
         except Exception as e:
             # Record generation failure does not affect build completion
             pass
         
+        job.output_path = output_path
+        if job.worker.plan is not None:
+            self.last_plans[job.mod_name] = job.worker.plan
+        self._finish_job(job, BuildJob.COMPLETED)
+        self.jobCompleted.emit(job.job_id, output_path)
         self.buildCompleted.emit(output_path)
-        self._cleanup_worker()
+        self._schedule()
     
     def _on_build_failed(self, error_msg: str):
         """构建失败处理"""
+        job = self._job_for_sender()
+        if job is None:
+            return
+        self._finish_job(job, BuildJob.FAILED)
+        self.jobFailed.emit(job.job_id, error_msg)
         self.buildFailed.emit(error_msg)
-        self._cleanup_worker()
+        self._schedule()
     
-    def _cleanup_worker(self):
-        """清理工作线程"""
-        if self.worker:
-            self.worker.quit()
-            self.worker.wait()
-            self.worker.deleteLater()
-            self.worker = None
+    def _on_build_cancelled(self):
+        """构建取消处理"""
+        job = self._job_for_sender()
+        if job is None:
+            return
+        self._finish_job(job, BuildJob.CANCELLED)
+        self.jobCancelled.emit(job.job_id)
+        self.buildCancelled.emit()
+        self._schedule()
     
-    def _validate_build_data(self, mod_info: Dict, cover_data: Optional[Dict], 
-                           sorted_blocks: List[Dict]) -> Optional[str]:
-        """验证构建数据，返回错误信息或None"""
-        if not mod_info.get("name", "").strip():
-            return lang.get_text("mod_name_required")
-        
-        if not mod_info.get("version", "").strip():
-            return lang.get_text("version_required")
-        
-        if not mod_info.get("author", "").strip():
-            return lang.get_text("author_required")
-        
-        # Note: The MOD category is a non-essential input item and is allowed to be empty
-        
-        if not cover_data:
-            return lang.get_text("cover_block_required")
-        
-        if cover_data.get("image_path") and not os.path.exists(cover_data["image_path"]):
-            return lang.get_text("cover_image_not_found")
-        
-        for block in sorted_blocks:
-            if block.get("type") == "mod_file":
-                files = block.get("files", [])
-                for file_info in files:
-                    if isinstance(file_info, tuple) and len(file_info) >= 2:
-                        file_path, file_name = file_info[0], file_info[1]
-                        if not os.path.exists(file_path):
-                            return f"{lang.get_text('file_not_found')}: {file_name}"
-                    elif isinstance(file_info, dict):
-                        if not os.path.exists(file_info.get("path", "")):
-                            return f"{lang.get_text('file_not_found')}: {file_info.get('name', '未知文件')}"
-        
-        if not sorted_blocks:
-            return lang.get_text("content_block_required")
-        
-        return None
\ No newline at end of file
+    def _finish_job(self, job: BuildJob, state: str):
+        """结束任务并清理其工作线程"""
+        job.state = state
+        job.progress = 100
+        self.running.pop(job.job_id, None)
+        self._cleanup_worker(job)
+        self._emit_batch_progress()
+    
+    def _cleanup_worker(self, job: BuildJob):
+        """清理工作线程"""
+        if job.worker:
+            job.worker.quit()
+            job.worker.wait()
+            job.worker.deleteLater()
+            job.worker = None
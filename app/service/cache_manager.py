@@ -0,0 +1,223 @@
+# coding:utf-8
+"""
+Cache Manager
+缓存管理模块 - 按大小与时限淘汰构建缓存
+"""
+import os
+import re
+import time
+import json
+import shutil
+from typing import Dict, Iterable, List
+
+GB = 1024 * 1024 * 1024
+DAY = 24 * 60 * 60
+GRACE_SECONDS = 10 * 60         # Items used this recently may belong to a running build
+
+# Cache folders are named "<mod>-<YYYYmmdd_HHMMSS>[-N]" by BuildPipeline, older versions used "<mod>-<YYYYmmdd_HHMM>"
+BUILD_FOLDER_PATTERN = re.compile(r"^(?P<mod>.+)-(?P<stamp>\d{8}_\d{4}(?:\d{2})?)(?:-(?P<seq>\d+))?$")
+ARCHIVE_SUFFIXES = (".zip", ".7z", ".rar", ".zip.partial", ".7z.partial", ".rar.partial")
+VOLUME_SUFFIX_PATTERN = re.compile(r"\.\d{3}$")      # Volumes of a split archive: ".zip.001"
+IMAGE_FOLDERS = ("images", "thumbnails")           # Optimized build images and list thumbnails, one item per file
+
+
+class CacheItem:
+    """可淘汰的缓存项（一次构建的暂存目录及其残留压缩包，或一张缓存图片/缩略图）"""
+    def __init__(self, key: str, paths: List[str], mod_name: str = "", order: tuple = ()):
+        self.key = key
+        self.paths = paths
+        self.mod_name = mod_name
+        self.order = order          # Build order within the MOD, newest is largest
+        self.size = 0
+        self.last_used = 0.0
+        self.pinned = False
+
+
+class CacheManager:
+    """构建缓存管理器
+
+    Every build leaves a staged copy of the MOD under the cache directory.
+    The manager treats each build folder (with any archive it left behind)
+    and each optimized image or list thumbnail as one item, last used at its mtime, and evicts
+    items older than `max_age_days`, then the least recently used ones until
+    the cache fits in `max_size_gb` (0 disables either limit).
+
+    The newest build of every MOD, folders of interrupted builds that a
+    journal may resume, and paths passed as `in_use` are pinned and never
+    evicted, and nothing used in the last few minutes is removed, since a
+    build running in parallel may still read it. Journals, manifests and
+    build records are counted in the size but never removed.
+    """
+    def __init__(self, cache_dir: str, max_size_gb: float = 0, max_age_days: float = 0):
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_gb * GB) if max_size_gb and max_size_gb > 0 else 0
+        self.max_age = max_age_days * DAY if max_age_days and max_age_days > 0 else 0
+
+    @staticmethod
+    def touch(path: str):
+        """把缓存项标记为刚刚使用"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def usage(self) -> Dict:
+        """统计缓存占用"""
+        items = self.scan()
+        total = self._tree_size(self.cache_dir, set())
+        return {
+            "size": total,
+            "items": len(items),
+            "pinned": sum(1 for item in items if item.pinned),
+            "max_size": self.max_size,
+            "max_age_days": round(self.max_age / DAY, 2) if self.max_age else 0
+        }
+
+    def scan(self, in_use: Iterable[str] = ()) -> List[CacheItem]:
+        """列出所有缓存项并标记固定项"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        items = {}
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            stem = name
+            archive_name = VOLUME_SUFFIX_PATTERN.sub("", name)
+            for suffix in ARCHIVE_SUFFIXES:
+                if os.path.isfile(path) and archive_name.endswith(suffix):
+                    stem = archive_name[:-len(suffix)]
+                    break
+            else:
+                if not os.path.isdir(path):
+                    continue
+            match = BUILD_FOLDER_PATTERN.match(stem)
+            if not match:
+                continue
+            item = items.get(stem)
+            if item is None:
+                # Stamps without seconds sort as second 00 of their minute
+                order = (match.group("stamp").ljust(15, "0"), int(match.group("seq") or 1))
+                item = items[stem] = CacheItem(stem, [], match.group("mod"), order)
+            item.paths.append(path)
+
+        for folder in IMAGE_FOLDERS:
+            image_dir = os.path.join(self.cache_dir, folder)
+            if not os.path.isdir(image_dir):
+                continue
+            for name in os.listdir(image_dir):
+                path = os.path.join(image_dir, name)
+                if os.path.isfile(path):
+                    items[f"{folder}/{name}"] = CacheItem(f"{folder}/{name}", [path])
+
+        seen = set()
+        for item in items.values():
+            for path in item.paths:
+                item.size += self._tree_size(path, seen)
+                try:
+                    item.last_used = max(item.last_used, os.stat(path).st_mtime)
+                except OSError:
+                    pass
+
+        self._pin(items, in_use)
+        return list(items.values())
+
+    def enforce(self, in_use: Iterable[str] = ()) -> Dict:
+        """按时限与大小上限淘汰缓存项，返回清理统计"""
+        return self._evict(in_use, evict_all=False)
+
+    def clear(self, in_use: Iterable[str] = ()) -> Dict:
+        """清理所有未固定的缓存项"""
+        return self._evict(in_use, evict_all=True)
+
+    def _evict(self, in_use: Iterable[str], evict_all: bool) -> Dict:
+        """淘汰缓存项"""
+        items = self.scan(in_use)
+        total = self._tree_size(self.cache_dir, set())
+        now = time.time()
+        removed = 0
+        freed = 0
+        # Least recently used first
+        for item in sorted(items, key=lambda item: item.last_used):
+            if item.pinned or now - item.last_used < GRACE_SECONDS:
+                continue
+            expired = self.max_age and now - item.last_used > self.max_age
+            oversized = self.max_size and total > self.max_size
+            if not (evict_all or expired or oversized):
+                continue
+            if self._remove(item):
+                removed += 1
+                freed += item.size
+                total -= item.size
+        return {"removed": removed, "freed": freed, "size": max(total, 0)}
+
+    def _pin(self, items: Dict[str, CacheItem], in_use: Iterable[str]):
+        """固定每个MOD最新的构建、可续建的构建与正在使用的目录"""
+        newest = {}
+        for item in items.values():
+            if item.mod_name and (item.mod_name not in newest or item.order > newest[item.mod_name].order):
+                newest[item.mod_name] = item
+        for item in newest.values():
+            item.pinned = True
+
+        pinned_names = {os.path.basename(os.path.normpath(path)) for path in in_use if path}
+        pinned_names.update(self._journaled_folders())
+        for name in pinned_names:
+            if name in items:
+                items[name].pinned = True
+
+    def _journaled_folders(self) -> List[str]:
+        """读取构建日志头部，找出中断构建的暂存目录"""
+        journal_dir = os.path.join(self.cache_dir, "journals")
+        if not os.path.isdir(journal_dir):
+            return []
+        folders = []
+        for name in os.listdir(journal_dir):
+            try:
+                with open(os.path.join(journal_dir, name), 'r', encoding='utf-8') as f:
+                    header = json.loads(f.readline())
+            except (OSError, ValueError):
+                continue
+            if isinstance(header, dict) and header.get("temp_dir"):
+                folders.append(os.path.basename(os.path.normpath(header["temp_dir"])))
+        return folders
+
+    def _remove(self, item: CacheItem) -> bool:
+        """删除缓存项，文件被占用时保留"""
+        success = True
+        for path in item.paths:
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                success = False
+        return success
+
+    @staticmethod
+    def _tree_size(path: str, seen: set) -> int:
+        """统计路径占用的字节数（硬链接只计一次）"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 0
+        if not os.path.isdir(path):
+            inode = (stat.st_dev, stat.st_ino)
+            if inode in seen:
+                return 0
+            seen.add(inode)
+            return stat.st_size
+
+        total = 0
+        for root, dirs, files in os.walk(path):
+            for file in files:
+                try:
+                    stat = os.stat(os.path.join(root, file))
+                except OSError:
+                    continue
+                inode = (stat.st_dev, stat.st_ino)
+                if inode in seen:
+                    continue
+                seen.add(inode)
+                total += stat.st_size
+        return total
@@ -0,0 +1,71 @@
+# coding:utf-8
+"""
+Cache Service
+缓存服务模块 - 在后台线程统计与清理构建缓存
+"""
+from typing import Dict, Optional
+from PySide6.QtCore import QObject, Signal, QThread
+from ..common.config import cfg
+from .cache_manager import CacheManager
+
+
+class CacheWorker(QThread):
+    """缓存统计/清理工作线程"""
+    resultReady = Signal(dict)     # Usage, plus removed/freed after a clean
+
+    def __init__(self, clear: bool = False, parent=None):
+        super().__init__(parent)
+        self.clear = clear
+
+    def run(self):
+        """统计缓存占用（需要时先清理）"""
+        manager = CacheManager(cfg.cacheDirectory, cfg.cacheMaxSizeGb, cfg.cacheMaxAgeDays)
+        result = {}
+        try:
+            if self.clear:
+                result.update(manager.clear())
+            result.update(manager.usage())
+        except OSError:
+            result.update(size=0, items=0, pinned=0)
+        self.resultReady.emit(result)
+
+
+class CacheService(QObject):
+    """缓存服务"""
+    usageChanged = Signal(dict)    # Cache usage, see CacheManager.usage
+    cacheCleared = Signal(dict)    # Clean result with removed/freed counts
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.worker: Optional[CacheWorker] = None
+        self._refresh_pending = False
+
+    def refreshUsage(self):
+        """在后台重新统计缓存占用"""
+        if self.worker is not None and self.worker.isRunning():
+            # Scan again once the running job is done
+            self._refresh_pending = True
+            return
+        self._start(clear=False)
+
+    def clearCache(self):
+        """在后台清理未固定的缓存"""
+        if self.worker is not None and self.worker.isRunning():
+            return
+        self._start(clear=True)
+
+    def _start(self, clear: bool):
+        """启动工作线程"""
+        self._refresh_pending = False
+        self.worker = CacheWorker(clear, self)
+        self.worker.resultReady.connect(lambda result, clear=clear: self._onResultReady(result, clear))
+        self.worker.start()
+
+    def _onResultReady(self, result: Dict, clear: bool):
+        """处理工作线程结果"""
+        if clear:
+            self.cacheCleared.emit(result)
+        self.usageChanged.emit(result)
+        if self._refresh_pending:
+            self.worker.wait()
+            self._start(clear=False)
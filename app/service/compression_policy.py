@@ -0,0 +1,133 @@
+# coding:utf-8
+"""
+Compression Policy
+压缩策略模块 - 按扩展名、大小与熵值为每个条目选择压缩方式
+"""
+import math
+import os
+import threading
+import zipfile
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# Policy names
+STORE = "store"         # Already-compressed payloads, stored as is
+FAST = "fast"           # Huge files, cheapest deflate
+DEFAULT = "default"     # Everything else, zlib default level
+MAX = "max"             # Small text-like files, best deflate
+
+POLICY_NAMES = (STORE, FAST, DEFAULT, MAX)
+
+DEFAULT_POLICY_TABLE = {
+    "store_extensions": [
+        ".png", ".jpg", ".jpeg", ".webp", ".gif",
+        ".zip", ".7z", ".rar", ".gz",
+        ".pak", ".bnk", ".wem", ".dds",
+        ".mp3", ".ogg", ".mp4", ".webm"
+    ],
+    "fast_extensions": [],
+    "max_extensions": [".ini", ".txt", ".json", ".xml", ".lua", ".cfg", ".csv", ".md"],
+    "store_max_size": 64,                   # Files up to this size are stored
+    "fast_min_size": 256 * 1024 * 1024,     # Files from this size use fast deflate
+    "entropy_threshold": 7.5,               # Bits per byte above which a probe counts as incompressible
+    "probe_size": 4096                      # Bytes sampled from unknown files
+}
+
+# ZIP method per policy: (compress_type, compresslevel)
+ZIP_METHODS = {
+    STORE: (zipfile.ZIP_STORED, None),
+    FAST: (zipfile.ZIP_DEFLATED, 1),
+    DEFAULT: (zipfile.ZIP_DEFLATED, -1),
+    MAX: (zipfile.ZIP_DEFLATED, 9)
+}
+
+
+class CompressionPolicy:
+    """压缩策略引擎
+
+    Picks a policy per entry from a configurable extension and size table, falls
+    back to an entropy probe on the first few KB of unknown files, and keeps
+    per-policy byte and time counters so the table can be tuned.
+    """
+    def __init__(self, table: Optional[Dict] = None):
+        merged = dict(DEFAULT_POLICY_TABLE)
+        merged.update(table or {})
+        self.store_extensions = self._normalize_extensions(merged["store_extensions"])
+        self.fast_extensions = self._normalize_extensions(merged["fast_extensions"])
+        self.max_extensions = self._normalize_extensions(merged["max_extensions"])
+        self.store_max_size = int(merged["store_max_size"])
+        self.fast_min_size = int(merged["fast_min_size"])
+        self.entropy_threshold = float(merged["entropy_threshold"])
+        self.probe_size = int(merged["probe_size"])
+        self._lock = threading.Lock()
+        self._stats = {name: {"files": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+                       for name in POLICY_NAMES}
+
+    @staticmethod
+    def _normalize_extensions(extensions) -> frozenset:
+        """统一扩展名格式（小写，带点）"""
+        normalized = set()
+        for ext in extensions:
+            ext = str(ext).strip().lower()
+            if ext and not ext.startswith("."):
+                ext = f".{ext}"
+            if ext:
+                normalized.add(ext)
+        return frozenset(normalized)
+
+    @staticmethod
+    def estimate_entropy(data: bytes) -> float:
+        """估算数据的香农熵（比特/字节）"""
+        if not data:
+            return 0.0
+        total = len(data)
+        entropy = 0.0
+        for count in Counter(data).values():
+            p = count / total
+            entropy -= p * math.log2(p)
+        return entropy
+
+    def choose(self, name: str, size: int, head: bytes = b"") -> str:
+        """为条目选择压缩策略
+
+        Args:
+            name: 条目名称（用于判断扩展名）
+            size: 未压缩大小
+            head: 文件开头的数据，用于熵值探测
+        """
+        ext = os.path.splitext(name)[1].lower()
+        if size <= self.store_max_size or ext in self.store_extensions:
+            return STORE
+        if ext in self.max_extensions:
+            return MAX
+        if size >= self.fast_min_size or ext in self.fast_extensions:
+            return FAST
+        if head and self.estimate_entropy(head[:self.probe_size]) >= self.entropy_threshold:
+            return STORE
+        return DEFAULT
+
+    def zip_method(self, policy: str) -> Tuple[int, Optional[int]]:
+        """返回策略对应的ZIP压缩方式与级别"""
+        return ZIP_METHODS.get(policy, ZIP_METHODS[DEFAULT])
+
+    def record(self, policy: str, bytes_in: int, bytes_out: int, seconds: float):
+        """记录一次压缩的统计数据（线程安全）"""
+        with self._lock:
+            stats = self._stats[policy]
+            stats["files"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["seconds"] += seconds
+
+    def report(self) -> Dict[str, Dict]:
+        """按策略汇总的字节数、耗时与压缩率"""
+        report = {}
+        with self._lock:
+            for name, stats in self._stats.items():
+                if not stats["files"]:
+                    continue
+                entry = dict(stats)
+                entry["seconds"] = round(entry["seconds"], 3)
+                entry["ratio"] = round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else 1.0
+                report[name] = entry
+        return report
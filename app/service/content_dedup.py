@@ -0,0 +1,78 @@
+# coding:utf-8
+"""
+Content Dedup
+内容去重模块 - 找出不同模块中内容相同的文件，只压缩一次
+"""
+import time
+from typing import Callable, Dict, Iterable, Optional
+from .resource_budget import ResourceBudget
+from .entry_stream import hash_entry, source_stat
+
+
+class ContentDedup:
+    """内容去重索引
+
+    Only entries whose size matches another entry are hashed, so unique files
+    cost a stat and nothing more. Within each group of identical payloads the
+    first entry in archive order stays the original; every later one gets a
+    "duplicate_of" key naming it, which the archive writers use to copy the
+    compressed bytes (ZIP) or to place the copy next to the original inside
+    one solid block (7z).
+    """
+    def __init__(self, budget: Optional[ResourceBudget] = None,
+                 on_chunk: Optional[Callable[[int], None]] = None):
+        self.budget = budget or ResourceBudget()
+        self.on_chunk = on_chunk or (lambda count: None)   # Called per chunk read, may raise to cancel
+        self._stats = {"groups": 0, "files": 0, "bytes": 0, "hashed_files": 0, "hashed_bytes": 0, "seconds": 0.0}
+
+    def mark_duplicates(self, entries: Iterable[Dict]) -> int:
+        """为重复内容的条目标记duplicate_of与content，返回重复条目数"""
+        started = time.perf_counter()
+        by_size = {}
+        for entry in entries:
+            entry.pop("duplicate_of", None)
+            entry.pop("has_duplicates", None)
+            if entry["size"] > 0:
+                by_size.setdefault(entry["size"], []).append(entry)
+
+        duplicates = 0
+        for size, group in by_size.items():
+            if len(group) < 2:
+                continue
+            originals = {}
+            for entry in group:
+                content = self._hash_entry(entry)
+                entry["content"] = content
+                original = originals.setdefault(content, entry)
+                if original is entry:
+                    continue
+                entry["duplicate_of"] = original["arcname"]
+                if not original.get("has_duplicates"):
+                    original["has_duplicates"] = True
+                    self._stats["groups"] += 1
+                duplicates += 1
+                self._stats["files"] += 1
+                self._stats["bytes"] += size
+
+        self._stats["seconds"] += time.perf_counter() - started
+        return duplicates
+
+    def report(self) -> Dict:
+        """重复内容统计"""
+        report = dict(self._stats)
+        report["seconds"] = round(report["seconds"], 3)
+        return report
+
+    def _hash_entry(self, entry: Dict) -> str:
+        """计算条目内容的SHA-256（ZIP写入器复制重复内容时记录哈希前的stat）"""
+        entry["content_stat"] = source_stat(entry)
+        content = hash_entry(entry, self._consume)
+        self._stats["hashed_files"] += 1
+        self._stats["hashed_bytes"] += entry["size"]
+        return content
+
+    def _consume(self, count: int):
+        """扣除磁盘带宽配额并回调on_chunk"""
+        self.budget.consume_io(count)
+        self.on_chunk(count)
+
@@ -0,0 +1,68 @@
+# coding:utf-8
+"""
+Entry Stream
+条目数据流模块 - ZIP与7z写入器共用的分块读取与压缩数据暂存
+"""
+import os
+import hashlib
+import tempfile
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024            # Read/compress block size
+SPOOL_MAX_SIZE = 8 * 1024 * 1024    # Compressed data above this size spills to disk
+
+
+def read_chunks(entry: Dict) -> Iterator[bytes]:
+    """逐块读取条目数据（源文件或内存中的data）"""
+    if not entry["source"]:
+        yield entry["data"]
+        return
+    with open(entry["source"], 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def hash_entry(entry: Dict, on_chunk: Optional[Callable[[int], None]] = None, prefix: bytes = b"") -> str:
+    """计算条目内容（前缀prefix）的SHA-256，每读一块以字节数调用on_chunk"""
+    sha256 = hashlib.sha256(prefix)
+    for chunk in read_chunks(entry):
+        if on_chunk is not None:
+            on_chunk(len(chunk))
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def hash_file(path: str, on_chunk: Optional[Callable[[int], None]] = None, prefix: bytes = b"") -> str:
+    """计算文件内容的SHA-256"""
+    return hash_entry({"source": path, "data": None}, on_chunk, prefix)
+
+
+def source_stat(entry: Dict) -> Optional[Tuple[int, int]]:
+    """源文件的大小与修改时间（须在读取内容之前取得；内存中的条目返回None）
+
+    Taken before the bytes are read, a stat can only be older than the
+    content it is recorded with, so an edit during the build shows up as a
+    changed mtime on the next one instead of hiding behind a fresh stat.
+    """
+    if not entry["source"]:
+        return None
+    stat = os.stat(entry["source"])
+    return stat.st_size, stat.st_mtime_ns
+
+
+def stat_matches(reuse: Dict, stat: Optional[Tuple[int, int]]) -> bool:
+    """读取前的stat是否仍是复用标记所依据的大小与修改时间"""
+    return stat is None or (reuse.get("size"), reuse.get("mtime_ns")) == stat
+
+
+def stat_result(stat: Optional[Tuple[int, int]]) -> Dict:
+    """写入结果中记录的源文件大小与修改时间"""
+    return {"source_size": stat[0], "mtime_ns": stat[1]} if stat is not None else {}
+
+
+def spool_file(spool_dir: Optional[str] = None):
+    """存放压缩数据的临时文件，超过SPOOL_MAX_SIZE后落盘"""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=spool_dir)
@@ -0,0 +1,195 @@
+# coding:utf-8
+"""
+Image Optimizer
+图片优化模块 - 构建时缩放并重新编码封面、警告与预览图片
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+from PIL import Image, ImageOps
+from .entry_stream import hash_file
+
+IMAGE_FORMATS = ("auto", "jpeg", "png", "webp")
+FORMAT_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}
+CACHE_VERSION = 1                   # Bump when the encoder settings below change
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    """图片是否带透明通道"""
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _target_format(image: Image.Image, image_format: str) -> str:
+    """确定输出格式（auto：透明图片用PNG，其余用JPEG）"""
+    if image_format != "auto":
+        return image_format
+    return "png" if _has_alpha(image) else "jpeg"
+
+
+def _normalize_extension(path: str) -> str:
+    """小写扩展名，.jpeg视为.jpg"""
+    ext = os.path.splitext(path)[1].lower()
+    return ".jpg" if ext == ".jpeg" else ext
+
+
+def optimize_image(source_path: str, cache_dir: str, max_size: int, image_format: str, quality: int) -> Dict:
+    """在工作进程中优化单张图片，返回实际要打包的文件
+
+    The result is cached under `cache_dir` by source content and settings. When
+    re-encoding does not make the file smaller and the format is unchanged, a
+    `.keep` marker is cached instead and the source file is used as it is.
+    """
+    chunk_sizes = []
+    key = hash_file(source_path, chunk_sizes.append, f"{CACHE_VERSION}:{max_size}:{image_format}:{quality}:".encode())
+    source_size = sum(chunk_sizes)
+
+    result = {"path": source_path, "source_size": source_size, "size": source_size, "cached": False}
+    for ext in FORMAT_EXTENSIONS.values():
+        cached_path = os.path.join(cache_dir, key + ext)
+        if os.path.isfile(cached_path):
+            # Mark as recently used for the cache manager
+            os.utime(cached_path)
+            result.update(path=cached_path, size=os.path.getsize(cached_path), cached=True)
+            return result
+    keep_path = os.path.join(cache_dir, key + ".keep")
+    if os.path.isfile(keep_path):
+        os.utime(keep_path)
+        result["cached"] = True
+        return result
+
+    with Image.open(source_path) as image:
+        target = _target_format(image, image_format)
+        image = ImageOps.exif_transpose(image)
+        if max(image.size) > max_size:
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        if target == "jpeg":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+        # Drop EXIF, ICC profiles and text chunks
+        image.info = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        dest_path = os.path.join(cache_dir, key + FORMAT_EXTENSIONS[target])
+        temp_path = f"{dest_path}.{os.getpid()}.tmp"
+        try:
+            if target == "jpeg":
+                image.save(temp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+            elif target == "webp":
+                image.save(temp_path, "WEBP", quality=quality, method=4)
+            else:
+                image.save(temp_path, "PNG", optimize=True)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    output_size = os.path.getsize(temp_path)
+    if output_size >= source_size and _normalize_extension(source_path) == FORMAT_EXTENSIONS[target]:
+        # Re-encoding did not help, keep the original file
+        os.remove(temp_path)
+        open(keep_path, 'wb').close()
+        return result
+
+    os.replace(temp_path, dest_path)
+    result.update(path=dest_path, size=output_size)
+    return result
+
+
+class ImageOptimizer:
+    """构建时图片优化器
+
+    Cover, warning and screenshot images are downscaled to fit `max_size`,
+    re-encoded (`auto` picks JPEG, or PNG for images with transparency) and
+    stripped of metadata. Pillow work runs in a process pool, one image per
+    task, and results are cached under `<cache>/images` keyed by the source
+    hash and the settings, so rebuilds only pay for hashing.
+    """
+    def __init__(self, cache_dir: str, max_size: int = 1920, image_format: str = "auto",
+                 quality: int = 85, workers: int = 0):
+        self.cache_dir = os.path.join(cache_dir, "images")
+        self.max_size = max_size
+        self.image_format = image_format if image_format in IMAGE_FORMATS else "auto"
+        self.quality = quality
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self._stats = {"images": 0, "optimized": 0, "cached": 0, "failed": 0,
+                       "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+
+    def target_extension(self, image_path: str) -> Optional[str]:
+        """打包后的图片扩展名（只读取图片头部），图片无法优化时返回None"""
+        try:
+            with Image.open(image_path) as image:
+                if getattr(image, "n_frames", 1) > 1:
+                    # Animated images are kept as they are
+                    return None
+                target = _target_format(image, self.image_format)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+        if _normalize_extension(image_path) == FORMAT_EXTENSIONS[target]:
+            return os.path.splitext(image_path)[1]
+        return FORMAT_EXTENSIONS[target]
+
+    def optimize(self, entries: List[Dict], check_cancelled: Optional[Callable[[], None]] = None) -> Dict[str, str]:
+        """并行优化条目中的图片，并把条目的源文件替换为优化结果
+
+        Returns the entries renamed back to their source extension because
+        they could not be optimized (planned arcname -> restored arcname);
+        the modinfo.ini lines naming them must be updated to match.
+        """
+        jobs = list(entries)
+        renamed = {}
+        if not jobs:
+            return renamed
+
+        started = time.perf_counter()
+        executor = ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)))
+        try:
+            pending = {executor.submit(optimize_image, entry["source"], self.cache_dir, self.max_size,
+                                       self.image_format, self.quality): entry for entry in jobs}
+            while pending:
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if check_cancelled is not None:
+                    check_cancelled()
+                for future in done:
+                    entry = pending.pop(future)
+                    planned = entry["arcname"]
+                    self._apply(entry, future)
+                    if entry["arcname"] != planned:
+                        renamed[planned] = entry["arcname"]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._stats["seconds"] += time.perf_counter() - started
+        return renamed
+
+    def report(self) -> Dict:
+        """图片优化统计"""
+        report = dict(self._stats)
+        report["seconds"] = round(report["seconds"], 3)
+        report.update(max_size=self.max_size, format=self.image_format)
+        return report
+
+    def _apply(self, entry: Dict, future):
+        """记录单张图片的优化结果"""
+        self._stats["images"] += 1
+        try:
+            result = future.result()
+        except Exception:
+            # Unreadable or unsupported image: pack the original under its own extension
+            self._stats["failed"] += 1
+            self._stats["bytes_in"] += entry["size"]
+            self._stats["bytes_out"] += entry["size"]
+            base, ext = os.path.splitext(entry["arcname"])
+            source_ext = os.path.splitext(entry["source"])[1]
+            if ext != source_ext:
+                entry["arcname"] = base + source_ext
+            return
+
+        self._stats["bytes_in"] += result["source_size"]
+        self._stats["bytes_out"] += result["size"]
+        if result["cached"]:
+            self._stats["cached"] += 1
+        if result["path"] != entry["source"]:
+            self._stats["optimized"] += 1
+            entry["source"] = result["path"]
+            entry["size"] = result["size"]
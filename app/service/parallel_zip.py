@@ -0,0 +1,334 @@
+# coding:utf-8
+"""
+Parallel ZIP Writer
+并行ZIP写入模块
+"""
+import io
+import os
+import time
+import struct
+import hashlib
+import zlib
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+from .compression_policy import CompressionPolicy
+from .build_progress import BuildProgress
+from .build_journal import BuildJournal
+from .resource_budget import ResourceBudget
+from .split_volumes import VolumeWriter, VolumeReader, open_archive
+from .entry_stream import CHUNK_SIZE, hash_entry, read_chunks, spool_file, source_stat, stat_matches, stat_result
+
+
+class CompressedEntry:
+    """已压缩的ZIP条目"""
+    def __init__(self, zinfo: zipfile.ZipInfo, stream, sha256: str = "", reused: bool = False,
+                 source: Optional[str] = None, origin=None, duplicate_of: Optional[str] = None,
+                 stat: Optional[Tuple[int, int]] = None):
+        self.zinfo = zinfo
+        self.stream = stream
+        self.sha256 = sha256
+        self.reused = reused
+        self.source = source
+        self.origin = origin        # Archive the reused bytes are copied from
+        self.duplicate_of = duplicate_of    # Earlier entry with the same content
+        self.stat = stat            # Source size and mtime taken before its bytes were read
+
+    def close(self):
+        """释放压缩数据"""
+        if self.stream is not None:
+            self.stream.close()
+
+
+class ParallelZipWriter:
+    """并行ZIP写入器
+
+    Entries are deflated on a thread pool (zlib releases the GIL) and the finished
+    compressed streams are appended to the archive in submission order, so the
+    result is the same archive `zipfile.ZipFile.write` would produce.
+
+    Each entry is stored or deflated at the level picked by `policy`.
+
+    Entries carrying a "reuse" marker (see BuildManifest.reuse_candidate) are not
+    recompressed: their raw compressed bytes are copied from `previous_archive`,
+    or from `resume_archive` (the partial archive of an interrupted build) when
+    the marker says so. Written entries are appended to `journal` as they land.
+
+    Entries marked "duplicate_of" by ContentDedup are not compressed either: the
+    compressed bytes of the original, already written earlier in this archive,
+    are copied under the new name.
+
+    With a shared `budget`, each compression task holds one of its CPU slots and
+    every chunk read is charged against its disk bandwidth.
+
+    With `volume_size` the archive is written straight into volumes of that
+    size (see VolumeWriter) instead of one file.
+    """
+    def __init__(self, archive_path: str, workers: int = 0, spool_dir: Optional[str] = None,
+                 previous_archive: Optional[str] = None, policy: Optional[CompressionPolicy] = None,
+                 progress: Optional[BuildProgress] = None, resume_archive=None,
+                 journal: Optional[BuildJournal] = None, budget: Optional[ResourceBudget] = None,
+                 volume_size: int = 0):
+        self.archive_path = archive_path
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.spool_dir = spool_dir
+        self.policy = policy or CompressionPolicy()
+        self.progress = progress
+        self.journal = journal
+        self.budget = budget or ResourceBudget()
+        self.results = {}           # arcname -> crc/size/hash of the written entry
+        self.dedup = {"files": 0, "bytes": 0, "compressed_bytes": 0}
+        self._reader = None         # Read handle on this archive, for copying duplicates, opened once per write
+        self._previous = None
+        self._previous_file = None  # File (or joined volumes) under the previous archive
+        if previous_archive:
+            try:
+                self._previous_file = open_archive(previous_archive)
+                self._previous = zipfile.ZipFile(self._previous_file, 'r')
+            except (OSError, zipfile.BadZipFile):
+                self._close_previous_file()
+        self._resume = resume_archive
+        self._volumes = VolumeWriter(archive_path, volume_size) if volume_size > 0 else None
+        self._zip = zipfile.ZipFile(self._volumes or archive_path, 'w', zipfile.ZIP_DEFLATED)
+
+    @property
+    def volume_paths(self) -> List[str]:
+        """已写入的分卷（未分卷时为空）"""
+        return list(self._volumes.paths) if self._volumes is not None else []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_entries(self, entries: Iterable[Dict]):
+        """压缩并按顺序写入所有条目"""
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                for entry in entries:
+                    pending.append(executor.submit(self._compress_entry, entry))
+                    # Keep a bounded window of finished-but-unwritten entries
+                    if len(pending) >= self.workers * 2:
+                        self._write_compressed(pending.popleft().result())
+                while pending:
+                    self._write_compressed(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+                for future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        future.result().close()
+
+    def close(self):
+        """写入中央目录并关闭文件"""
+        try:
+            self._zip.close()
+        finally:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+            for archive in (self._previous, self._resume):
+                if archive is not None:
+                    archive.close()
+            self._previous = None
+            self._resume = None
+            self._close_previous_file()
+            if self._volumes is not None:
+                self._volumes.close()
+
+    def _close_previous_file(self):
+        """关闭上一次压缩包的文件"""
+        if self._previous_file is not None:
+            self._previous_file.close()
+            self._previous_file = None
+
+    def _previous_zinfo(self, entry: Dict, size: int):
+        """查找上一次（或中断的）压缩包中可复用的条目，返回(压缩包, ZipInfo)"""
+        reuse = entry.get("reuse")
+        if not reuse:
+            return None, None
+        archive = self._resume if reuse.get("resume") else self._previous
+        if archive is None:
+            return None, None
+        zinfo = archive.NameToInfo.get(entry["arcname"])
+        # Entries written with a data descriptor or encryption are not copied
+        if zinfo is None or zinfo.flag_bits & 0x09:
+            return None, None
+        if zinfo.file_size != size:
+            return None, None
+        return archive, zinfo
+
+    def _new_zinfo(self, entry: Dict) -> zipfile.ZipInfo:
+        """创建条目的ZipInfo"""
+        if entry["source"]:
+            zinfo = zipfile.ZipInfo.from_file(entry["source"], entry["arcname"])
+        else:
+            zinfo = zipfile.ZipInfo(entry["arcname"], date_time=time.localtime(time.time())[:6])
+            zinfo.external_attr = 0o600 << 16
+        return zinfo
+
+    def _compress_entry(self, entry: Dict) -> CompressedEntry:
+        """在工作线程中压缩单个条目（占用一个共享CPU配额）"""
+        with self.budget.cpu_slot():
+            return self._encode_entry(entry)
+
+    def _encode_entry(self, entry: Dict) -> CompressedEntry:
+        """压缩单个条目"""
+        if entry.get("duplicate_of"):
+            # The content hash was taken by ContentDedup, so is the stat that goes with it
+            return CompressedEntry(self._new_zinfo(entry), None, entry["content"], source=entry["source"],
+                                   duplicate_of=entry["duplicate_of"], stat=entry.get("content_stat"))
+
+        stat = source_stat(entry)
+        size = stat[0] if stat is not None else len(entry["data"])
+        origin, previous_zinfo = self._previous_zinfo(entry, size)
+        if previous_zinfo is not None:
+            expected_hash = entry["reuse"]["sha256"]
+            if not entry["reuse"]["verify"] and stat_matches(entry["reuse"], stat):
+                return CompressedEntry(previous_zinfo, None, expected_hash, reused=True,
+                                       source=entry["source"], origin=origin, stat=stat)
+            # Touched since it was last written: only reuse if the content is unchanged
+            if expected_hash and hash_entry(entry, self.budget.consume_io) == expected_hash:
+                return CompressedEntry(previous_zinfo, None, expected_hash, reused=True,
+                                       source=entry["source"], origin=origin, stat=stat)
+
+        started = time.perf_counter()
+        stream = spool_file(self.spool_dir)
+        sha256 = hashlib.sha256()
+        crc = 0
+        file_size = 0
+        try:
+            with closing(read_chunks(entry)) as chunks:
+                # The first chunk doubles as the entropy probe for unknown files
+                first_chunk = next(chunks, b"")
+                policy = self.policy.choose(entry["arcname"], size, first_chunk)
+                compress_type, level = self.policy.zip_method(policy)
+                if compress_type == zipfile.ZIP_STORED:
+                    compressor = None
+                else:
+                    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+
+                for chunk in chain((first_chunk,), chunks):
+                    self.budget.consume_io(len(chunk))
+                    crc = zlib.crc32(chunk, crc)
+                    sha256.update(chunk)
+                    file_size += len(chunk)
+                    stream.write(compressor.compress(chunk) if compressor else chunk)
+                    if self.progress is not None:
+                        self.progress.add_bytes(len(chunk), entry["arcname"])
+                if compressor:
+                    stream.write(compressor.flush())
+        except BaseException:
+            stream.close()
+            raise
+
+        zinfo = self._new_zinfo(entry)
+        zinfo.compress_type = compress_type
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = stream.tell()
+        stream.seek(0)
+        self.policy.record(policy, file_size, zinfo.compress_size, time.perf_counter() - started)
+        return CompressedEntry(zinfo, stream, sha256.hexdigest(), source=entry["source"], stat=stat)
+
+    def _write_compressed(self, compressed: CompressedEntry):
+        """把已压缩的数据原样写入压缩包"""
+        try:
+            if compressed.duplicate_of:
+                zinfo = self._copy_duplicate(compressed.zinfo, compressed.duplicate_of)
+                if self.progress is not None:
+                    self.progress.add_bytes(zinfo.file_size, zinfo.filename)
+            elif compressed.reused:
+                zinfo = self._copy_previous(compressed.zinfo, compressed.origin)
+                if self.progress is not None:
+                    self.progress.add_bytes(zinfo.file_size, zinfo.filename)
+            else:
+                zinfo = compressed.zinfo
+                self.write_raw(zinfo, compressed.stream)
+        finally:
+            compressed.close()
+
+        if self.journal is not None:
+            # The entry must be on disk before the journal claims it is
+            self._zip.fp.flush()
+            self.journal.record(zinfo, compressed.source, compressed.sha256, compressed.stat)
+
+        if self.progress is not None:
+            self.progress.file_done(zinfo.filename)
+
+        self.results[zinfo.filename] = {
+            "crc": zinfo.CRC,
+            "file_size": zinfo.file_size,
+            "compress_size": zinfo.compress_size,
+            "sha256": compressed.sha256,
+            "reused": compressed.reused,
+            "deduplicated": bool(compressed.duplicate_of),
+            **stat_result(compressed.stat)
+        }
+
+    def _copy_previous(self, previous_zinfo: zipfile.ZipInfo, origin) -> zipfile.ZipInfo:
+        """从上一次的压缩包原样拷贝压缩数据"""
+        zinfo = zipfile.ZipInfo(previous_zinfo.filename, previous_zinfo.date_time)
+        zinfo.compress_type = previous_zinfo.compress_type
+        zinfo.external_attr = previous_zinfo.external_attr
+        zinfo.create_system = previous_zinfo.create_system
+        zinfo.CRC = previous_zinfo.CRC
+        zinfo.file_size = previous_zinfo.file_size
+        zinfo.compress_size = previous_zinfo.compress_size
+
+        self.budget.consume_io(zinfo.compress_size)
+        self._copy_raw(previous_zinfo, origin.fp, zinfo)
+        return zinfo
+
+    def _copy_duplicate(self, zinfo: zipfile.ZipInfo, original_name: str) -> zipfile.ZipInfo:
+        """以新文件名拷贝本压缩包中已写入的相同内容"""
+        original = self._zip.NameToInfo[original_name]
+        zinfo.compress_type = original.compress_type
+        zinfo.CRC = original.CRC
+        zinfo.file_size = original.file_size
+        zinfo.compress_size = original.compress_size
+
+        # The original must be on disk before it is read back
+        self._zip.fp.flush()
+        if self._reader is None:
+            if self._volumes is not None:
+                # Follows the writer's own volume list, so volumes created later are read as well
+                self._reader = io.BufferedReader(VolumeReader(self._volumes.paths, self._volumes.volume_size),
+                                                 CHUNK_SIZE)
+            else:
+                self._reader = open(self.archive_path, 'rb')
+        self._copy_raw(original, self._reader, zinfo)
+        self.dedup["files"] += 1
+        self.dedup["bytes"] += zinfo.file_size
+        self.dedup["compressed_bytes"] += zinfo.compress_size
+        return zinfo
+
+    def _copy_raw(self, source_zinfo: zipfile.ZipInfo, fp, zinfo: zipfile.ZipInfo):
+        """跳过源条目的本地文件头，把其压缩数据写为新条目"""
+        fp.seek(source_zinfo.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, fp.read(zipfile.sizeFileHeader))
+        fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+        self.write_raw(zinfo, fp)
+
+    def write_raw(self, zinfo: zipfile.ZipInfo, stream):
+        """写入一个已压缩的条目（本地文件头 + 压缩数据）"""
+        zf = self._zip
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zinfo.header_offset = zf.fp.tell()
+        zf.fp.write(zinfo.FileHeader())
+        remaining = zinfo.compress_size
+        while remaining > 0:
+            chunk = stream.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise EOFError(zinfo.filename)
+            zf.fp.write(chunk)
+            remaining -= len(chunk)
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
@@ -0,0 +1,321 @@
+# coding:utf-8
+"""
+Record Database
+构建记录数据库模块 - 以SQLite保存构建记录，排序、筛选、删除与修改均为索引查询
+"""
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from .record_journal import RecordJournal
+
+DATABASE_VERSION = 1
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# Sort conditions of the MOD list -> indexed column
+SORT_COLUMNS = {
+    "name": "name_key",
+    "author": "author_key",
+    "category": "category_key",
+    "date": "build_time"
+}
+# Filterable fields -> indexed column holding the case-folded value
+FILTER_COLUMNS = {
+    "name": "name_key",
+    "author": "author_key",
+    "category": "category_key"
+}
+MOD_INFO_KEYS = ("name", "version", "author", "category")
+RECORD_KEYS = ("record_id", "build_info", "mod_info", "cover_block", "content_blocks", "block_order")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    author TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    author_key TEXT NOT NULL,
+    category_key TEXT NOT NULL,
+    build_time TEXT NOT NULL,
+    build_info TEXT NOT NULL,
+    cover_block TEXT NOT NULL,
+    block_order TEXT NOT NULL,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_position ON records (position);
+CREATE INDEX IF NOT EXISTS records_name ON records (name_key);
+CREATE INDEX IF NOT EXISTS records_author ON records (author_key);
+CREATE INDEX IF NOT EXISTS records_category ON records (category_key);
+CREATE INDEX IF NOT EXISTS records_build_time ON records (build_time);
+CREATE TABLE IF NOT EXISTS blocks (
+    record_id TEXT NOT NULL REFERENCES records (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (record_id, position)
+);
+CREATE TABLE IF NOT EXISTS block_files (
+    record_id TEXT NOT NULL,
+    block_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    file_path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    PRIMARY KEY (record_id, block_position, position),
+    FOREIGN KEY (record_id, block_position) REFERENCES blocks (record_id, position) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS block_files_path ON block_files (file_path);
+"""
+
+
+class RecordDatabase:
+    """构建记录数据库
+
+    Keeps the same record schema as RecordJournal in SQLite. Every record is a
+    row keyed by its `record_id`, with the MOD info and build time in their
+    own columns (indexed, case-folded for the sort and filter fields), the
+    content blocks in `blocks` and the files of every block in `block_files`.
+    `position` keeps the list order; sorting the list renumbers it in one
+    indexed UPDATE instead of rewriting every record.
+
+    A connection is opened per call, so one instance may be used from the
+    build thread and the UI thread. A database created next to an existing
+    journal (or legacy JSON array) imports its records once.
+
+    Every write bumps a revision counter in `meta` within its transaction,
+    so poll() can tell whether anyone else changed the records since this
+    instance last read or wrote them.
+    """
+    def __init__(self, database_path: str, import_journal: Optional[RecordJournal] = None):
+        self.path = database_path
+        self.import_journal = import_journal
+        self._lock = threading.Lock()
+        self._ready = False
+        self.revision = None        # Revision last read or written by this instance
+
+    @staticmethod
+    def is_database(path: str) -> bool:
+        """判断文件是否为SQLite数据库"""
+        try:
+            with open(path, 'rb') as f:
+                return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+        except OSError:
+            return False
+
+    def load(self) -> List[Dict]:
+        """按列表顺序读取全部记录"""
+        return self.find()
+
+    def find(self, order_by: str = "", descending: bool = False, **filters: str) -> List[Dict]:
+        """按索引列筛选与排序读取记录（筛选为不区分大小写的精确匹配）"""
+        where, params = [], []
+        for field, value in filters.items():
+            if value is not None:
+                where.append(f"{FILTER_COLUMNS[field]} = ?")
+                params.append(str(value).casefold())
+        order = SORT_COLUMNS[order_by] if order_by else "position"
+        sql = "SELECT * FROM records"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} {'DESC' if descending else 'ASC'}, position"
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+            self.revision = self._revision(db)
+            return self._build_records(db, rows)
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        """按主键获取记录"""
+        with self._connect() as db:
+            rows = db.execute("SELECT * FROM records WHERE id = ?", (record_id,)).fetchall()
+            records = self._build_records(db, rows)
+        return records[0] if records else None
+
+    def append(self, record: Dict) -> str:
+        """在列表末尾插入一条新记录，返回其ID"""
+        record["record_id"] = record.get("record_id") or RecordJournal.new_record_id()
+        with self._connect() as db:
+            position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM records").fetchone()[0]
+            self._insert(db, record, position)
+            self._bump(db)
+        return record["record_id"]
+
+    def update(self, record: Dict) -> bool:
+        """以新内容替换同ID的记录，位置不变"""
+        with self._connect() as db:
+            row = db.execute("SELECT position FROM records WHERE id = ?", (record.get("record_id", ""),)).fetchone()
+            if row is None:
+                return False
+            db.execute("DELETE FROM records WHERE id = ?", (record["record_id"],))
+            self._insert(db, record, row[0])
+            self._bump(db)
+        return True
+
+    def delete(self, record_id: str) -> bool:
+        """删除一条记录（区块与文件级联删除）"""
+        with self._connect() as db:
+            if db.execute("DELETE FROM records WHERE id = ?", (record_id,)).rowcount == 0:
+                return False
+            self._bump(db)
+            return True
+
+    def rewrite(self, records: List[Dict]):
+        """用给定记录整体替换数据库内容（导入备份、迁移）"""
+        for record in records:
+            record.setdefault("record_id", RecordJournal.new_record_id())
+        with self._connect() as db:
+            db.execute("DELETE FROM records")
+            for position, record in enumerate(records):
+                self._insert(db, record, position)
+            self._bump(db)
+
+    def sort(self, condition: str, descending: bool = False):
+        """按条件重新编排列表顺序"""
+        direction = "DESC" if descending else "ASC"
+        with self._connect() as db:
+            # Rank through a keyed temporary table: a correlated window query would rank once per row
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS sort_order (id TEXT PRIMARY KEY, rank INTEGER NOT NULL)")
+            db.execute("DELETE FROM sort_order")
+            db.execute(f"INSERT INTO sort_order (id, rank) SELECT id, ROW_NUMBER() OVER"
+                       f" (ORDER BY {SORT_COLUMNS[condition]} {direction}, position) FROM records")
+            db.execute("UPDATE records SET position = (SELECT rank FROM sort_order WHERE sort_order.id = records.id)")
+            db.execute("DROP TABLE sort_order")
+            self._bump(db)
+
+    def poll(self) -> Optional[List[str]]:
+        """检查其他连接是否修改过记录：未修改返回空列表，修改过返回None（需重新load）"""
+        if self.revision is None:
+            return None
+        with self._connect() as db:
+            return [] if self._revision(db) == self.revision else None
+
+    @staticmethod
+    def _revision(db: sqlite3.Connection) -> int:
+        """当前的修改版本"""
+        row = db.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _bump(self, db: sqlite3.Connection):
+        """在写事务中递增修改版本；此前已与数据库同步时跟随新版本"""
+        revision = self._revision(db)
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('revision', ?)", (str(revision + 1),))
+        if self.revision == revision:
+            self.revision = revision + 1
+
+    @contextmanager
+    def _connect(self):
+        """打开一个连接并在事务中执行（首次使用时建表并导入旧记录）"""
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA foreign_keys = ON")
+            with self._lock:
+                if not self._ready:
+                    self._prepare(db)
+                    self._ready = True
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _prepare(self, db: sqlite3.Connection):
+        """建表，新数据库导入日志中的记录"""
+        db.execute("PRAGMA journal_mode = WAL")
+        with db:
+            db.executescript(SCHEMA)
+            version = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if version is not None:
+                return
+            db.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (str(DATABASE_VERSION),))
+            if self.import_journal is not None:
+                journal_path = self.import_journal.path
+                legacy_path = self.import_journal.legacy_path
+                if os.path.exists(journal_path) or (legacy_path and os.path.exists(legacy_path)):
+                    for position, record in enumerate(self.import_journal.load()):
+                        self._insert(db, record, position)
+
+    @staticmethod
+    def _insert(db: sqlite3.Connection, record: Dict, position: int):
+        """插入一条记录及其区块与文件"""
+        mod_info = record.get("mod_info", {}) or {}
+        values = {key: str(mod_info.get(key, "") or "") for key in MOD_INFO_KEYS}
+        build_info = record.get("build_info", {}) or {}
+        extra = {key: value for key, value in record.items() if key not in RECORD_KEYS}
+        mod_info_extra = {key: value for key, value in mod_info.items() if key not in MOD_INFO_KEYS}
+        if mod_info_extra:
+            extra["mod_info"] = mod_info_extra
+
+        db.execute(
+            "INSERT INTO records (id, position, name, version, author, category, name_key, author_key,"
+            " category_key, build_time, build_info, cover_block, block_order, extra)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record["record_id"], position, values["name"], values["version"], values["author"],
+             values["category"], values["name"].casefold(), values["author"].casefold(),
+             values["category"].casefold(), str(build_info.get("build_time", "") or ""),
+             json.dumps(build_info, ensure_ascii=False),
+             json.dumps(record.get("cover_block", {}), ensure_ascii=False),
+             json.dumps(record.get("block_order", []), ensure_ascii=False),
+             json.dumps(extra, ensure_ascii=False)))
+
+        for block_position, block in enumerate(record.get("content_blocks", []) or []):
+            data = {key: value for key, value in block.items() if key != "files"}
+            db.execute("INSERT INTO blocks (record_id, position, type, data) VALUES (?, ?, ?, ?)",
+                       (record["record_id"], block_position, str(block.get("type", "")),
+                        json.dumps(data, ensure_ascii=False)))
+            if "files" in block:
+                db.executemany(
+                    "INSERT INTO block_files (record_id, block_position, position, file_path, file_name)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [(record["record_id"], block_position, file_position,
+                      str(file_info.get("file_path", "") or ""), str(file_info.get("file_name", "") or ""))
+                     for file_position, file_info in enumerate(block["files"] or []) if isinstance(file_info, dict)])
+
+    @staticmethod
+    def _build_records(db: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[Dict]:
+        """把记录行与其区块、文件组装回记录字典"""
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        blocks = {record_id: [] for record_id in ids}
+        files = {}
+        # Only the selected records, in chunks that stay below SQLite's variable limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            for row in db.execute(f"SELECT record_id, position, data FROM blocks WHERE record_id IN ({marks})"
+                                  " ORDER BY record_id, position", chunk):
+                blocks[row["record_id"]].append((row["position"], json.loads(row["data"])))
+            for row in db.execute(f"SELECT record_id, block_position, file_path, file_name FROM block_files"
+                                  f" WHERE record_id IN ({marks}) ORDER BY record_id, block_position, position",
+                                  chunk):
+                files.setdefault((row["record_id"], row["block_position"]), []).append(
+                    {"file_path": row["file_path"], "file_name": row["file_name"]})
+
+        records = []
+        for row in rows:
+            extra = json.loads(row["extra"])
+            mod_info = {key: row[key] for key in MOD_INFO_KEYS}
+            mod_info.update(extra.pop("mod_info", {}))
+            content_blocks = []
+            for block_position, block in blocks[row["id"]]:
+                if (row["id"], block_position) in files or block.get("type") == "mod_file":
+                    block["files"] = files.get((row["id"], block_position), [])
+                content_blocks.append(block)
+            record = {
+                "build_info": json.loads(row["build_info"]),
+                "mod_info": mod_info,
+                "cover_block": json.loads(row["cover_block"]),
+                "content_blocks": content_blocks,
+                "block_order": json.loads(row["block_order"]),
+                "record_id": row["id"]
+            }
+            record.update(extra)
+            records.append(record)
+        return records
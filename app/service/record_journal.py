@@ -0,0 +1,356 @@
+# coding:utf-8
+"""
+Record Journal
+构建记录日志模块 - 以追加方式保存构建记录，删除与修改写入墓碑，垃圾过多时在后台压缩
+"""
+import os
+import json
+import uuid
+import threading
+from typing import Dict, List, Optional, Tuple
+
+JOURNAL_VERSION = 1
+COMPACT_MIN_GARBAGE = 64        # Never compact for fewer dead lines than this
+COMPACT_GARBAGE_RATIO = 0.5     # Compact once dead lines exceed this share of live records
+
+# Sort conditions of the MOD list and filterable fields -> key of a record
+SORT_KEYS = {
+    "name": lambda record: str(record.get("mod_info", {}).get("name", "") or "").casefold(),
+    "author": lambda record: str(record.get("mod_info", {}).get("author", "") or "").casefold(),
+    "category": lambda record: str(record.get("mod_info", {}).get("category", "") or "").casefold(),
+    "date": lambda record: str(record.get("build_info", {}).get("build_time", "") or "")
+}
+FILTER_FIELDS = ("name", "author", "category")
+
+_path_locks = {}                # normalized journal path -> lock shared by every instance
+_path_locks_guard = threading.Lock()
+
+
+def _lock_for(path: str) -> threading.Lock:
+    """同一日志文件的所有实例共用一把锁"""
+    key = os.path.normcase(os.path.abspath(path))
+    with _path_locks_guard:
+        return _path_locks.setdefault(key, threading.Lock())
+
+
+class RecordJournal:
+    """构建记录日志
+
+    The build records are kept as JSON lines: a header line, then one
+    `{"op": "put", "id", "record"}` line per added or edited record and one
+    `{"op": "del", "id"}` tombstone per deleted record. Replaying the lines in
+    order gives the live records; an edit keeps the record's position. Adding
+    a record appends a single line without reading the file, so a build no
+    longer costs the size of the whole history.
+
+    Edited and deleted records leave dead lines behind. Once they outnumber
+    half the live records the journal is rewritten on a background thread;
+    lines appended meanwhile are carried over before the rewrite is swapped
+    in. Every record carries its stable `record_id`.
+
+    A legacy `FMMxMOD-Creator_build-record.json` array found next to a missing
+    journal is imported once and renamed to `.json.bak`.
+    """
+    def __init__(self, journal_path: str, legacy_path: Optional[str] = None):
+        self.journal_path = journal_path
+        self.legacy_path = legacy_path
+        self._records = {}          # record_id -> record, in display order
+        self._line_count = 0        # Put and tombstone lines in the file
+        self._loaded = False
+        self._offset = 0            # Bytes of the file reflected in _records
+        self._identity = None       # (st_dev, st_ino) of the file that was read
+        self._lock = _lock_for(journal_path)
+        self._compactor = None
+
+    @staticmethod
+    def new_record_id() -> str:
+        """生成新的记录ID"""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def is_journal(path: str) -> bool:
+        """判断文件是否为记录日志（而不是旧的JSON数组）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+            return False
+        return isinstance(header, dict) and header.get("journal") == "build-record"
+
+    @property
+    def path(self) -> str:
+        return self.journal_path
+
+    @property
+    def garbage(self) -> int:
+        """被覆盖或删除的行数"""
+        return max(0, self._line_count - len(self._records))
+
+    def load(self) -> List[Dict]:
+        """读取日志（必要时导入旧格式），返回按顺序排列的记录"""
+        with self._lock:
+            if not os.path.exists(self.journal_path):
+                self._import_legacy()
+            self._replay()
+        self._maybe_compact()
+        return self.records()
+
+    def records(self) -> List[Dict]:
+        """当前的全部记录（需先load）"""
+        return list(self._records.values())
+
+    def find(self, order_by: str = "", descending: bool = False, **filters: str) -> List[Dict]:
+        """在内存中筛选与排序记录（筛选为不区分大小写的精确匹配）"""
+        if not self._loaded:
+            self.load()
+        records = self.records()
+        for field, value in filters.items():
+            if field not in FILTER_FIELDS:
+                raise KeyError(field)
+            if value is not None:
+                records = [record for record in records if SORT_KEYS[field](record) == str(value).casefold()]
+        if order_by:
+            records.sort(key=SORT_KEYS[order_by], reverse=descending)
+        return records
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        """按ID获取记录"""
+        if not self._loaded:
+            self.load()
+        return self._records.get(record_id)
+
+    def append(self, record: Dict) -> str:
+        """追加一条新记录，返回其ID（无需先load）"""
+        record_id = record.get("record_id") or self.new_record_id()
+        record["record_id"] = record_id
+        with self._lock:
+            if not os.path.exists(self.journal_path):
+                self._import_legacy()
+            self._write_lines([{"op": "put", "id": record_id, "record": record}])
+            if self._loaded:
+                self._records[record_id] = record
+        return record_id
+
+    def update(self, record: Dict) -> bool:
+        """以新内容替换同ID的记录，位置不变"""
+        record_id = record.get("record_id", "")
+        with self._lock:
+            if self._loaded and record_id not in self._records:
+                return False
+            self._write_lines([{"op": "put", "id": record_id, "record": record}])
+            if self._loaded:
+                self._records[record_id] = record
+        self._maybe_compact()
+        return True
+
+    def delete(self, record_id: str) -> bool:
+        """写入墓碑删除一条记录"""
+        with self._lock:
+            if self._loaded and record_id not in self._records:
+                return False
+            self._write_lines([{"op": "del", "id": record_id}])
+            self._records.pop(record_id, None)
+        self._maybe_compact()
+        return True
+
+    def rewrite(self, records: List[Dict]):
+        """用给定记录整体替换日志（排序、导入备份）"""
+        for record in records:
+            record.setdefault("record_id", self.new_record_id())
+        with self._lock:
+            self._rewrite(records)
+            self._records = {record["record_id"]: record for record in records}
+            self._line_count = len(records)
+            self._loaded = True
+            stat = os.stat(self.journal_path)
+            self._offset, self._identity = stat.st_size, (stat.st_dev, stat.st_ino)
+
+    def sort(self, condition: str, descending: bool = False):
+        """按条件重新编排列表顺序（重写日志）"""
+        self.rewrite(self.find(condition, descending))
+
+    def compact(self, wait: bool = False):
+        """在后台线程中压缩日志；wait为True时等待完成"""
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(target=self._compact, name="record-journal-compact", daemon=True)
+                self._compactor.start()
+            compactor = self._compactor
+        if wait:
+            compactor.join()
+
+    def _maybe_compact(self):
+        """垃圾超过阈值时启动压缩"""
+        garbage = self.garbage
+        if self._loaded and garbage >= COMPACT_MIN_GARBAGE and garbage > len(self._records) * COMPACT_GARBAGE_RATIO:
+            self.compact()
+
+    def _compact(self):
+        """重写日志只保留存活记录，期间追加的行会被带入新文件"""
+        with self._lock:
+            # Replay the file rather than trusting memory: another instance may have written to it
+            try:
+                records, _, offset, identity = self._read(self.journal_path)
+            except OSError:
+                return
+            records = list(records.values())
+        temp_path = f"{self.journal_path}.compact"
+        try:
+            self._write_file(temp_path, records)
+            with self._lock:
+                current = os.stat(self.journal_path)
+                if (current.st_dev, current.st_ino) != identity:
+                    # Rewritten meanwhile (sorted or imported), nothing left to compact
+                    os.remove(temp_path)
+                    return
+                # Carry over lines appended while the snapshot was written
+                with open(self.journal_path, 'rb') as src:
+                    src.seek(offset)
+                    tail = src.read()
+                if tail:
+                    with open(temp_path, 'ab') as dst:
+                        dst.write(tail)
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                in_sync = self._identity == identity and self._offset == offset + len(tail)
+                os.replace(temp_path, self.journal_path)
+                self._line_count = len(records) + tail.count(b"\n")
+                if in_sync:
+                    # Same records in a new file, poll() need not reload
+                    stat = os.stat(self.journal_path)
+                    self._offset, self._identity = stat.st_size, (stat.st_dev, stat.st_ino)
+        except OSError as e:
+            print(f"压缩构建记录失败: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def poll(self) -> Optional[List[str]]:
+        """读取其他实例追加的行，返回变化的记录ID；日志被重写或尚未load时返回None"""
+        with self._lock:
+            try:
+                stat = os.stat(self.journal_path)
+            except OSError:
+                return None if self._identity is not None or not self._loaded else []
+            if not self._loaded or (stat.st_dev, stat.st_ino) != self._identity or stat.st_size < self._offset:
+                return None
+            if stat.st_size == self._offset:
+                return []
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read(stat.st_size - self._offset)
+            end = data.rfind(b"\n") + 1     # A line still being written is read next time
+            changed = []
+            for line in data[:end].splitlines():
+                self._line_count += 1
+                record_id = self._apply_line(self._records, line)
+                if record_id is not None:
+                    changed.append(record_id)
+            self._offset += end
+            return changed
+
+    def _replay(self):
+        """从头重放日志，得到存活记录"""
+        records, line_count, offset, identity = {}, 0, 0, None
+        if os.path.exists(self.journal_path):
+            records, line_count, offset, identity = self._read(self.journal_path)
+        self._records = records
+        self._line_count = line_count
+        self._offset = offset
+        self._identity = identity
+        self._loaded = True
+
+    @classmethod
+    def _read(cls, path: str) -> Tuple[Dict[str, Dict], int, int, tuple]:
+        """读取日志文件，返回存活记录、put/墓碑行数、已读字节数与文件标识"""
+        records = {}
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].splitlines()[1:]     # Skip the header
+        for line in lines:
+            cls._apply_line(records, line)
+        return records, len(lines), end, (stat.st_dev, stat.st_ino)
+
+    @staticmethod
+    def _apply_line(records: Dict[str, Dict], line: bytes) -> Optional[str]:
+        """把一行put或墓碑应用到记录上，返回涉及的记录ID"""
+        try:
+            entry = json.loads(line)
+            if entry["op"] == "put":
+                entry["record"]["record_id"] = entry["id"]
+                records[entry["id"]] = entry["record"]
+            elif entry["op"] == "del":
+                records.pop(entry["id"], None)
+            else:
+                return None
+            return entry["id"]
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+            # A torn line after a crash only loses that one change
+            return None
+
+    def _import_legacy(self):
+        """把旧的JSON数组记录文件转换为日志"""
+        if not self.legacy_path or not os.path.isfile(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"导入旧构建记录失败: {e}")
+            return
+        if isinstance(data, dict):
+            data = [data]
+        records = [record for record in data if isinstance(record, dict)] if isinstance(data, list) else []
+        for record in records:
+            record.setdefault("record_id", self.new_record_id())
+        self._rewrite(records)
+        try:
+            os.replace(self.legacy_path, f"{self.legacy_path}.bak")
+        except OSError:
+            pass
+
+    def _rewrite(self, records: List[Dict]):
+        """原子地重写整个日志"""
+        temp_path = f"{self.journal_path}.tmp"
+        self._write_file(temp_path, records)
+        os.replace(temp_path, self.journal_path)
+
+    def _write_file(self, path: str, records: List[Dict]):
+        """写入头部与每条记录的put行"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(json.dumps({"journal": "build-record", "version": JOURNAL_VERSION}) + "\n")
+            for record in records:
+                f.write(json.dumps({"op": "put", "id": record["record_id"], "record": record},
+                                   ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_lines(self, entries: List[Dict]):
+        """追加若干行并刷到磁盘（调用方持有锁）"""
+        if not os.path.exists(self.journal_path):
+            self._write_file(self.journal_path, [])
+            if self._loaded and self._identity is None:
+                # Loaded before the file existed, so memory matches the bare header
+                stat = os.stat(self.journal_path)
+                self._offset, self._identity = stat.st_size, (stat.st_dev, stat.st_ino)
+        with open(self.journal_path, 'r+b') as f:
+            stat = os.fstat(f.fileno())
+            # Memory already reflects these lines; skip them on poll() unless others wrote in between
+            in_sync = self._loaded and (stat.st_dev, stat.st_ino) == self._identity and stat.st_size == self._offset
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                # Never glue a new line onto a line torn by a crash
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            for entry in entries:
+                f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+            if in_sync:
+                self._offset = f.tell()
+        self._line_count += len(entries)
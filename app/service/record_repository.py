@@ -0,0 +1,194 @@
+# coding:utf-8
+"""
+Record Repository
+构建记录仓库模块 - 进程内共享的构建记录，只加载一次，文件被外部修改时按行发出变化信号
+"""
+import os
+from typing import Dict, List, Optional
+from PySide6.QtCore import QObject, Signal, QTimer
+from ..common.config import cfg
+from .build_record_service import BuildRecordService
+
+POLL_INTERVAL_MS = 1000         # How often the record files' mtimes are checked
+RESET_RATIO = 0.5               # Above this share of changed rows a reset is cheaper than row signals
+
+
+class RecordRepository(QObject):
+    """构建记录仓库
+
+    Holds the records of the selected store (journal or SQLite) in memory
+    for every view. Changes made through the repository update the store
+    and the memory together and emit one signal per affected row. Changes
+    made elsewhere (a finished build, the command line, another instance)
+    are noticed by polling the mtime and size of the record files; the
+    journal then only reads the lines appended since, the database reloads
+    when its revision moved. The repository's own writes change the files
+    too, but the journal offset and database revision follow them, so they
+    are not reported twice. The new list is diffed by `record_id` against
+    the old one, so views receive the same fine-grained signals, or a reset
+    when the order changed or most rows did.
+    """
+    recordsReset = Signal()                 # the whole list changed
+    recordAdded = Signal(int, dict)         # row, record
+    recordRemoved = Signal(int, str)        # row, record id
+    recordUpdated = Signal(int, dict)       # row, record
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._store = None
+        self._records = []          # Records in list order
+        self._rows = None           # record_id -> row, rebuilt lazily
+        self._signature = None      # (mtime_ns, size) of the record files at the last check
+        self._loaded = False
+        self.timer = QTimer(self)
+        self.timer.setInterval(POLL_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        cfg.configChanged.connect(self._on_config_changed)
+
+    @property
+    def store(self):
+        """当前的记录存储"""
+        if self._store is None:
+            self._store = BuildRecordService.open_record_store()
+        return self._store
+
+    def records(self) -> List[Dict]:
+        """全部记录（首次调用时加载）"""
+        self._ensure_loaded()
+        return list(self._records)
+
+    def count(self) -> int:
+        """记录数"""
+        self._ensure_loaded()
+        return len(self._records)
+
+    def record(self, row: int) -> Optional[Dict]:
+        """第row行的记录"""
+        self._ensure_loaded()
+        return self._records[row] if 0 <= row < len(self._records) else None
+
+    def row_of(self, record_id: str) -> int:
+        """记录所在的行，不存在时返回-1"""
+        self._ensure_loaded()
+        if self._rows is None:
+            self._rows = {record.get("record_id"): row for row, record in enumerate(self._records)}
+        return self._rows.get(record_id, -1)
+
+    def update(self, record: Dict) -> bool:
+        """保存修改后的记录"""
+        row = self.row_of(record.get("record_id", ""))
+        if row < 0 or not self.store.update(record):
+            return False
+        self._records[row] = record
+        self.recordUpdated.emit(row, record)
+        return True
+
+    def delete(self, record_id: str) -> bool:
+        """删除一条记录"""
+        row = self.row_of(record_id)
+        if row < 0 or not self.store.delete(record_id):
+            return False
+        del self._records[row]
+        self._rows = None
+        self.recordRemoved.emit(row, record_id)
+        return True
+
+    def sort(self, condition: str, descending: bool = False):
+        """按条件重新编排顺序"""
+        self._ensure_loaded()
+        self.store.sort(condition, descending)
+        self._reload()
+
+    def replace_all(self, records: List[Dict]):
+        """整体替换全部记录（导入备份）"""
+        self._ensure_loaded()
+        self.store.rewrite(records)
+        self._reload()
+
+    def refresh(self):
+        """检查记录文件是否被外部修改，并发出相应的行变化信号"""
+        if not self._loaded:
+            return
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        self._signature = signature
+        changed = self.store.poll()
+        if changed is None:
+            self._apply(self.store.load())
+        elif changed:
+            self._apply(self.store.records())
+
+    def _ensure_loaded(self):
+        """首次访问时加载记录并开始监视"""
+        if self._loaded:
+            return
+        self._loaded = True
+        self._signature = self._file_signature()
+        self._records = self.store.load()
+        self._rows = None
+        self.timer.start()
+
+    def _reload(self):
+        """重新读取全部记录并通知视图重置"""
+        self._signature = self._file_signature()
+        self._records = self.store.load()
+        self._rows = None
+        self.recordsReset.emit()
+
+    def _file_signature(self) -> tuple:
+        """记录文件（及SQLite的WAL文件）的mtime与大小"""
+        signature = []
+        for path in (self.store.path, f"{self.store.path}-wal"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _apply(self, records: List[Dict]):
+        """与当前列表按record_id比较，发出行级信号或重置"""
+        old_ids = [record.get("record_id") for record in self._records]
+        new_ids = [record.get("record_id") for record in records]
+        new_set = set(new_ids)
+        old_set = set(old_ids)
+        kept_old = [record_id for record_id in old_ids if record_id in new_set]
+        kept_new = [record_id for record_id in new_ids if record_id in old_set]
+
+        old_by_id = {record.get("record_id"): record for record in self._records}
+        updated = [row for row, record in enumerate(records)
+                   if record.get("record_id") in old_set and old_by_id[record.get("record_id")] != record]
+        changes = (len(old_ids) - len(kept_old)) + (len(new_ids) - len(kept_new)) + len(updated)
+        if (kept_old != kept_new or None in new_set or len(new_set) != len(new_ids)
+                or changes > max(len(records), 1) * RESET_RATIO and changes > 1):
+            self._records = list(records)
+            self._rows = None
+            self.recordsReset.emit()
+            return
+
+        # Removals from the bottom up, so earlier rows keep their numbers
+        for row in range(len(old_ids) - 1, -1, -1):
+            if old_ids[row] not in new_set:
+                record_id = old_ids[row]
+                del self._records[row]
+                self.recordRemoved.emit(row, record_id)
+        # The kept rows are now in their final relative order; insert from the top down
+        for row, record in enumerate(records):
+            if new_ids[row] not in old_set:
+                self._records.insert(row, record)
+                self.recordAdded.emit(row, record)
+        for row in updated:
+            self._records[row] = records[row]
+            self.recordUpdated.emit(row, records[row])
+        self._rows = None
+
+    def _on_config_changed(self, key: str, value):
+        """切换记录存储后改用新的存储"""
+        if key in ("record_backend", "reset"):
+            self._store = None
+            if self._loaded:
+                self._reload()
+
+
+recordRepository = RecordRepository()
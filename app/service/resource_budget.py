@@ -0,0 +1,62 @@
+# coding:utf-8
+"""
+Resource Budget
+资源预算模块 - 在并行的构建任务之间共享CPU与磁盘带宽
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ResourceBudget:
+    """共享资源预算
+
+    `cpu_slots` caps how many compression tasks run at once across all jobs
+    (0 = no cap). `io_bytes_per_second` is a token bucket shared by every read
+    of source data (0 = unlimited); callers are charged after each chunk and
+    sleep off any debt, so the average rate stays under the budget.
+    """
+    def __init__(self, cpu_slots: int = 0, io_bytes_per_second: int = 0):
+        self._lock = threading.Lock()
+        self._cpu = threading.BoundedSemaphore(cpu_slots) if cpu_slots > 0 else None
+        self.cpu_slots = max(0, cpu_slots)
+        self.io_rate = max(0, io_bytes_per_second)
+        self._tokens = float(self.io_rate)
+        self._last_refill = time.monotonic()
+        self._throttled = 0.0       # Seconds spent waiting for the I/O budget
+
+    @contextmanager
+    def cpu_slot(self):
+        """占用一个CPU配额"""
+        if self._cpu is None:
+            yield
+            return
+        self._cpu.acquire()
+        try:
+            yield
+        finally:
+            self._cpu.release()
+
+    def consume_io(self, count: int):
+        """扣除磁盘带宽配额，超出预算时阻塞"""
+        if self.io_rate <= 0 or count <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Allow at most one second of burst
+            self._tokens = min(float(self.io_rate), self._tokens + (now - self._last_refill) * self.io_rate)
+            self._last_refill = now
+            self._tokens -= count
+            wait = -self._tokens / self.io_rate if self._tokens < 0 else 0.0
+            self._throttled += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def report(self) -> dict:
+        """预算配置与限速等待时间"""
+        with self._lock:
+            return {
+                "cpu_slots": self.cpu_slots,
+                "io_mbps": round(self.io_rate / (1024 * 1024), 2),
+                "throttled_seconds": round(self._throttled, 3)
+            }
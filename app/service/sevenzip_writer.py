@@ -0,0 +1,600 @@
+# coding:utf-8
+"""
+7z Writer
+7z写入模块 - 按预设切分固实块并多线程压缩
+"""
+import os
+import lzma
+import time
+import struct
+import hashlib
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from .compression_policy import CompressionPolicy, STORE
+from .build_progress import BuildProgress
+from .resource_budget import ResourceBudget
+from .split_volumes import VolumeWriter, open_archive
+from .entry_stream import CHUNK_SIZE, hash_entry, read_chunks, spool_file, source_stat, stat_matches, stat_result
+
+MB = 1024 * 1024
+
+# Per-block methods
+METHOD_COPY = "copy"                # Precompressed data, stored as is
+METHOD_LZMA2 = "lzma2"
+METHOD_BCJ_LZMA2 = "bcj+lzma2"      # x86 executables: branch converter before LZMA2
+
+BCJ_EXTENSIONS = frozenset({".exe", ".dll", ".sys", ".ocx", ".asi", ".scr", ".cpl"})
+
+# level: LZMA2 preset; dict_size_mb: dictionary size; solid_block_mb: max input per solid block
+SEVENZIP_PRESETS = {
+    "store": {"level": 0, "dict_size_mb": 1, "solid_block_mb": 256},
+    "fast": {"level": 1, "dict_size_mb": 4, "solid_block_mb": 64},
+    "normal": {"level": 5, "dict_size_mb": 16, "solid_block_mb": 256},
+    "max": {"level": 7, "dict_size_mb": 32, "solid_block_mb": 512},
+    "ultra": {"level": 9, "dict_size_mb": 64, "solid_block_mb": 1024}
+}
+DEFAULT_PRESET = "normal"
+DEFAULT_MEMORY_LIMIT_MB = 2048      # Encoder memory shared by all compression threads
+
+# 7z container constants
+SIGNATURE = b"7z\xbc\xaf\x27\x1c\x00\x04"
+K_END = 0x00
+K_HEADER = 0x01
+K_MAIN_STREAMS_INFO = 0x04
+K_FILES_INFO = 0x05
+K_PACK_INFO = 0x06
+K_UNPACK_INFO = 0x07
+K_SUBSTREAMS_INFO = 0x08
+K_SIZE = 0x09
+K_CRC = 0x0A
+K_FOLDER = 0x0B
+K_CODERS_UNPACK_SIZE = 0x0C
+K_NUM_UNPACK_STREAM = 0x0D
+K_EMPTY_STREAM = 0x0E
+K_EMPTY_FILE = 0x0F
+K_NAME = 0x11
+K_MTIME = 0x14
+K_ATTRIBUTES = 0x15
+
+CODEC_COPY = b"\x00"
+CODEC_LZMA2 = b"\x21"
+CODEC_BCJ_X86 = b"\x03\x03\x01\x03"
+
+FILE_ATTRIBUTE_ARCHIVE = 0x20
+FILETIME_EPOCH = 116444736000000000     # 1601-01-01 to 1970-01-01 in 100ns ticks
+
+
+def encode_number(value: int) -> bytes:
+    """7z变长整数编码"""
+    for extra in range(8):
+        if value < (1 << (7 * (extra + 1))):
+            first = ((0xFF << (8 - extra)) & 0xFF) | (value >> (8 * extra))
+            return bytes([first]) + (value & ((1 << (8 * extra)) - 1)).to_bytes(extra, "little")
+    return b"\xff" + value.to_bytes(8, "little")
+
+
+def encode_bits(bits: List[bool]) -> bytes:
+    """位向量编码（高位在前）"""
+    data = bytearray((len(bits) + 7) // 8)
+    for index, bit in enumerate(bits):
+        if bit:
+            data[index // 8] |= 0x80 >> (index % 8)
+    return bytes(data)
+
+
+def lzma2_dict_property(dict_size: int) -> int:
+    """LZMA2字典大小属性字节"""
+    for prop in range(40):
+        if ((2 | (prop & 1)) << (prop // 2 + 11)) >= dict_size:
+            return prop
+    return 40
+
+
+class SolidBlock:
+    """固实块（7z中的一个folder）"""
+    def __init__(self, method: str):
+        self.method = method
+        self.entries = []
+        self.size = 0
+        self.stream = None
+        self.pack_size = 0
+        self.unpack_sizes = []
+        self.crcs = []
+        self.sha256s = []
+        self.stats = []             # Source size and mtime of every entry, taken before it was read
+        self.offset = 0             # Position of the packed stream in the archive
+        self.previous = None        # Same block in the previous archive, copied instead of compressed
+
+    def close(self):
+        """释放压缩数据"""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+class SevenZipWriter:
+    """7z写入器
+
+    Entries are grouped by method (copy for data the compression policy would
+    store, BCJ+LZMA2 for x86 executables, LZMA2 for the rest) and cut into
+    solid blocks of at most `solid_block_mb`. Blocks are independent folders,
+    so they compress on a thread pool and are appended in order. The number of
+    threads is capped so that their LZMA2 encoders fit in `memory_limit_mb`,
+    and compressed blocks spill to disk, which keeps memory flat on huge MODs.
+
+    Entries marked "duplicate_of" by ContentDedup are placed right behind their
+    original in the same solid block, where LZMA2 encodes each repeat as one
+    long match as long as the file fits in the dictionary.
+
+    With `volume_size` the archive is written straight into volumes of that
+    size (see VolumeWriter) instead of one file.
+
+    `previous_blocks` is the layout() of `previous_archive`. A previous solid
+    block whose entries all carry a "reuse" marker (see
+    BuildManifest.reuse_candidate) and whose coder settings are unchanged is
+    planned again as is, and its packed stream is copied instead of being
+    recompressed. Blocks with any changed, added or removed entry are
+    compressed anew, so a small edit only costs the blocks around it.
+    """
+    def __init__(self, archive_path: str, preset: str = DEFAULT_PRESET, options: Optional[Dict] = None,
+                 workers: int = 0, spool_dir: Optional[str] = None, policy: Optional[CompressionPolicy] = None,
+                 progress: Optional[BuildProgress] = None, budget: Optional[ResourceBudget] = None,
+                 volume_size: int = 0, previous_archive: Optional[str] = None,
+                 previous_blocks: Optional[List[Dict]] = None):
+        settings = dict(SEVENZIP_PRESETS.get(preset, SEVENZIP_PRESETS[DEFAULT_PRESET]))
+        settings.update(options or {})
+        self.archive_path = archive_path
+        self.preset = preset if preset in SEVENZIP_PRESETS else DEFAULT_PRESET
+        self.level = int(settings["level"])
+        self.dict_size = max(int(settings["dict_size_mb"] * MB), 4096)
+        self.solid_block_size = max(int(settings["solid_block_mb"] * MB), 1)
+        self.memory_limit = int(settings.get("memory_limit_mb", DEFAULT_MEMORY_LIMIT_MB) * MB)
+        self.spool_dir = spool_dir
+        self.policy = policy or CompressionPolicy()
+        self.progress = progress
+        self.budget = budget or ResourceBudget()
+        self.workers = self._limit_workers(workers if workers and workers > 0 else (os.cpu_count() or 1))
+        self.results = {}           # arcname -> crc/size of the written entry
+        self._blocks = []           # Written blocks, in archive order
+        self._empty_entries = []
+        self._deduplicated = set()  # Entries placed right after an identical original
+        self._policies = {}         # arcname -> compression policy the entry was placed by
+        self.dedup = {"files": 0, "bytes": 0}
+        self.reuse = {"blocks": 0, "files": 0, "bytes": 0}
+        self._previous = None       # File (or joined volumes) of the previous archive
+        self._previous_blocks = []
+        if previous_archive and previous_blocks:
+            self._open_previous(previous_archive, previous_blocks)
+        self._volumes = VolumeWriter(archive_path, volume_size) if volume_size > 0 else None
+        self._file = self._volumes or open(archive_path, "wb")
+        self._file.write(b"\x00" * 32)     # Signature header, filled in by close()
+
+    @property
+    def volume_paths(self) -> List[str]:
+        """已写入的分卷（未分卷时为空）"""
+        return list(self._volumes.paths) if self._volumes is not None else []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _limit_workers(self, workers: int) -> int:
+        """按编码器内存上限限制线程数"""
+        if self.level == 0:
+            return workers
+        # A bt4 LZMA2 encoder needs roughly 11x its dictionary
+        encoder_memory = self.dict_size * 11 + 4 * MB
+        return max(1, min(workers, self.memory_limit // encoder_memory))
+
+    def write_entries(self, entries: Iterable[Dict]):
+        """切分固实块，并行压缩后按顺序写入"""
+        blocks = self._plan_blocks(entries)
+        if self.progress is not None:
+            for entry in self._empty_entries:
+                self.progress.file_done(entry["arcname"])
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                for block in blocks:
+                    pending.append(executor.submit(self._compress_block, block))
+                    # Each finished block waits on disk, so only `workers` blocks are in flight
+                    if len(pending) >= self.workers:
+                        self._write_block(pending.popleft().result())
+                while pending:
+                    self._write_block(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+                for future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        future.result().close()
+
+    def close(self):
+        """写入头部并关闭文件"""
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+        if self._file is None:
+            return
+        try:
+            header = self._build_header()
+            header_offset = self._file.tell() - 32
+            self._file.write(header)
+            start_header = struct.pack("<QQI", header_offset, len(header), zlib.crc32(header))
+            self._file.seek(0)
+            self._file.write(SIGNATURE + struct.pack("<I", zlib.crc32(start_header)) + start_header)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def report(self) -> Dict:
+        """压缩参数与固实块统计"""
+        methods = {}
+        for block in self._blocks:
+            stats = methods.setdefault(block.method, {"blocks": 0, "files": 0, "bytes_in": 0, "bytes_out": 0})
+            stats["blocks"] += 1
+            stats["files"] += len(block.entries)
+            stats["bytes_in"] += sum(block.unpack_sizes)
+            stats["bytes_out"] += block.pack_size
+        return {
+            "preset": self.preset,
+            "level": self.level,
+            "dict_size": self.dict_size,
+            "solid_block_size": self.solid_block_size,
+            "workers": self.workers,
+            "methods": methods,
+            "dedup": dict(self.dedup),
+            "reuse": dict(self.reuse)
+        }
+
+    def layout(self) -> List[Dict]:
+        """已写入固实块的位置与内容，供校验时逐块并行解码"""
+        return [{
+            "offset": block.offset,
+            "pack_size": block.pack_size,
+            "method": block.method,
+            "filters": self._filters(block.method) if block.method != METHOD_COPY else None,
+            "entries": [(entry["arcname"], size, crc)
+                        for entry, size, crc in zip(block.entries, block.unpack_sizes, block.crcs)]
+        } for block in self._blocks]
+
+    def _open_previous(self, previous_archive: str, previous_blocks: List[Dict]):
+        """打开上一次的7z压缩包，其固实块与记录的布局不符时不复用"""
+        try:
+            self._previous = open_archive(previous_archive)
+            end = self._previous.seek(0, os.SEEK_END)
+            self._previous.seek(0)
+            if self._previous.read(len(SIGNATURE)) == SIGNATURE and all(
+                    block["offset"] + block["pack_size"] <= end for block in previous_blocks):
+                self._previous_blocks = previous_blocks
+                return
+        except (OSError, KeyError, TypeError):
+            pass
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+
+    def _plan_reused(self, entries: Dict[str, Dict]) -> List[SolidBlock]:
+        """找出可整块复用的上一次固实块，其条目从entries中移除"""
+        blocks = []
+        for previous in self._previous_blocks:
+            method = previous.get("method")
+            if method not in (METHOD_COPY, METHOD_LZMA2, METHOD_BCJ_LZMA2) or not previous["entries"]:
+                continue
+            # Same filter chain, or the packed stream would not decode to the same bytes under new settings
+            if method != METHOD_COPY and previous.get("filters") != self._filters(method):
+                continue
+            names = [name for name, size, crc in previous["entries"]]
+            if not all(self._reusable(entries.get(name), size, names[:index])
+                       for index, (name, size, crc) in enumerate(previous["entries"])):
+                continue
+            block = SolidBlock(method)
+            block.previous = previous
+            for name in names:
+                entry = entries.pop(name)
+                block.entries.append(entry)
+                block.size += entry["size"]
+                if entry.get("duplicate_of"):
+                    self._deduplicated.add(name)
+                    self.dedup["files"] += 1
+                    self.dedup["bytes"] += entry["size"]
+            blocks.append(block)
+        return blocks
+
+    @staticmethod
+    def _reusable(entry: Optional[Dict], size: int, before: List[str]) -> bool:
+        """条目能否留在上一次的固实块中（重复内容须紧跟在同一块的原始条目之后）"""
+        if entry is None or not entry.get("reuse") or entry["size"] != size:
+            return False
+        return not entry.get("duplicate_of") or entry["duplicate_of"] in before
+
+    def _choose_method(self, entry: Dict) -> str:
+        """为条目选择压缩方式"""
+        if self.level == 0:
+            self._policies[entry["arcname"]] = STORE
+            return METHOD_COPY
+        head = b""
+        if entry["source"]:
+            with open(entry["source"], "rb") as f:
+                head = f.read(self.policy.probe_size)
+        else:
+            head = entry["data"][:self.policy.probe_size]
+        policy = self.policy.choose(entry["arcname"], entry["size"], head)
+        self._policies[entry["arcname"]] = policy
+        if policy == STORE:
+            return METHOD_COPY
+        if os.path.splitext(entry["arcname"])[1].lower() in BCJ_EXTENSIONS:
+            return METHOD_BCJ_LZMA2
+        return METHOD_LZMA2
+
+    def _plan_blocks(self, entries: Iterable[Dict]) -> List[SolidBlock]:
+        """按压缩方式分组并切分固实块（重复内容紧跟原始条目放入同一固实块）"""
+        pending = {}
+        for entry in entries:
+            if "size" not in entry:
+                entry["size"] = os.path.getsize(entry["source"]) if entry["source"] else len(entry["data"])
+            pending[entry["arcname"]] = entry
+        reused = self._plan_reused(pending) if self._previous_blocks else []
+
+        groups = {METHOD_BCJ_LZMA2: [], METHOD_LZMA2: [], METHOD_COPY: []}
+        duplicates = {}             # original arcname -> entries with the same content
+        for entry in pending.values():
+            if entry["size"] == 0:
+                # Nothing is read from an empty file, so this stat is the one taken before reading
+                entry["empty_stat"] = source_stat(entry)
+                self._empty_entries.append(entry)
+            elif entry.get("duplicate_of"):
+                duplicates.setdefault(entry["duplicate_of"], []).append(entry)
+            else:
+                groups[self._choose_method(entry)].append(entry)
+
+        blocks = reused
+        repeats = None              # LZMA2 block shared by stored originals that have duplicates
+        for method, group in groups.items():
+            block = None
+            for entry in group:
+                copies = duplicates.pop(entry["arcname"], [])
+                if method == METHOD_COPY and copies and self.level > 0 and entry["size"] <= self.dict_size:
+                    # Repeats only collapse inside an LZMA2 dictionary window
+                    repeats = self._place(blocks, repeats, METHOD_LZMA2, entry, copies,
+                                          min(self.solid_block_size, self.dict_size))
+                    continue
+                if entry["size"] > self.dict_size:
+                    # Too far apart for the encoder to match, so each copy is compressed
+                    for item in [entry] + copies:
+                        block = self._place(blocks, block, method, item, [])
+                    continue
+                block = self._place(blocks, block, method, entry, copies)
+        # Duplicates whose original is not in this archive
+        for copies in duplicates.values():
+            for entry in copies:
+                blocks.append(SolidBlock(self._choose_method(entry)))
+                blocks[-1].entries.append(entry)
+                blocks[-1].size += entry["size"]
+        return blocks
+
+    def _place(self, blocks: List[SolidBlock], block: Optional[SolidBlock], method: str,
+               entry: Dict, copies: List[Dict], max_size: Optional[int] = None) -> SolidBlock:
+        """把条目及其重复内容放入固实块，超出大小（默认为固实块大小）时另起一块"""
+        if block is None or block.method != method or (
+                block.entries and block.size + entry["size"] > (max_size or self.solid_block_size)):
+            block = SolidBlock(method)
+            blocks.append(block)
+        # The copies follow their original directly, whatever the block size
+        for item in [entry] + copies:
+            block.entries.append(item)
+            block.size += item["size"]
+        for item in copies:
+            self._deduplicated.add(item["arcname"])
+            self.dedup["files"] += 1
+            self.dedup["bytes"] += item["size"]
+        return block
+
+    def _filters(self, method: str) -> List[Dict]:
+        """LZMA原始格式的过滤器链"""
+        lzma2 = {"id": lzma.FILTER_LZMA2, "preset": self.level, "dict_size": self.dict_size}
+        if method == METHOD_BCJ_LZMA2:
+            return [{"id": lzma.FILTER_X86}, lzma2]
+        return [lzma2]
+
+    def _compress_block(self, block: SolidBlock) -> SolidBlock:
+        """在工作线程中压缩一个固实块（占用一个共享CPU配额）"""
+        with self.budget.cpu_slot():
+            if block.previous is not None:
+                if self._reuse_block(block):
+                    return block
+                # A touched entry changed after all: compress the same entries anew
+                block.previous = None
+            stream = spool_file(self.spool_dir)
+            compressor = None
+            if block.method != METHOD_COPY:
+                compressor = lzma.LZMACompressor(format=lzma.FORMAT_RAW, filters=self._filters(block.method))
+            try:
+                for index, entry in enumerate(block.entries):
+                    started = time.perf_counter()
+                    packed = stream.tell()
+                    block.stats.append(source_stat(entry))
+                    crc = 0
+                    size = 0
+                    sha256 = hashlib.sha256()
+                    for chunk in read_chunks(entry):
+                        self.budget.consume_io(len(chunk))
+                        crc = zlib.crc32(chunk, crc)
+                        sha256.update(chunk)
+                        size += len(chunk)
+                        stream.write(compressor.compress(chunk) if compressor else chunk)
+                        if self.progress is not None:
+                            self.progress.add_bytes(len(chunk), entry["arcname"])
+                    if compressor and index == len(block.entries) - 1:
+                        stream.write(compressor.flush())
+                    block.crcs.append(crc)
+                    block.unpack_sizes.append(size)
+                    block.sha256s.append(sha256.hexdigest())
+                    self._record_policy(entry, size, stream.tell() - packed, time.perf_counter() - started)
+                    if self.progress is not None:
+                        self.progress.file_done(entry["arcname"])
+            except BaseException:
+                stream.close()
+                raise
+        block.pack_size = stream.tell()
+        stream.seek(0)
+        block.stream = stream
+        return block
+
+    def _reuse_block(self, block: SolidBlock) -> bool:
+        """确认复用固实块的条目内容未变，并填入其大小、CRC与哈希"""
+        stats = []
+        for entry in block.entries:
+            stat = source_stat(entry)
+            stats.append(stat)
+            # Touched since it was last written: only reuse if the content is unchanged
+            if ((entry["reuse"]["verify"] or not stat_matches(entry["reuse"], stat))
+                    and hash_entry(entry, self.budget.consume_io) != entry["reuse"]["sha256"]):
+                return False
+        block.stats = stats
+        for entry, (name, size, crc) in zip(block.entries, block.previous["entries"]):
+            block.unpack_sizes.append(size)
+            block.crcs.append(crc)
+            block.sha256s.append(entry["reuse"]["sha256"])
+            if self.progress is not None:
+                self.progress.add_bytes(size, name)
+                self.progress.file_done(name)
+        block.pack_size = block.previous["pack_size"]
+        return True
+
+    def _record_policy(self, entry: Dict, bytes_in: int, bytes_out: int, seconds: float):
+        """按条目的压缩策略累计字节数与耗时（固实块中按编码器的实际输出计入）"""
+        # Repeats placed behind their original are not compressed on their own, as in ParallelZipWriter
+        policy = self._policies.get(entry["arcname"])
+        if policy is not None and entry["arcname"] not in self._deduplicated:
+            self.policy.record(policy, bytes_in, bytes_out, seconds)
+
+    def _write_block(self, block: SolidBlock):
+        """把压缩好的固实块追加到压缩包"""
+        block.offset = self._file.tell()
+        try:
+            if block.previous is not None:
+                self._copy_previous(block)
+            while block.stream is not None:
+                chunk = block.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._file.write(chunk)
+        finally:
+            block.close()
+        self._blocks.append(block)
+        for entry, crc, size, sha256, stat in zip(block.entries, block.crcs, block.unpack_sizes, block.sha256s,
+                                                  block.stats):
+            self.results[entry["arcname"]] = {"crc": crc, "file_size": size, "method": block.method,
+                                              "sha256": sha256, "reused": block.previous is not None,
+                                              "deduplicated": entry["arcname"] in self._deduplicated,
+                                              **stat_result(stat)}
+
+    def _copy_previous(self, block: SolidBlock):
+        """从上一次的压缩包原样拷贝固实块的压缩数据"""
+        self._previous.seek(block.previous["offset"])
+        remaining = block.pack_size
+        while remaining > 0:
+            chunk = self._previous.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise EOFError(self.archive_path)
+            self.budget.consume_io(len(chunk))
+            self._file.write(chunk)
+            remaining -= len(chunk)
+        self.reuse["blocks"] += 1
+        self.reuse["files"] += len(block.entries)
+        self.reuse["bytes"] += sum(block.unpack_sizes)
+
+    def _coders(self, block: SolidBlock) -> bytes:
+        """folder的编码器描述"""
+        lzma2 = bytes([0x21]) + CODEC_LZMA2 + encode_number(1) + bytes([lzma2_dict_property(self.dict_size)])
+        if block.method == METHOD_COPY:
+            return encode_number(1) + bytes([0x01]) + CODEC_COPY
+        if block.method == METHOD_LZMA2:
+            return encode_number(1) + lzma2
+        # LZMA2 (coder 0) reads the packed stream; BCJ (coder 1) reads LZMA2's output
+        bcj = bytes([0x04]) + CODEC_BCJ_X86
+        return encode_number(2) + lzma2 + bcj + encode_number(1) + encode_number(0)
+
+    def _streams_info(self) -> bytes:
+        """主数据流信息"""
+        blocks = self._blocks
+        info = bytearray([K_MAIN_STREAMS_INFO])
+
+        info += bytes([K_PACK_INFO]) + encode_number(0) + encode_number(len(blocks))
+        info += bytes([K_SIZE]) + b"".join(encode_number(block.pack_size) for block in blocks)
+        info += bytes([K_END])
+
+        info += bytes([K_UNPACK_INFO, K_FOLDER]) + encode_number(len(blocks)) + b"\x00"
+        for block in blocks:
+            info += self._coders(block)
+        info += bytes([K_CODERS_UNPACK_SIZE])
+        for block in blocks:
+            total = sum(block.unpack_sizes)
+            coder_count = 2 if block.method == METHOD_BCJ_LZMA2 else 1
+            info += encode_number(total) * coder_count
+        info += bytes([K_END])
+
+        info += bytes([K_SUBSTREAMS_INFO, K_NUM_UNPACK_STREAM])
+        info += b"".join(encode_number(len(block.entries)) for block in blocks)
+        if any(len(block.entries) > 1 for block in blocks):
+            info += bytes([K_SIZE])
+            for block in blocks:
+                info += b"".join(encode_number(size) for size in block.unpack_sizes[:-1])
+        info += bytes([K_CRC, 0x01])
+        for block in blocks:
+            info += b"".join(struct.pack("<I", crc) for crc in block.crcs)
+        info += bytes([K_END])
+
+        info += bytes([K_END])
+        return bytes(info)
+
+    def _files_info(self, entries: List[Dict]) -> bytes:
+        """文件信息（名称、修改时间、属性）"""
+        info = bytearray([K_FILES_INFO]) + encode_number(len(entries))
+
+        empty = [entry["size"] == 0 for entry in entries]
+        if any(empty):
+            info += self._property(K_EMPTY_STREAM, encode_bits(empty))
+            info += self._property(K_EMPTY_FILE, encode_bits([True] * sum(empty)))
+
+        names = b"".join(entry["arcname"].encode("utf-16-le") + b"\x00\x00" for entry in entries)
+        info += self._property(K_NAME, b"\x00" + names)
+
+        now = time.time()
+        times = bytearray(b"\x01\x00")
+        for entry in entries:
+            mtime = os.path.getmtime(entry["source"]) if entry["source"] else now
+            times += struct.pack("<Q", int(mtime * 10000000) + FILETIME_EPOCH)
+        info += self._property(K_MTIME, bytes(times))
+
+        attributes = b"\x01\x00" + struct.pack("<I", FILE_ATTRIBUTE_ARCHIVE) * len(entries)
+        info += self._property(K_ATTRIBUTES, attributes)
+
+        info += bytes([K_END])
+        return bytes(info)
+
+    @staticmethod
+    def _property(property_id: int, data: bytes) -> bytes:
+        """文件属性记录"""
+        return bytes([property_id]) + encode_number(len(data)) + data
+
+    def _build_header(self) -> bytes:
+        """生成头部"""
+        entries = [entry for block in self._blocks for entry in block.entries] + self._empty_entries
+        for entry in self._empty_entries:
+            self.results[entry["arcname"]] = {"crc": 0, "file_size": 0, "method": METHOD_COPY,
+                                              "sha256": hashlib.sha256().hexdigest(),
+                                              **stat_result(entry.get("empty_stat"))}
+
+        header = bytearray([K_HEADER])
+        if self._blocks:
+            header += self._streams_info()
+        if entries:
+            header += self._files_info(entries)
+        header += bytes([K_END])
+        return bytes(header)
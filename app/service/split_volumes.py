@@ -0,0 +1,209 @@
+# coding:utf-8
+"""
+Split Volumes
+分卷模块 - 写入时把压缩包切分为固定大小的分卷（name.001、name.002……），读取时把分卷当作一个文件
+"""
+import io
+import os
+from typing import List
+
+MB = 1024 * 1024
+VOLUME_BUFFER_SIZE = MB             # Read buffer of a joined volume set
+
+
+def volume_path(archive_path: str, index: int) -> str:
+    """第index个分卷的路径（从1开始，7-Zip的命名方式）"""
+    return f"{archive_path}.{index:03d}"
+
+
+def list_volumes(archive_path: str) -> List[str]:
+    """列出磁盘上连续存在的分卷"""
+    paths = []
+    while os.path.isfile(volume_path(archive_path, len(paths) + 1)):
+        paths.append(volume_path(archive_path, len(paths) + 1))
+    return paths
+
+
+def remove_archive(archive_path: str):
+    """删除压缩包及其分卷（不存在时忽略）"""
+    for path in [archive_path] + list_volumes(archive_path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def open_archive(path: str):
+    """以二进制只读方式打开压缩包；路径是第一个分卷时按顺序拼接所有分卷"""
+    if path.endswith(".001"):
+        paths = list_volumes(path[:-len(".001")])
+        if len(paths) > 1:
+            return io.BufferedReader(VolumeReader(paths), VOLUME_BUFFER_SIZE)
+    return open(path, 'rb')
+
+
+class VolumeWriter(io.RawIOBase):
+    """分卷写入文件
+
+    A writable, seekable file whose bytes land in `<archive>.001`,
+    `<archive>.002`, ... of `volume_size` bytes each; a volume is created when
+    the stream reaches it, so the archive is split while it is written and
+    never exists as one file. Seeking back is allowed within what was already
+    written (the 7z writer fills in its start header last). Volumes are raw
+    byte ranges: 7-Zip opens the first one directly, any tool can read the
+    archive after concatenating them.
+    """
+    def __init__(self, archive_path: str, volume_size: int):
+        super().__init__()
+        if volume_size <= 0:
+            raise ValueError("volume size must be positive")
+        self.archive_path = archive_path
+        self.volume_size = volume_size
+        self.paths = []             # Volumes created so far
+        self._position = 0
+        self._size = 0
+        self._index = -1            # Volume held open in _handle
+        self._handle = None
+        self._handle_position = 0   # Offset of _handle within its volume
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0 or offset > self._size:
+            raise OSError(f"cannot seek to {offset} in a volume set of {self._size} bytes")
+        self._position = offset
+        return offset
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        written = 0
+        while written < len(view):
+            index, offset = divmod(self._position, self.volume_size)
+            handle = self._open_volume(index)
+            if self._handle_position != offset:
+                handle.seek(offset)
+            count = min(len(view) - written, self.volume_size - offset)
+            handle.write(view[written:written + count])
+            self._handle_position = offset + count
+            written += count
+            self._position += count
+            self._size = max(self._size, self._position)
+        return written
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        super().close()
+
+    def _open_volume(self, index: int):
+        """切换到第index个分卷（新分卷在写到时才创建）"""
+        if index == self._index:
+            return self._handle
+        if self._handle is not None:
+            self._handle.close()
+        if index < len(self.paths):
+            self._handle = open(self.paths[index], 'r+b')
+        else:
+            path = volume_path(self.archive_path, index + 1)
+            self._handle = open(path, 'wb')
+            self.paths.append(path)
+        self._index = index
+        self._handle_position = 0
+        return self._handle
+
+
+class VolumeReader(io.RawIOBase):
+    """把按顺序排列的分卷当作一个只读文件
+
+    With `volume_size` the volumes are laid out as VolumeWriter writes them
+    (every volume but the last holds exactly that many bytes), and `paths` may
+    be the writer's own list: volumes created and bytes appended after the
+    reader was opened can be read too.
+    """
+    def __init__(self, paths: List[str], volume_size: int = 0):
+        super().__init__()
+        self.volume_size = volume_size
+        self.paths = paths if volume_size > 0 else list(paths)
+        self._offsets = []          # Start of every volume in the joined stream
+        size = 0
+        for path in self.paths if volume_size <= 0 else []:
+            self._offsets.append(size)
+            size += os.path.getsize(path)
+        self._size = size
+        self._position = 0
+        self._index = -1
+        self._handle = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._current_size()
+        if offset < 0:
+            raise OSError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        if self.volume_size > 0:
+            index = self._position // self.volume_size
+            if index >= len(self.paths):
+                return 0
+        elif self._position >= self._size:
+            return 0
+        else:
+            index = self._volume_at(self._position)
+        if index != self._index:
+            if self._handle is not None:
+                self._handle.close()
+            self._handle = open(self.paths[index], 'rb')
+            self._index = index
+        start = index * self.volume_size if self.volume_size > 0 else self._offsets[index]
+        self._handle.seek(self._position - start)
+        count = self._handle.readinto(buffer)
+        self._position += count
+        return count
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        super().close()
+
+    def _current_size(self) -> int:
+        """拼接后的总大小（按写入布局读取时以磁盘上的当前分卷计算）"""
+        if self.volume_size <= 0 or not self.paths:
+            return self._size
+        return (len(self.paths) - 1) * self.volume_size + os.path.getsize(self.paths[-1])
+
+    def _volume_at(self, position: int) -> int:
+        """包含position的分卷序号"""
+        index = len(self._offsets) - 1
+        while self._offsets[index] > position:
+            index -= 1
+        return index
@@ -0,0 +1,195 @@
+# coding:utf-8
+"""
+Staging Strategy
+暂存策略模块 - 以尽可能少的数据拷贝把源文件放入缓存目录
+"""
+import os
+import sys
+import errno
+import shutil
+import threading
+from typing import Callable, Dict, Optional
+
+# Strategy names, in the order they are tried
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+SYSTEM_COPY = "system_copy"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE = "sendfile"
+BUFFERED = "buffered"
+RESUMED = "resumed"             # Already staged by an interrupted build
+
+CHUNK_SIZE = 64 * 1024 * 1024   # Bytes per copy_file_range/sendfile call
+BUFFER_SIZE = 1024 * 1024       # Bytes per read in the buffered fallback
+
+FICLONE = 0x40049409            # Linux ioctl: share extents with another file (btrfs, xfs)
+
+# Errors meaning "this strategy does not work here", not "the copy failed"
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EPERM, errno.EACCES, errno.EINVAL, errno.ENOSYS,
+    errno.EOPNOTSUPP, errno.ENOTSUP, errno.EMLINK, errno.ENOTTY, errno.EBADF
+}
+
+
+class StagingStrategy:
+    """暂存策略选择器
+
+    For every file it tries, in order: a hardlink (same volume only), a
+    reflink / copy_file_range / sendfile / native system copy, and finally
+    a buffered copy. Strategies that fail with an "unsupported" error are
+    remembered per source volume so they are not retried for every file.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.cache_device = os.stat(cache_dir).st_dev
+        self._disabled = set()      # (strategy, source device) pairs known not to work
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def stage_file(self, source_path: str, dest_path: str,
+                   progress: Optional[Callable[[int], None]] = None) -> str:
+        """暂存单个文件，返回实际使用的策略
+
+        Args:
+            source_path: 源文件路径
+            dest_path: 缓存中的目标路径
+            progress: 已拷贝字节数回调
+        """
+        progress = progress or (lambda count: None)
+        source_stat = os.stat(source_path)
+        if self.is_staged(source_stat, dest_path):
+            progress(source_stat.st_size)
+            self._record(RESUMED, source_stat.st_size)
+            return RESUMED
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+
+        if source_stat.st_dev == self.cache_device:
+            strategies = (HARDLINK, REFLINK, COPY_FILE_RANGE, SENDFILE, SYSTEM_COPY)
+        else:
+            strategies = (COPY_FILE_RANGE, SENDFILE, SYSTEM_COPY)
+
+        used = None
+        for strategy in strategies:
+            if (strategy, source_stat.st_dev) in self._disabled:
+                continue
+            try:
+                if self._try_strategy(strategy, source_path, dest_path, source_stat.st_size, progress):
+                    used = strategy
+                    break
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS and getattr(e, "winerror", None) is None:
+                    raise
+                with self._lock:
+                    self._disabled.add((strategy, source_stat.st_dev))
+                if os.path.lexists(dest_path):
+                    os.remove(dest_path)
+
+        if used is None:
+            self._copy_buffered(source_path, dest_path, progress)
+            used = BUFFERED
+
+        if used != HARDLINK:
+            shutil.copystat(source_path, dest_path)
+
+        self._record(used, source_stat.st_size)
+        return used
+
+    @staticmethod
+    def is_staged(source_stat: os.stat_result, dest_path: str) -> bool:
+        """判断目标文件是否已是源文件的完整暂存副本
+
+        Every strategy except a hardlink finishes with copystat, so a copy that
+        was cut short keeps its own mtime and is never mistaken for a full one.
+        """
+        try:
+            dest_stat = os.stat(dest_path)
+        except OSError:
+            return False
+        if os.path.samestat(source_stat, dest_stat):
+            return True
+        return dest_stat.st_size == source_stat.st_size and dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+    def report(self) -> Dict[str, Dict]:
+        """按策略汇总的文件数与字节数"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def _record(self, strategy: str, size: int):
+        """记录策略使用情况（线程安全）"""
+        with self._lock:
+            stats = self._stats.setdefault(strategy, {"files": 0, "bytes": 0})
+            stats["files"] += 1
+            stats["bytes"] += size
+
+    def _try_strategy(self, strategy: str, source_path: str, dest_path: str, size: int,
+                      progress: Callable[[int], None]) -> bool:
+        """尝试某一策略，平台不支持时返回False"""
+        if strategy == HARDLINK:
+            os.link(source_path, dest_path)
+        elif strategy == REFLINK:
+            if not self._reflink(source_path, dest_path):
+                return False
+        elif strategy == COPY_FILE_RANGE:
+            if not hasattr(os, "copy_file_range"):
+                return False
+            self._copy_with(os.copy_file_range, source_path, dest_path, size, progress)
+            return True
+        elif strategy == SENDFILE:
+            if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"):
+                return False
+            self._copy_with(os.sendfile, source_path, dest_path, size, progress)
+            return True
+        elif strategy == SYSTEM_COPY:
+            if not self._system_copy(source_path, dest_path):
+                return False
+        else:
+            return False
+        progress(size)
+        return True
+
+    def _reflink(self, source_path: str, dest_path: str) -> bool:
+        """写时复制克隆（Linux FICLONE）"""
+        if not sys.platform.startswith("linux"):
+            return False
+        import fcntl
+        with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+
+    def _system_copy(self, source_path: str, dest_path: str) -> bool:
+        """Windows 内核态拷贝（ReFS/Dev Drive 上自动使用块克隆）"""
+        if sys.platform != "win32":
+            return False
+        import ctypes
+        if not ctypes.windll.kernel32.CopyFileW(source_path, dest_path, False):
+            raise ctypes.WinError()
+        return True
+
+    def _copy_buffered(self, source_path: str, dest_path: str, progress: Callable[[int], None]):
+        """常规的用户态缓冲拷贝"""
+        with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+            while True:
+                chunk = src.read(BUFFER_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                progress(len(chunk))
+
+    def _copy_with(self, copy_func, source_path: str, dest_path: str, size: int,
+                   progress: Callable[[int], None]):
+        """使用 copy_file_range / sendfile 在内核中拷贝"""
+        with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+            copied = 0
+            while copied < size:
+                if copy_func is os.sendfile:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), copied, min(CHUNK_SIZE, size - copied))
+                else:
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), min(CHUNK_SIZE, size - copied),
+                                              copied, copied)
+                if sent == 0:
+                    break
+                copied += sent
+                progress(sent)
+            if copied != size:
+                raise OSError(errno.EIO, f"short copy: {source_path}")
@@ -0,0 +1,206 @@
+# coding:utf-8
+"""
+Thumbnail Service
+缩略图服务模块 - 在线程池中解码并缩放封面，内存LRU加磁盘缓存，界面线程只绘制结果
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from PySide6.QtCore import QObject, Signal, Qt, QSize
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader, QPixmap
+from PIL import Image, ImageOps
+from ..common.config import cfg
+
+THUMBNAIL_HEIGHT = 120
+THUMBNAIL_VERSION = 1               # Bump when the scaling or encoding below changes
+MEMORY_CACHE_SIZE = 256             # Thumbnails kept as QPixmap in memory
+MAX_PENDING = 64                    # Queued requests beyond this drop the oldest (rows scrolled away)
+JPEG_QUALITY = 90
+
+
+def thumbnail_dir() -> str:
+    """磁盘缩略图所在目录（位于构建缓存中，由缓存管理器一并淘汰）"""
+    return os.path.join(cfg.cacheDirectory, "thumbnails")
+
+
+def file_identity(source_path: str) -> Tuple[int, int]:
+    """源文件的大小与修改时间，文件被替换后随之变化"""
+    stat = os.stat(source_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def thumbnail_key(source_path: str, height: int = THUMBNAIL_HEIGHT) -> str:
+    """缩略图的缓存键：路径、大小与修改时间，文件被替换后自然失效"""
+    size, mtime_ns = file_identity(source_path)
+    identity = f"{THUMBNAIL_VERSION}:{os.path.abspath(source_path)}:{size}:{mtime_ns}:{height}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def load_thumbnail(source_path: str, cache_dir: str, height: int = THUMBNAIL_HEIGHT) -> QImage:
+    """读取或生成一张缩略图（在工作线程中调用）
+
+    A cached file is used when its key matches; otherwise the image is
+    decoded with QImageReader (scaled while decoding where the format allows)
+    or, for formats Qt cannot read, with Pillow, then written to the cache.
+
+    Raises:
+        FileNotFoundError: 源文件不存在
+        OSError: 无法解码
+    """
+    key = thumbnail_key(source_path, height)
+    for ext in (".jpg", ".png"):
+        cached_path = os.path.join(cache_dir, key + ext)
+        if os.path.isfile(cached_path):
+            image = QImage(cached_path)
+            if not image.isNull():
+                # Mark as recently used for the cache manager
+                try:
+                    os.utime(cached_path)
+                except OSError:
+                    pass
+                return image
+
+    image = _decode_qt(source_path, height)
+    if image.isNull():
+        image = _decode_pillow(source_path, height)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    ext = ".png" if image.hasAlphaChannel() else ".jpg"
+    cached_path = os.path.join(cache_dir, key + ext)
+    temp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+    if image.save(temp_path, ext[1:].upper(), JPEG_QUALITY if ext == ".jpg" else -1):
+        os.replace(temp_path, cached_path)
+    else:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    return image
+
+
+def _decode_qt(source_path: str, height: int) -> QImage:
+    """用QImageReader解码并缩放，失败时返回空图片"""
+    reader = QImageReader(source_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and size.height() > height and not reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+        # Decoders such as JPEG skip most of the work at a smaller size
+        reader.setScaledSize(QSize(max(1, round(size.width() * height / size.height())), height))
+    image = reader.read()
+    if not image.isNull() and image.height() != height:
+        image = image.scaledToHeight(height, Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+def _decode_pillow(source_path: str, height: int) -> QImage:
+    """用Pillow解码并缩放（Qt缺少对应图片插件时）"""
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            mode = "RGBA" if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info else "RGB"
+            width = max(1, round(image.width * height / image.height))
+            image = image.convert(mode).resize((width, height), Image.Resampling.LANCZOS)
+            data = image.tobytes("raw", mode)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise OSError(f"cannot decode {source_path}: {e}")
+    image_format = QImage.Format.Format_RGBA8888 if mode == "RGBA" else QImage.Format.Format_RGB888
+    # Copy, the QImage must not outlive the bytes it was built on
+    return QImage(data, width, height, width * len(mode), image_format).copy()
+
+
+class ThumbnailService(QObject):
+    """缩略图服务
+
+    `thumbnail()` answers from memory or returns None at once and queues the
+    path on a small thread pool; `thumbnailReady` fires when it arrives, so
+    views paint a placeholder meanwhile and list load time does not depend
+    on cover sizes. Workers only produce QImage; the QPixmap is made on the
+    UI thread. When more than MAX_PENDING requests wait, the oldest ones are
+    cancelled, they are asked for again if their rows are painted again.
+
+    Each pixmap in memory remembers the size and mtime of the file it was
+    made from; `refresh()` re-stats them and drops the ones whose file was
+    replaced or removed.
+    """
+    thumbnailReady = Signal(str)                # source path
+    _loaded = Signal(str, object, object, str)  # source path, file identity, QImage or None, error
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._memory = OrderedDict()    # source path -> (file identity, QPixmap), least recently used first
+        self._errors = {}               # source path -> "missing" / "failed"
+        self._pending = OrderedDict()   # source path -> Future, oldest first
+        self._executor = None
+        self._loaded.connect(self._on_loaded)
+
+    def thumbnail(self, source_path: str) -> Optional[QPixmap]:
+        """已加载的缩略图；尚未加载时排队加载并返回None"""
+        cached = self._memory.get(source_path)
+        if cached is not None:
+            self._memory.move_to_end(source_path)
+            return cached[1]
+        if source_path and source_path not in self._errors:
+            self._request(source_path)
+        return None
+
+    def error(self, source_path: str) -> Optional[str]:
+        """加载失败的原因："missing"（文件不存在）、"failed"（无法解码）或None"""
+        return self._errors.get(source_path)
+
+    def refresh(self):
+        """忘记失败记录并丢弃源文件已变化的缩略图，下次绘制时重新加载（记录整体变化后调用）"""
+        self._errors.clear()
+        for source_path, (identity, pixmap) in list(self._memory.items()):
+            try:
+                if file_identity(source_path) == identity:
+                    continue
+            except OSError:
+                pass
+            del self._memory[source_path]
+
+    def _request(self, source_path: str):
+        """提交加载任务"""
+        if source_path in self._pending:
+            self._pending.move_to_end(source_path)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                                thread_name_prefix="thumbnail")
+        self._pending[source_path] = self._executor.submit(self._load, source_path, thumbnail_dir())
+        # Tasks already running cannot be cancelled and finish on their own
+        for path in list(self._pending):
+            if len(self._pending) <= MAX_PENDING:
+                break
+            if self._pending[path].cancel():
+                del self._pending[path]
+
+    def _load(self, source_path: str, cache_dir: str):
+        """工作线程：读取缩略图并把结果送回界面线程"""
+        identity = None
+        try:
+            # Taken before decoding, a file replaced meanwhile then counts as changed
+            identity = file_identity(source_path)
+            self._loaded.emit(source_path, identity, load_thumbnail(source_path, cache_dir), "")
+        except FileNotFoundError:
+            self._loaded.emit(source_path, identity, None, "missing")
+        except Exception as e:
+            print(f"生成缩略图失败: {e}")
+            self._loaded.emit(source_path, identity, None, "failed")
+
+    def _on_loaded(self, source_path: str, identity: Optional[Tuple[int, int]], image: Optional[QImage], error: str):
+        """界面线程：缓存结果并通知视图"""
+        self._pending.pop(source_path, None)
+        if image is None or image.isNull():
+            self._errors[source_path] = error or "failed"
+        else:
+            self._memory[source_path] = (identity, QPixmap.fromImage(image))
+            self._memory.move_to_end(source_path)
+            while len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+        self.thumbnailReady.emit(source_path)
+
+
+thumbnailService = ThumbnailService()
@@ -0,0 +1,133 @@
+# coding:utf-8
+"""
+Watch Service
+监视服务模块 - 监视区块引用的文件与文件夹，变化平息后报告受影响的区块
+"""
+import os
+import time
+from typing import Dict, Hashable, List
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer
+from ..common.config import cfg
+
+
+class WatchService(QObject):
+    """文件监视服务
+
+    Sources map a key (a block) to the paths it references. Folders are
+    watched recursively: the folder, every subfolder and every file, since
+    QFileSystemWatcher only reports direct children being added or removed.
+    Change events are collected until none arrived for `cfg.watchDebounceMs`,
+    then changesSettled carries the keys of every touched source and the
+    perf_counter() time of the first event, to measure rebuild latency.
+    Folders that changed are scanned again, and files replaced by an atomic
+    save (which drops them from the watcher) are watched again.
+    """
+    changesSettled = Signal(list, float)    # affected keys, perf_counter() of the first change
+    watchedCountChanged = Signal(int)       # number of paths being watched
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_path_changed)
+        self.watcher.directoryChanged.connect(self._on_path_changed)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._flush)
+        self._roots = {}            # normalized root -> (path, keys referencing it)
+        self._root_paths = {}       # normalized root -> paths watched for it
+        self._owners = {}           # normalized watched path -> (path, keys)
+        self._pending = set()       # keys touched since the last flush
+        self._dirty_roots = set()   # roots whose folders changed since the last flush
+        self._first_change = None
+        self.watched_count = 0
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        """规范化路径，用于比较监视器报告的路径"""
+        return os.path.normcase(os.path.normpath(path))
+
+    def set_sources(self, sources: Dict[Hashable, List[str]]):
+        """设置要监视的路径（键 -> 路径列表），只扫描新增的文件夹"""
+        roots = {}
+        for key, paths in sources.items():
+            for path in paths:
+                if path:
+                    root = self._normalize(path)
+                    roots.setdefault(root, (path, set()))[1].add(key)
+        for root in set(self._root_paths) - set(roots):
+            del self._root_paths[root]
+        self._roots = roots
+        for root, (path, keys) in roots.items():
+            if root not in self._root_paths:
+                self._root_paths[root] = self._expand(path)
+        self._sync()
+
+    def clear(self):
+        """停止监视全部路径"""
+        self.timer.stop()
+        self._pending.clear()
+        self._dirty_roots.clear()
+        self._first_change = None
+        self.set_sources({})
+
+    @staticmethod
+    def _expand(path: str) -> List[str]:
+        """展开一个源路径：文件本身，或文件夹及其下所有子文件夹与文件"""
+        if not os.path.isdir(path):
+            return [path]
+        paths = []
+        for root, dirs, files in os.walk(path):
+            paths.append(root)
+            paths.extend(os.path.join(root, file) for file in files)
+        return paths
+
+    def _sync(self):
+        """让监视器中的路径与当前源一致"""
+        owners = {}
+        for root, (_, keys) in self._roots.items():
+            for path in self._root_paths.get(root, ()):
+                owners.setdefault(self._normalize(path), (path, set()))[1].update(keys)
+
+        watched = {self._normalize(path): path for path in self.watcher.files() + self.watcher.directories()}
+        stale = [path for normalized, path in watched.items() if normalized not in owners]
+        if stale:
+            self.watcher.removePaths(stale)
+        missing = [path for normalized, (path, _) in owners.items()
+                   if normalized not in watched and os.path.exists(path)]
+        failed = self.watcher.addPaths(missing) if missing else []
+        self._owners = owners
+        count = len(self.watcher.files()) + len(self.watcher.directories())
+        if count != self.watched_count or failed:
+            self.watched_count = count
+            self.watchedCountChanged.emit(count)
+
+    def _on_path_changed(self, path: str):
+        """记录一次变化，并重新开始防抖计时"""
+        normalized = self._normalize(path)
+        owner = self._owners.get(normalized)
+        if owner is None:
+            return
+        self._pending.update(owner[1])
+        if os.path.isdir(path) or not os.path.exists(path):
+            # New or removed children: rescan the sources containing this path
+            for root in self._roots:
+                if normalized == root or normalized.startswith(os.path.join(root, "")):
+                    self._dirty_roots.add(root)
+        if self._first_change is None:
+            self._first_change = time.perf_counter()
+        self.timer.start(cfg.watchDebounceMs)
+
+    def _flush(self):
+        """变化平息：重新扫描变动的文件夹并报告受影响的键"""
+        for root in self._dirty_roots:
+            if root in self._roots:
+                self._root_paths[root] = self._expand(self._roots[root][0])
+        self._dirty_roots.clear()
+        self._sync()
+
+        keys = list(self._pending)
+        first_change = self._first_change
+        self._pending = set()
+        self._first_change = None
+        if keys:
+            self.changesSettled.emit(keys, first_change)
@@ -3,10 +3,11 @@
 Home Interface
 主界面模块
 """
+import time
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer
 from PySide6.QtGui import QPixmap, QPainter, QColor, QPalette
-from qfluentwidgets import ScrollArea, Flyout, InfoBarIcon, InfoBar, InfoBarPosition, isDarkTheme
+from qfluentwidgets import ScrollArea, Flyout, InfoBarIcon, InfoBar, InfoBarPosition, isDarkTheme, CaptionLabel
 from ..components.mod_info_card import ModInfoCard
 from ..components.add_function_card import AddFunctionCard
 from ..components.cover_block import CoverBlock
@@ -15,6 +16,7 @@ from ..components.separator_block import SeparatorBlock
 from ..components.mod_file_block import ModFileBlock
 from ..components.floating_menu_button import FloatingMenuButton
 from ..service.build_service import BuildService
+from ..service.watch_service import WatchService
 from ..common.language import lang
 
 class HomeInterface(ScrollArea):
@@ -41,9 +43,17 @@ class HomeInterface(ScrollArea):
         self.sticky_add_function_card = None          # Sticky AddFunctionCard copy
         self.is_add_function_sticky = False           # AddFunctionCard是否已固定
         
+        # Watch mode related properties
+        self.is_watching = False            # Whether watch mode is on
+        self.watch_pending = set()          # Blocks changed while a build was running
+        self.watch_first_change = None      # perf_counter() of the first pending change
+        self.watch_rebuild = None           # Running watch rebuild: {"started", "modules"}
+        self.watch_status = ("watch_status_watching", {})   # Status bar text key and arguments
+        
         self._initUI()
         self._initFloatingMenuButton()
         self._initBuildService()
+        self._initWatchService()
         self._connectSignals()
     
     def focusOutEvent(self, event):
@@ -110,6 +120,8 @@ class HomeInterface(ScrollArea):
         self.floatingMenuButton = FloatingMenuButton(self)
         self.floatingMenuButton.startBuildRequested.connect(self._onStartBuild)
         self.floatingMenuButton.clearAllAreaRequested.connect(self._onClearAllArea)
+        self.floatingMenuButton.cancelBuildRequested.connect(self._onCancelBuild)
+        self.floatingMenuButton.watchModeToggled.connect(self._onWatchModeToggled)
         self.floatingMenuButton.raise_()
     
     def _initBuildService(self):
@@ -120,8 +132,17 @@ class HomeInterface(ScrollArea):
         self.buildService.statusChanged.connect(self._onBuildStatusChanged)
         self.buildService.buildCompleted.connect(self._onBuildCompleted)
         self.buildService.buildFailed.connect(self._onBuildFailed)
+        self.buildService.buildCancelled.connect(self._onBuildCancelled)
         self.floatingMenuButton.connectBuildService(self.buildService)
     
+    def _initWatchService(self):
+        """初始化监视服务与状态栏"""
+        self.watchService = WatchService(self)
+        self.watchService.changesSettled.connect(self._onWatchChangesSettled)
+        self.watchService.watchedCountChanged.connect(self._onWatchedCountChanged)
+        self.watchStatusLabel = CaptionLabel(self)
+        self.watchStatusLabel.hide()
+    
     def _connectSignals(self):
         """连接信号"""
         lang.languageChanged.connect(self._updateTexts)
@@ -132,7 +153,7 @@ class HomeInterface(ScrollArea):
     
     def _updateTexts(self):
         """更新文本"""
-        pass    # The child component automatically updates the text
+        self._updateWatchStatus()   # The child component automatically updates the text
     
     def _onStartBuild(self):
         """开始构筑处理"""
@@ -171,6 +192,7 @@ class HomeInterface(ScrollArea):
         
         self.cover_block = CoverBlock(self.scrollWidget)
         self.cover_block.deleteRequested.connect(self._removeCoverBlock)
+        self._connectWatchSignals(self.cover_block)
         insert_index = 2
         self.vBoxLayout.insertWidget(insert_index, self.cover_block)
     
@@ -191,6 +213,7 @@ class HomeInterface(ScrollArea):
             self.vBoxLayout.removeWidget(self.cover_block)
             self.cover_block.deleteLater()
             self.cover_block = None
+            self._syncWatchSources()
     
     def _addWarningBlock(self):
         """添加警告区块"""
@@ -201,6 +224,7 @@ class HomeInterface(ScrollArea):
         warning_block.dragStarted.connect(self._onDragStarted)
         warning_block.dragMoved.connect(self._onDragMoved)
         warning_block.dragEnded.connect(self._onDragEnded)
+        self._connectWatchSignals(warning_block)
         insert_index = self._getSortableInsertIndex()
         self.warning_blocks.append(warning_block)
         self.sortable_blocks.append(warning_block)
@@ -214,6 +238,7 @@ class HomeInterface(ScrollArea):
             self.sortable_blocks.remove(warning_block)
         self.vBoxLayout.removeWidget(warning_block)
         warning_block.deleteLater()
+        self._syncWatchSources()
     
     def _copyWarningBlock(self, warning_block):
         """复制警告区块"""
@@ -225,6 +250,7 @@ class HomeInterface(ScrollArea):
         new_warning_block.dragStarted.connect(self._onDragStarted)
         new_warning_block.dragMoved.connect(self._onDragMoved)
         new_warning_block.dragEnded.connect(self._onDragEnded)
+        self._connectWatchSignals(new_warning_block)
 
         if warning_data["description"]:
             new_warning_block.descriptionEdit.setPlainText(warning_data["description"])
@@ -515,6 +541,7 @@ class HomeInterface(ScrollArea):
         mod_file_block.dragStarted.connect(self._onDragStarted)
         mod_file_block.dragMoved.connect(self._onDragMoved)
         mod_file_block.dragEnded.connect(self._onDragEnded)
+        self._connectWatchSignals(mod_file_block)
         insert_index = self._getSortableInsertIndex()
         self.mod_file_blocks.append(mod_file_block)
         self.sortable_blocks.append(mod_file_block)
@@ -528,6 +555,7 @@ class HomeInterface(ScrollArea):
             self.sortable_blocks.remove(mod_file_block)
         self.vBoxLayout.removeWidget(mod_file_block)
         mod_file_block.deleteLater()
+        self._syncWatchSources()
     
     def _copyModFileBlock(self, mod_file_block):
         """复制MOD文件区块"""
@@ -539,6 +567,7 @@ class HomeInterface(ScrollArea):
         new_mod_file_block.dragStarted.connect(self._onDragStarted)
         new_mod_file_block.dragMoved.connect(self._onDragMoved)
         new_mod_file_block.dragEnded.connect(self._onDragEnded)
+        self._connectWatchSignals(new_mod_file_block)
         new_mod_file_block.setModFileData(mod_file_data)
         self.mod_file_blocks.append(new_mod_file_block)
         self.sortable_blocks.append(new_mod_file_block)
@@ -599,6 +628,109 @@ class HomeInterface(ScrollArea):
         
         return sorted_blocks
     
+    def _connectWatchSignals(self, block):
+        """区块引用的图片或文件变化时更新监视列表"""
+        block.imageUpload.imageChanged.connect(self._syncWatchSources)
+        if isinstance(block, ModFileBlock):
+            block.filesDisplayWidget.filesChanged.connect(self._syncWatchSources)
+    
+    def _getWatchSources(self):
+        """收集各区块引用的路径（区块 -> 路径列表）"""
+        sources = {}
+        if self.cover_block is not None:
+            sources[self.cover_block] = [self.cover_block.getCoverData()["image_path"]]
+        for warning_block in self.warning_blocks:
+            sources[warning_block] = [warning_block.getWarningData()["image_path"]]
+        for mod_file_block in self.mod_file_blocks:
+            mod_file_data = mod_file_block.getModFileData()
+            sources[mod_file_block] = [mod_file_data["image_path"]] + [path for path, _ in mod_file_data["files"]]
+        return sources
+    
+    def _syncWatchSources(self, *args):
+        """监视模式下刷新监视的路径"""
+        if self.is_watching:
+            self.watchService.set_sources(self._getWatchSources())
+    
+    def _onWatchModeToggled(self, enabled: bool):
+        """开启或关闭监视模式"""
+        self.is_watching = enabled
+        self.watch_pending.clear()
+        self.watch_first_change = None
+        if enabled:
+            self.watch_status = ("watch_status_watching", {})
+            self._syncWatchSources()
+            self._updateWatchStatus()
+            self.watchStatusLabel.show()
+            self.watchStatusLabel.raise_()
+        else:
+            self.watchService.clear()
+            self.watchStatusLabel.hide()
+    
+    def _onWatchedCountChanged(self, count: int):
+        """监视的路径数量变化处理"""
+        self._updateWatchStatus()
+    
+    def _updateWatchStatus(self):
+        """更新状态栏中的监视状态"""
+        if not self.is_watching:
+            return
+        key, arguments = self.watch_status
+        self.watchStatusLabel.setText(lang.get_text(key).format(count=self.watchService.watched_count, **arguments))
+        self._updateWatchStatusGeometry()
+    
+    def _updateWatchStatusGeometry(self):
+        """将状态栏放在左下角，与浮层菜单按钮对齐"""
+        self.watchStatusLabel.adjustSize()
+        margins = self.vBoxLayout.contentsMargins()
+        # The floating button is 40px high and sits 60px above the bottom edge
+        self.watchStatusLabel.move(margins.left(), self.height() - 80 - self.watchStatusLabel.height() // 2)
+    
+    def _onWatchChangesSettled(self, blocks: list, first_change: float):
+        """文件变化平息后增量重构受影响的区块（构建进行中时等其结束）"""
+        if not self.is_watching:
+            return
+        self.watch_pending.update(blocks)
+        if self.watch_first_change is None:
+            self.watch_first_change = first_change
+        if not self.buildService.is_building():
+            self._startWatchRebuild()
+    
+    def _startWatchRebuild(self):
+        """只重新规划变化的区块并开始构建"""
+        changed = set()
+        for block in self.watch_pending:
+            if block is self.cover_block:
+                changed.add(0)
+            elif block in self.sortable_blocks:
+                changed.add(self.sortable_blocks.index(block) + 1)
+        started = self.watch_first_change
+        self.watch_pending = set()
+        self.watch_first_change = None
+        if not changed:
+            return
+        
+        mod_info = self.modInfoCard.getModInfo()
+        cover_data = self.getCoverData()
+        sorted_blocks = self._getSortedBlocksData()
+        try:
+            plan = self.buildService.plan_build(mod_info, cover_data, sorted_blocks, estimate=False, changed=changed)
+        except Exception as e:
+            self.watch_status = ("watch_status_failed", {"error": str(e)})
+            self._updateWatchStatus()
+            return
+        
+        self.watch_rebuild = {"started": started, "modules": len(changed)}
+        self.watch_status = ("watch_status_rebuilding", {"modules": len(changed)})
+        self._updateWatchStatus()
+        self.floatingMenuButton.startProgress()
+        self.buildService.start_build(mod_info, cover_data, sorted_blocks, plan)
+    
+    def _finishWatchRebuild(self):
+        """监视重构结束，处理期间积累的变化"""
+        self.watch_rebuild = None
+        if self.is_watching and self.watch_pending and not self.buildService.is_building():
+            self._startWatchRebuild()
+    
     def _onBuildStarted(self):
         """构建开始处理"""
         print("构建开始")
@@ -613,6 +745,15 @@ class HomeInterface(ScrollArea):
     
     def _onBuildCompleted(self, output_path: str):
         """构建完成处理"""
+        if self.watch_rebuild is not None:
+            # Watch rebuilds report in the status bar instead of an info bar
+            seconds = time.perf_counter() - self.watch_rebuild["started"]
+            self.watch_status = ("watch_status_rebuilt", {"modules": self.watch_rebuild["modules"],
+                                                          "seconds": f"{seconds:.1f}"})
+            self._updateWatchStatus()
+            print(f"增量重构完成: {output_path}，耗时 {seconds:.2f}s")
+            self._finishWatchRebuild()
+            return
         InfoBar.success(
             title=lang.get_text("build_success_title"),
             content=f"{lang.get_text('build_success_content')}: {output_path}",
@@ -623,9 +764,13 @@ class HomeInterface(ScrollArea):
             parent=self
         )
         print(f"构建完成: {output_path}")
+        self._finishWatchRebuild()
     
     def _onBuildFailed(self, error_msg: str):
         """构建失败处理"""
+        if self.watch_rebuild is not None:
+            self.watch_status = ("watch_status_failed", {"error": error_msg})
+            self._updateWatchStatus()
         InfoBar.error(
             title=lang.get_text("build_failed_title"),
             content=f"{lang.get_text('build_failed_content')}: {error_msg}",
@@ -636,12 +781,36 @@ class HomeInterface(ScrollArea):
             parent=self
         )
         print(f"构建失败: {error_msg}")
+        self._finishWatchRebuild()
+    
+    def _onCancelBuild(self):
+        """取消构建"""
+        self.buildService.cancel_build()
+    
+    def _onBuildCancelled(self):
+        """构建取消处理"""
+        InfoBar.warning(
+            title=lang.get_text("build_cancelled_title"),
+            content=lang.get_text("build_cancelled_content"),
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM,
+            duration=5000,
+            parent=self
+        )
+        print("构建已取消")
+        if self.watch_rebuild is not None:
+            self.watch_status = ("watch_status_watching", {})
+            self._updateWatchStatus()
+        self._finishWatchRebuild()
     
     def resizeEvent(self, event):
         """窗口大小变化事件"""
         super().resizeEvent(event)
         if hasattr(self, 'floatingMenuButton'):
             self.floatingMenuButton.updatePosition()
+        if hasattr(self, 'watchStatusLabel'):
+            self._updateWatchStatusGeometry()
         if self.sticky_add_function_card and self.is_add_function_sticky:
             self._updateStickyAddFunctionCardGeometry()
     
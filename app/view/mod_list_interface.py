@@ -4,7 +4,6 @@ MOD List Interface
 MOD列表界面模块
 """
 import os
-import json
 import zipfile
 from datetime import datetime
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QFileDialog, QDialog
@@ -19,6 +18,8 @@ from ..common.config import cfg
 from ..common.application import FMMApplication
 from ..components.mod_table_widget import ModTableWidget
 from ..components.edit_tips_dialog import EditTipsDialog
+from ..service.build_record_service import BuildRecordService, LEGACY_RECORD_FILENAME
+from ..service.record_repository import recordRepository
 
 class ModListInterface(ScrollArea):
     """MOD列表界面"""
@@ -134,18 +135,11 @@ class ModListInterface(ScrollArea):
     
     def _checkBuildRecordFile(self):
         """检查构建记录文件是否存在且有内容"""
-        cache_dir = os.path.join(os.path.dirname(FMMApplication.getConfigPath()), ".cache")
-        record_file = os.path.join(cache_dir, "FMMxMOD-Creator_build-record.json")
-        
-        has_records = False
-        
-        if os.path.exists(record_file):
-            try:
-                with open(record_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    has_records = isinstance(data, list) and len(data) > 0
-            except (json.JSONDecodeError, IOError):
-                has_records = False
+        try:
+            recordRepository.refresh()
+            has_records = recordRepository.count() > 0
+        except (OSError, UnicodeDecodeError):
+            has_records = False
         
         if has_records:
             self.hintLabel.hide()
@@ -174,6 +168,16 @@ class ModListInterface(ScrollArea):
         self.refreshAction.triggered.connect(self._onRefreshClicked)
         self.sortConditionGroup.triggered.connect(self._onSortConditionChanged)
         self.sortDirectionGroup.triggered.connect(self._onSortDirectionChanged)
+        recordRepository.recordsReset.connect(self._updateHintVisibility)
+        recordRepository.recordAdded.connect(self._updateHintVisibility)
+        recordRepository.recordRemoved.connect(self._updateHintVisibility)
+    
+    def _updateHintVisibility(self, *args):
+        """记录数在空与非空之间变化时切换提示"""
+        has_records = recordRepository.count() > 0
+        if has_records == self.modTableWidget.isHidden():
+            self.hintLabel.setVisible(not has_records)
+            self.modTableWidget.setVisible(has_records)
     
     def _onEditModeToggled(self):
         """编辑模式切换"""
@@ -203,12 +207,10 @@ class ModListInterface(ScrollArea):
     def _onBackupRecordClicked(self):
         """备份记录按钮点击"""
         try:
-            # Get build log file path
-            cache_dir = os.path.join(os.path.dirname(FMMApplication.getConfigPath()), ".cache")
-            record_file = os.path.join(cache_dir, "FMMxMOD-Creator_build-record.json")
+            records = recordRepository.records()
             
-            # Check if the file exists
-            if not os.path.exists(record_file):
+            # Check if there is anything to back up
+            if not records:
                 InfoBar.error(
                     title=lang.get_text("backup_record_failed_title"),
                     content=lang.get_text("import_failed"),
@@ -228,9 +230,8 @@ class ModListInterface(ScrollArea):
             project_root = os.path.dirname(FMMApplication.getConfigPath())
             backup_path = os.path.join(project_root, backup_filename)
             
-            # Create zip file
-            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                zipf.write(record_file, "FMMxMOD-Creator_build-record.json")
+            # Create zip file, backups keep the array format so older versions can import them
+            BuildRecordService.export_backup(backup_path, records)
             
             InfoBar.success(
                 title=lang.get_text("backup_record_success_title"),
@@ -266,17 +267,10 @@ class ModListInterface(ScrollArea):
             if not file_path:
                 return
             
-            # Get target file path
-            cache_dir = os.path.join(os.path.dirname(FMMApplication.getConfigPath()), ".cache")
-            target_file = os.path.join(cache_dir, "FMMxMOD-Creator_build-record.json")
-            
-            # Ensure cache directory exists
-            os.makedirs(cache_dir, exist_ok=True)
-            
             # Unzip zip file
             with zipfile.ZipFile(file_path, 'r') as zipf:
                 # Check if zip file contains target file
-                if "FMMxMOD-Creator_build-record.json" not in zipf.namelist():
+                if LEGACY_RECORD_FILENAME not in zipf.namelist():
                     InfoBar.error(
                         title=lang.get_text("import_failed_title"),
                         content=lang.get_text("import_failed"),
@@ -287,12 +281,8 @@ class ModListInterface(ScrollArea):
                         parent=self
                     )
                     return
-                
-                zipf.extract("FMMxMOD-Creator_build-record.json", cache_dir)
             
-            self._checkBuildRecordFile()
-            if self.modTableWidget.isVisible():
-                self.modTableWidget.refresh()
+            recordRepository.replace_all(BuildRecordService.read_backup(file_path))
             
             InfoBar.success(
                 title=lang.get_text("import_success_title"),
@@ -380,44 +370,8 @@ class ModListInterface(ScrollArea):
     def _sortTableData(self, condition: str, direction: str):
         """排序表格数据"""
         try:
-            cache_dir = os.path.join(os.path.dirname(FMMApplication.getConfigPath()), ".cache")
-            record_file = os.path.join(cache_dir, "FMMxMOD-Creator_build-record.json")
-            
-            if not os.path.exists(record_file):
-                return
-            
-            with open(record_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not data:
-                return
-            
-            def get_sort_key(record):
-                if condition == "name":
-                    return record.get("mod_info", {}).get("name", "").lower()
-                elif condition == "author":
-                    return record.get("mod_info", {}).get("author", "").lower()
-                elif condition == "category":
-                    return record.get("mod_info", {}).get("category", "").lower()
-                elif condition == "date":
-                    build_time = record.get("build_info", {}).get("build_time", "")
-                    if build_time:
-                        try:
-                            from datetime import datetime
-                            return datetime.fromisoformat(build_time.replace('Z', '+00:00'))
-                        except:
-                            return datetime.min
-                    return datetime.min
-                return ""
-            
-            reverse = (direction == "desc")
-            sorted_data = sorted(data, key=get_sort_key, reverse=reverse)
-            
-            with open(record_file, 'w', encoding='utf-8') as f:
-                json.dump(sorted_data, f, ensure_ascii=False, indent=2)
-            
-            if self.modTableWidget.isVisible():
-                self.modTableWidget.refresh()
+            # The journal rewrites itself once, the database renumbers an indexed column
+            recordRepository.sort(condition, direction == "desc")
             
         except Exception as e:
             print(f"排序数据失败: {e}")
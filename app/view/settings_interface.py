@@ -13,12 +13,15 @@ from qfluentwidgets import (
 from PySide6.QtWidgets import QFileDialog
 from ..common.config import cfg
 from ..common.language import lang
+from ..service.cache_service import CacheService
 
 class SettingsInterface(ScrollArea):
     """设置界面"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.cacheService = CacheService(self)
+        self._cacheUsage = None
         self._initUI()
         self._connectSignals()
     
@@ -220,10 +223,216 @@ class SettingsInterface(ScrollArea):
             parent=self.buildGroup
         )
         
+        # Create 7z preset configuration item
+        self.sevenZipPresetConfigItem = OptionsConfigItem(
+            "Build", "SevenZipPreset", cfg.sevenZipPreset, 
+            OptionsValidator(["store", "fast", "normal", "max", "ultra"])
+        )
+        
+        # 7z Preset Setup Card
+        self.sevenZipPresetCard = OptionsSettingCard(
+            self.sevenZipPresetConfigItem,
+            FIF.SPEED_HIGH,
+            lang.get_text("sevenzip_preset"),
+            lang.get_text("sevenzip_preset_desc"),
+            texts=["Store", "Fast", "Normal", "Max", "Ultra"],
+            parent=self.buildGroup
+        )
+        
+        # Create split volume configuration item
+        self.splitVolumeConfigItem = OptionsConfigItem(
+            "Build", "SplitVolumeMb", cfg.splitVolumeMb, 
+            OptionsValidator([0, 100, 500, 1024, 2048, 4096])
+        )
+        
+        # Split Volume Setup Card
+        self.splitVolumeCard = OptionsSettingCard(
+            self.splitVolumeConfigItem,
+            FIF.CUT,
+            lang.get_text("split_volume"),
+            lang.get_text("split_volume_desc"),
+            texts=[lang.get_text("split_volume_off"), "100 MB", "500 MB", "1 GB", "2 GB", "4 GB"],
+            parent=self.buildGroup
+        )
+        
+        # Create cache enabled configuration item
+        self.cacheEnabledConfigItem = OptionsConfigItem(
+            "Build", "CacheEnabled", True, 
+            BoolValidator()
+        )
+        
+        # Create cache enabled setting card
+        self.cacheEnabledCard = SwitchSettingCard(
+            FIF.SAVE,
+            lang.get_text("cache_enabled"),
+            lang.get_text("cache_enabled_desc"),
+            self.cacheEnabledConfigItem,
+            parent=self.buildGroup
+        )
+        current_cache_enabled = cfg.cacheEnabled
+        self.cacheEnabledConfigItem.value = current_cache_enabled
+        self.cacheEnabledCard.setChecked(current_cache_enabled)
+        
+        # Create resume builds configuration item
+        self.resumeBuildsConfigItem = OptionsConfigItem(
+            "Build", "ResumeBuilds", True, 
+            BoolValidator()
+        )
+        
+        # Create resume builds setting card
+        self.resumeBuildsCard = SwitchSettingCard(
+            FIF.SYNC,
+            lang.get_text("resume_builds"),
+            lang.get_text("resume_builds_desc"),
+            self.resumeBuildsConfigItem,
+            parent=self.buildGroup
+        )
+        current_resume_builds = cfg.resumeBuilds
+        self.resumeBuildsConfigItem.value = current_resume_builds
+        self.resumeBuildsCard.setChecked(current_resume_builds)
+        
+        # Create verify builds configuration item
+        self.verifyBuildsConfigItem = OptionsConfigItem(
+            "Build", "VerifyBuilds", True, 
+            BoolValidator()
+        )
+        
+        # Create verify builds setting card
+        self.verifyBuildsCard = SwitchSettingCard(
+            FIF.CERTIFICATE,
+            lang.get_text("verify_builds"),
+            lang.get_text("verify_builds_desc"),
+            self.verifyBuildsConfigItem,
+            parent=self.buildGroup
+        )
+        current_verify_builds = cfg.verifyBuilds
+        self.verifyBuildsConfigItem.value = current_verify_builds
+        self.verifyBuildsCard.setChecked(current_verify_builds)
+        
+        # Create cache usage card (size is computed in the background)
+        self.cacheUsageCard = PushSettingCard(
+            lang.get_text("clean_cache"),
+            FIF.DELETE,
+            lang.get_text("cache_usage"),
+            lang.get_text("cache_usage_calculating"),
+            self.buildGroup
+        )
+        
+        # Create cache max size configuration item
+        self.cacheMaxSizeConfigItem = OptionsConfigItem(
+            "Build", "CacheMaxSizeGb", cfg.cacheMaxSizeGb, 
+            OptionsValidator([5, 10, 20, 50, 0])
+        )
+        
+        # Cache Max Size Setup Card
+        self.cacheMaxSizeCard = OptionsSettingCard(
+            self.cacheMaxSizeConfigItem,
+            FIF.CLOUD,
+            lang.get_text("cache_max_size"),
+            lang.get_text("cache_max_size_desc"),
+            texts=["5 GB", "10 GB", "20 GB", "50 GB", lang.get_text("unlimited")],
+            parent=self.buildGroup
+        )
+        
+        # Create cache max age configuration item
+        self.cacheMaxAgeConfigItem = OptionsConfigItem(
+            "Build", "CacheMaxAgeDays", cfg.cacheMaxAgeDays, 
+            OptionsValidator([7, 30, 90, 0])
+        )
+        
+        # Cache Max Age Setup Card
+        self.cacheMaxAgeCard = OptionsSettingCard(
+            self.cacheMaxAgeConfigItem,
+            FIF.CALENDAR,
+            lang.get_text("cache_max_age"),
+            lang.get_text("cache_max_age_desc"),
+            texts=[lang.get_text("days_count").format(days=days) for days in (7, 30, 90)]
+                  + [lang.get_text("unlimited")],
+            parent=self.buildGroup
+        )
+        
+        # Create image optimize configuration item
+        self.imageOptimizeConfigItem = OptionsConfigItem(
+            "Build", "ImageOptimize", False, 
+            BoolValidator()
+        )
+        
+        # Create image optimize setting card
+        self.imageOptimizeCard = SwitchSettingCard(
+            FIF.PHOTO,
+            lang.get_text("image_optimize"),
+            lang.get_text("image_optimize_desc"),
+            self.imageOptimizeConfigItem,
+            parent=self.buildGroup
+        )
+        current_image_optimize = cfg.imageOptimize
+        self.imageOptimizeConfigItem.value = current_image_optimize
+        self.imageOptimizeCard.setChecked(current_image_optimize)
+        
+        # Create image max size configuration item
+        self.imageMaxSizeConfigItem = OptionsConfigItem(
+            "Build", "ImageMaxSize", cfg.imageMaxSize, 
+            OptionsValidator([1280, 1920, 2560, 3840])
+        )
+        
+        # Image Max Size Setup Card
+        self.imageMaxSizeCard = OptionsSettingCard(
+            self.imageMaxSizeConfigItem,
+            FIF.ZOOM,
+            lang.get_text("image_max_size"),
+            lang.get_text("image_max_size_desc"),
+            texts=["1280 px", "1920 px", "2560 px", "3840 px"],
+            parent=self.buildGroup
+        )
+        
+        # Create image format configuration item
+        self.imageFormatConfigItem = OptionsConfigItem(
+            "Build", "ImageFormat", cfg.imageFormat, 
+            OptionsValidator(["auto", "jpeg", "png", "webp"])
+        )
+        
+        # Image Format Setup Card
+        self.imageFormatCard = OptionsSettingCard(
+            self.imageFormatConfigItem,
+            FIF.IMAGE_EXPORT,
+            lang.get_text("image_format"),
+            lang.get_text("image_format_desc"),
+            texts=["Auto", "JPEG", "PNG", "WebP"],
+            parent=self.buildGroup
+        )
+        
+        # Create record backend configuration item
+        self.recordBackendConfigItem = OptionsConfigItem(
+            "Build", "RecordBackend", cfg.recordBackend, 
+            OptionsValidator(["journal", "sqlite"])
+        )
+        
+        # Record Backend Setup Card
+        self.recordBackendCard = OptionsSettingCard(
+            self.recordBackendConfigItem,
+            FIF.LIBRARY,
+            lang.get_text("record_backend"),
+            lang.get_text("record_backend_desc"),
+            texts=["JSON Lines", "SQLite"],
+            parent=self.buildGroup
+        )
+        
         # Add cards to the group
         self.buildGroup.addSettingCard(self.buildDirectoryCard)
         self.buildGroup.addSettingCard(self.buildCacheCard)
+        self.buildGroup.addSettingCard(self.cacheEnabledCard)
+        self.buildGroup.addSettingCard(self.cacheUsageCard)
+        self.buildGroup.addSettingCard(self.cacheMaxSizeCard)
+        self.buildGroup.addSettingCard(self.cacheMaxAgeCard)
+        self.buildGroup.addSettingCard(self.resumeBuildsCard)
+        self.buildGroup.addSettingCard(self.verifyBuildsCard)
         self.buildGroup.addSettingCard(self.buildTypeCard)
+        self.buildGroup.addSettingCard(self.sevenZipPresetCard)
+        self.buildGroup.addSettingCard(self.splitVolumeCard)
+        self.buildGroup.addSettingCard(self.imageOptimizeCard)
+        self.buildGroup.addSettingCard(self.imageMaxSizeCard)
+        self.buildGroup.addSettingCard(self.imageFormatCard)
+        self.buildGroup.addSettingCard(self.recordBackendCard)
     
     def _updateThemeColorOptions(self, theme_mode):
         """根据主题模式更新主题色选项"""
@@ -319,6 +528,20 @@ class SettingsInterface(ScrollArea):
         self.buildDirectoryCard.clicked.connect(self._onBuildDirectoryClicked)                   # build directory choose
         self.buildCacheCard.clicked.connect(self._onBuildCacheClicked)                           # build cache choose
         self.buildTypeCard.optionChanged.connect(self._onBuildTypeChanged)                       # build type change
+        self.sevenZipPresetCard.optionChanged.connect(self._onSevenZipPresetChanged)             # 7z preset change
+        self.splitVolumeCard.optionChanged.connect(self._onSplitVolumeChanged)                   # split volume size change
+        self.imageOptimizeCard.checkedChanged.connect(self._onImageOptimizeChanged)              # image optimize switch
+        self.imageMaxSizeCard.optionChanged.connect(self._onImageMaxSizeChanged)                 # image max size change
+        self.imageFormatCard.optionChanged.connect(self._onImageFormatChanged)                   # image format change
+        self.recordBackendCard.optionChanged.connect(self._onRecordBackendChanged)               # record backend change
+        self.cacheEnabledCard.checkedChanged.connect(self._onCacheEnabledChanged)                # build cache switch
+        self.cacheUsageCard.clicked.connect(self.cacheService.clearCache)                        # clean cache
+        self.cacheMaxSizeCard.optionChanged.connect(self._onCacheMaxSizeChanged)                 # cache size limit change
+        self.cacheMaxAgeCard.optionChanged.connect(self._onCacheMaxAgeChanged)                   # cache age limit change
+        self.cacheService.usageChanged.connect(self._onCacheUsageChanged)
+        self.cacheService.cacheCleared.connect(self._onCacheCleared)
+        self.resumeBuildsCard.checkedChanged.connect(self._onResumeBuildsChanged)                # resume builds switch
+        self.verifyBuildsCard.checkedChanged.connect(self._onVerifyBuildsChanged)                # verify builds switch
         
         lang.languageChanged.connect(lambda: self._updateTexts(disconnect_signals=True))
     
@@ -461,11 +684,110 @@ class SettingsInterface(ScrollArea):
         if folder:
             cfg.set("cache_directory", folder)
             self.buildCacheCard.setContent(folder)
+            self.cacheService.refreshUsage()
     
     def _onBuildTypeChanged(self, config_value):
         """构筑类型变化处理"""
         cfg.set("build_type", config_value)
     
+    def _onSevenZipPresetChanged(self, config_value):
+        """7z压缩预设变化处理"""
+        cfg.set("sevenzip_preset", config_value)
+    
+    def _onSplitVolumeChanged(self, config_value):
+        """分卷大小变化处理"""
+        cfg.set("split_volume_mb", config_value)
+    
+    def _onImageOptimizeChanged(self, enabled):
+        """图片优化开关变化处理"""
+        cfg.set("image_optimize", enabled)
+    
+    def _onImageMaxSizeChanged(self, config_value):
+        """图片最大尺寸变化处理"""
+        cfg.set("image_max_size", config_value)
+    
+    def _onImageFormatChanged(self, config_value):
+        """图片格式变化处理"""
+        cfg.set("image_format", config_value)
+    
+    def _onRecordBackendChanged(self, config_value):
+        """记录存储变化处理，把现有记录迁移过去"""
+        from ..service.build_record_service import BuildRecordService
+        backend = config_value.value if hasattr(config_value, "value") else config_value
+        try:
+            BuildRecordService.switch_record_backend(backend)
+        except Exception as e:
+            InfoBar.error(
+                title=lang.get_text("error"),
+                content=lang.get_text("record_backend_failed").format(error=str(e)),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=3000,
+                parent=self
+            )
+    
+    def _onCacheEnabledChanged(self, enabled):
+        """构筑缓存开关变化处理"""
+        cfg.set("cache_enabled", enabled)
+    
+    def _onCacheMaxSizeChanged(self, config_value):
+        """缓存大小上限变化处理"""
+        cfg.set("cache_max_size_gb", config_value)
+        self._showCacheUsage()
+    
+    def _onCacheMaxAgeChanged(self, config_value):
+        """缓存保留天数变化处理"""
+        cfg.set("cache_max_age_days", config_value)
+    
+    def _onCacheUsageChanged(self, usage):
+        """后台统计完成后显示缓存占用"""
+        self._cacheUsage = usage
+        self._showCacheUsage()
+    
+    def _onCacheCleared(self, result):
+        """缓存清理完成提示"""
+        InfoBar.success(
+            title=lang.get_text("cache_cleaned"),
+            content=lang.get_text("cache_cleaned_content").format(
+                count=result.get("removed", 0), size=self._formatSize(result.get("freed", 0))),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        )
+    
+    def _showCacheUsage(self):
+        """刷新缓存占用文本"""
+        if self._cacheUsage is None:
+            self.cacheUsageCard.setContent(lang.get_text("cache_usage_calculating"))
+            return
+        max_size_gb = cfg.cacheMaxSizeGb
+        limit = f"{max_size_gb} GB" if max_size_gb else lang.get_text("unlimited")
+        self.cacheUsageCard.setContent(lang.get_text("cache_usage_desc").format(
+            size=self._formatSize(self._cacheUsage.get("size", 0)), limit=limit,
+            pinned=self._cacheUsage.get("pinned", 0)))
+    
+    def _formatSize(self, size):
+        """格式化字节数"""
+        if size >= 1024 ** 3:
+            return f"{size / 1024 ** 3:.2f} GB"
+        return f"{size / 1024 ** 2:.1f} MB"
+    
+    def showEvent(self, event):
+        """每次显示设置页时在后台重新统计缓存占用"""
+        super().showEvent(event)
+        self.cacheService.refreshUsage()
+    
+    def _onResumeBuildsChanged(self, enabled):
+        """中断续建开关变化处理"""
+        cfg.set("resume_builds", enabled)
+    
+    def _onVerifyBuildsChanged(self, enabled):
+        """构筑校验开关变化处理"""
+        cfg.set("verify_builds", enabled)
+    
     def _updateTexts(self, disconnect_signals=False):
         """更新界面文本"""
         self.personalizationGroup.titleLabel.setText(lang.get_text("personalization"))
@@ -577,6 +899,36 @@ class SettingsInterface(ScrollArea):
         self.buildCacheCard.button.setText(lang.get_text("choose_folder"))
         self.buildCacheCard.clicked.connect(self._onBuildCacheClicked)
         
+        try:
+            self.cacheEnabledCard.checkedChanged.disconnect(self._onCacheEnabledChanged)
+        except TypeError:
+            pass
+
+        self.cacheEnabledCard.setTitle(lang.get_text("cache_enabled"))
+        self.cacheEnabledCard.setContent(lang.get_text("cache_enabled_desc"))
+        self.cacheEnabledCard.setChecked(cfg.cacheEnabled)
+        self.cacheEnabledCard.checkedChanged.connect(self._onCacheEnabledChanged)
+        
+        try:
+            self.resumeBuildsCard.checkedChanged.disconnect(self._onResumeBuildsChanged)
+        except TypeError:
+            pass
+
+        self.resumeBuildsCard.setTitle(lang.get_text("resume_builds"))
+        self.resumeBuildsCard.setContent(lang.get_text("resume_builds_desc"))
+        self.resumeBuildsCard.setChecked(cfg.resumeBuilds)
+        self.resumeBuildsCard.checkedChanged.connect(self._onResumeBuildsChanged)
+        
+        try:
+            self.verifyBuildsCard.checkedChanged.disconnect(self._onVerifyBuildsChanged)
+        except TypeError:
+            pass
+
+        self.verifyBuildsCard.setTitle(lang.get_text("verify_builds"))
+        self.verifyBuildsCard.setContent(lang.get_text("verify_builds_desc"))
+        self.verifyBuildsCard.setChecked(cfg.verifyBuilds)
+        self.verifyBuildsCard.checkedChanged.connect(self._onVerifyBuildsChanged)
+        
         try:
             self.buildTypeCard.optionChanged.disconnect(self._onBuildTypeChanged)
         except TypeError:
@@ -585,6 +937,83 @@ class SettingsInterface(ScrollArea):
         self.buildTypeCard.card.setTitle(lang.get_text("build_type"))
         self.buildTypeCard.card.setContent(lang.get_text("build_type_desc"))
         self.buildTypeCard.optionChanged.connect(self._onBuildTypeChanged)
+        
+        try:
+            self.sevenZipPresetCard.optionChanged.disconnect(self._onSevenZipPresetChanged)
+        except TypeError:
+            pass
+
+        self.sevenZipPresetCard.card.setTitle(lang.get_text("sevenzip_preset"))
+        self.sevenZipPresetCard.card.setContent(lang.get_text("sevenzip_preset_desc"))
+        self.sevenZipPresetCard.optionChanged.connect(self._onSevenZipPresetChanged)
+        
+        try:
+            self.splitVolumeCard.optionChanged.disconnect(self._onSplitVolumeChanged)
+        except TypeError:
+            pass
+
+        self.splitVolumeCard.card.setTitle(lang.get_text("split_volume"))
+        self.splitVolumeCard.card.setContent(lang.get_text("split_volume_desc"))
+        self.splitVolumeCard.optionChanged.connect(self._onSplitVolumeChanged)
+        
+        self.cacheUsageCard.setTitle(lang.get_text("cache_usage"))
+        self.cacheUsageCard.button.setText(lang.get_text("clean_cache"))
+        self._showCacheUsage()
+        
+        try:
+            self.cacheMaxSizeCard.optionChanged.disconnect(self._onCacheMaxSizeChanged)
+        except TypeError:
+            pass
+
+        self.cacheMaxSizeCard.card.setTitle(lang.get_text("cache_max_size"))
+        self.cacheMaxSizeCard.card.setContent(lang.get_text("cache_max_size_desc"))
+        self.cacheMaxSizeCard.optionChanged.connect(self._onCacheMaxSizeChanged)
+        
+        try:
+            self.cacheMaxAgeCard.optionChanged.disconnect(self._onCacheMaxAgeChanged)
+        except TypeError:
+            pass
+
+        self.cacheMaxAgeCard.card.setTitle(lang.get_text("cache_max_age"))
+        self.cacheMaxAgeCard.card.setContent(lang.get_text("cache_max_age_desc"))
+        self.cacheMaxAgeCard.optionChanged.connect(self._onCacheMaxAgeChanged)
+        
+        try:
+            self.imageOptimizeCard.checkedChanged.disconnect(self._onImageOptimizeChanged)
+        except TypeError:
+            pass
+
+        self.imageOptimizeCard.setTitle(lang.get_text("image_optimize"))
+        self.imageOptimizeCard.setContent(lang.get_text("image_optimize_desc"))
+        self.imageOptimizeCard.setChecked(cfg.imageOptimize)
+        self.imageOptimizeCard.checkedChanged.connect(self._onImageOptimizeChanged)
+        
+        try:
+            self.imageMaxSizeCard.optionChanged.disconnect(self._onImageMaxSizeChanged)
+        except TypeError:
+            pass
+
+        self.imageMaxSizeCard.card.setTitle(lang.get_text("image_max_size"))
+        self.imageMaxSizeCard.card.setContent(lang.get_text("image_max_size_desc"))
+        self.imageMaxSizeCard.optionChanged.connect(self._onImageMaxSizeChanged)
+        
+        try:
+            self.imageFormatCard.optionChanged.disconnect(self._onImageFormatChanged)
+        except TypeError:
+            pass
+
+        self.imageFormatCard.card.setTitle(lang.get_text("image_format"))
+        self.imageFormatCard.card.setContent(lang.get_text("image_format_desc"))
+        self.imageFormatCard.optionChanged.connect(self._onImageFormatChanged)
+        
+        try:
+            self.recordBackendCard.optionChanged.disconnect(self._onRecordBackendChanged)
+        except TypeError:
+            pass
+
+        self.recordBackendCard.card.setTitle(lang.get_text("record_backend"))
+        self.recordBackendCard.card.setContent(lang.get_text("record_backend_desc"))
+        self.recordBackendCard.optionChanged.connect(self._onRecordBackendChanged)
         self.aboutCard.setTitle(lang.get_text("about_app"))
         self.aboutCard.setContent(lang.get_text("developer"))
         self.aboutCard.button.setText(lang.get_text("check_update"))
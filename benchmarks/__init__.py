@@ -0,0 +1,5 @@
+# coding:utf-8
+"""
+FMMxMOD Creator Benchmarks
+构建流程性能基准测试
+"""
@@ -0,0 +1,316 @@
+# coding:utf-8
+"""
+Build Benchmark
+构建基准测试 - 在合成MOD上无界面运行构建流程，记录吞吐量、内存峰值与压缩率
+
+Usage:
+    python -m benchmarks.build_benchmark run --output results.json
+    python -m benchmarks.build_benchmark run --scale 0.1 --repeat 1 --scenario typical_mod --format zip
+    python -m benchmarks.build_benchmark run --output results.json --baseline baseline.json
+    python -m benchmarks.build_benchmark compare results.json --baseline baseline.json
+
+Every build runs in a fresh process with an empty cache and output
+directory, so peak memory is that of one build and nothing is reused from
+an earlier run. Exit codes: 0 success, 1 a build failed or a regression
+against the baseline was found, 2 bad arguments or results file.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .synthetic_mods import SCENARIOS, generate
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_USAGE = 2
+
+RESULTS_VERSION = 1
+FORMATS = ("zip", "7z", "rar")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.build_benchmark",
+                                     description="FMMxMOD Creator build benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="build the synthetic MODs and write a results file")
+    run_parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                            help="scenario to run (repeatable, default all)")
+    run_parser.add_argument("--format", action="append", choices=FORMATS,
+                            help="archive format to build (repeatable, default all)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="builds per scenario and format (median is kept)")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="shrink or grow the synthetic MODs")
+    run_parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic MODs")
+    run_parser.add_argument("--workers", type=int, default=0, help="compression threads (0 = one per CPU)")
+    run_parser.add_argument("--sevenzip-preset", default="normal", help="7z preset to benchmark")
+    run_parser.add_argument("--no-verify", action="store_true", help="skip verifying the finished archives")
+    run_parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "fmmxmod-benchmark"),
+                            help="where synthetic MODs (kept between runs) and build output are written")
+    run_parser.add_argument("--output", default="benchmark-results.json", help="results file to write")
+    run_parser.add_argument("--baseline", help="results file to compare against")
+    run_parser.add_argument("--threshold", type=float, default=0.10,
+                            help="allowed throughput/memory regression (0.10 = 10%%)")
+
+    compare_parser = commands.add_parser("compare", help="compare a results file against a baseline")
+    compare_parser.add_argument("results", help="results file from `run`")
+    compare_parser.add_argument("--baseline", required=True, help="results file to compare against")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed throughput/memory regression (0.10 = 10%%)")
+
+    worker_parser = commands.add_parser("worker", help="run one build (started by `run`)")
+    worker_parser.add_argument("--job", required=True)
+    worker_parser.add_argument("--result", required=True)
+    return parser.parse_args(argv)
+
+
+def _run_worker(job_path: str, result_path: str) -> int:
+    """在独立进程中执行一次构建，把度量结果写入文件"""
+    # Imported here so the parent process never loads the app configuration
+    from app.common.config import cfg
+    from app.service.build_pipeline import BuildPipeline
+    from app.service.resource_budget import ResourceBudget
+
+    with open(job_path, 'r', encoding='utf-8') as f:
+        job = json.load(f)
+    # Pin every setting that changes the build, whatever the user configured
+    for key, value in job["settings"].items():
+        cfg.override(key, value)
+
+    pipeline = BuildPipeline(job["build_data"], ResourceBudget(cfg.zipWorkers))
+    started = time.perf_counter()
+    output_path = pipeline.run()
+    seconds = time.perf_counter() - started
+
+    metrics = pipeline.build_report["metrics"]
+    result = {
+        "seconds": round(seconds, 4),
+        "cpu_ms": metrics["cpu_ms"],
+        "peak_rss": metrics["peak_rss"],
+        "archive_bytes": os.path.getsize(output_path),
+        "deduplicated": pipeline.build_report.get("dedup", {}).get("archive", {}).get("files", 0),
+        "stages": {stage["name"]: stage["wall_ms"] for stage in metrics["stages"]}
+    }
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    return EXIT_OK
+
+
+def _job_settings(args: argparse.Namespace, build_type: str, run_dir: str) -> Dict:
+    """一次构建使用的配置（覆盖用户配置）"""
+    return {
+        "build_type": build_type,
+        "build_directory": os.path.join(run_dir, "output"),
+        "cache_directory": os.path.join(run_dir, "cache"),
+        "cache_enabled": True,
+        "cache_max_size_gb": 0,
+        "cache_max_age_days": 0,
+        "resume_builds": False,
+        "verify_builds": not args.no_verify,
+        "zip_workers": args.workers,
+        "compression_policy": {},
+        "sevenzip_preset": args.sevenzip_preset,
+        "sevenzip_options": {},
+        "image_optimize": False,
+        "io_budget_mbps": 0
+    }
+
+
+def _run_build(args: argparse.Namespace, mod: Dict, build_type: str, run_dir: str) -> Dict:
+    """启动工作进程执行一次构建"""
+    os.makedirs(os.path.join(run_dir, "output"))
+    job_path = os.path.join(run_dir, "job.json")
+    result_path = os.path.join(run_dir, "result.json")
+    with open(job_path, 'w', encoding='utf-8') as f:
+        json.dump({"settings": _job_settings(args, build_type, run_dir), "build_data": mod["build_data"]}, f)
+
+    command = [sys.executable, "-m", "benchmarks.build_benchmark", "worker", "--job", job_path,
+               "--result", result_path]
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True,
+                               encoding="utf-8", errors="replace")
+    if completed.returncode != 0 or not os.path.isfile(result_path):
+        tail = "\n".join(completed.stderr.strip().splitlines()[-10:])
+        raise RuntimeError(f"build failed (exit code {completed.returncode})\n{tail}")
+    with open(result_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _summarize(mod: Dict, runs: List[Dict]) -> Dict:
+    """汇总多次构建（时间取中位数，内存取最大值）"""
+    seconds = statistics.median(run["seconds"] for run in runs)
+    archive_bytes = statistics.median(run["archive_bytes"] for run in runs)
+    stage_names = [name for name in runs[0]["stages"]]
+    return {
+        "files": mod["files"],
+        "bytes": mod["bytes"],
+        "seconds": round(seconds, 4),
+        "throughput_mbps": round(mod["bytes"] / MB / seconds, 2) if seconds > 0 else 0,
+        "peak_rss": max(run["peak_rss"] for run in runs),
+        "archive_bytes": int(archive_bytes),
+        "ratio": round(archive_bytes / mod["bytes"], 4) if mod["bytes"] else 0,
+        "deduplicated": runs[0]["deduplicated"],
+        "stages": {name: round(statistics.median(run["stages"].get(name, 0) for run in runs), 3)
+                   for name in stage_names},
+        "runs": runs
+    }
+
+
+def _run_benchmarks(args: argparse.Namespace) -> int:
+    """执行基准测试并写入结果文件"""
+    if args.repeat < 1 or args.scale <= 0:
+        print("error: --repeat must be at least 1 and --scale above 0", file=sys.stderr)
+        return EXIT_USAGE
+    scenarios = args.scenario or list(SCENARIOS)
+    formats = args.format or list(FORMATS)
+
+    from app.common import version_info
+    results = {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "app_version": version_info.VERSION_STRING,
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version()
+        },
+        "settings": {
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "sevenzip_preset": args.sevenzip_preset,
+            "verify": not args.no_verify
+        },
+        "results": {}
+    }
+
+    exit_code = EXIT_OK
+    for scenario in scenarios:
+        print(f"{scenario}: generating", file=sys.stderr)
+        mod = generate(scenario, os.path.join(args.workdir, "mods"), args.scale, args.seed)
+        for build_type in formats:
+            key = f"{scenario}/{build_type}"
+            runs = []
+            try:
+                for index in range(args.repeat):
+                    run_dir = os.path.join(args.workdir, "runs", f"{scenario}-{build_type}-{index}")
+                    shutil.rmtree(run_dir, ignore_errors=True)
+                    try:
+                        runs.append(_run_build(args, mod, build_type, run_dir))
+                    finally:
+                        shutil.rmtree(run_dir, ignore_errors=True)
+                    print(f"{key}: run {index + 1}/{args.repeat} {runs[-1]['seconds']:.2f}s", file=sys.stderr)
+            except RuntimeError as e:
+                print(f"{key}: {e}", file=sys.stderr)
+                exit_code = EXIT_REGRESSION
+                continue
+            results["results"][key] = _summarize(mod, runs)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    _print_results(results)
+    print(args.output)
+
+    if args.baseline:
+        baseline = _load_results(args.baseline)
+        if baseline is None:
+            return EXIT_USAGE
+        comparison = _compare(results, baseline, args.threshold)
+        if comparison != EXIT_OK:
+            exit_code = comparison
+    return exit_code
+
+
+def _load_results(path: str) -> Optional[Dict]:
+    """读取结果文件，失败时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"error: cannot read results {path}: {e}", file=sys.stderr)
+        return None
+    if not isinstance(results, dict) or results.get("version") != RESULTS_VERSION:
+        print(f"error: {path} is not a version {RESULTS_VERSION} results file", file=sys.stderr)
+        return None
+    return results
+
+
+def _print_results(results: Dict):
+    """打印结果表"""
+    print(f"{'benchmark':<24}{'MB':>10}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}{'ratio':>8}")
+    for key, result in results["results"].items():
+        print(f"{key:<24}{result['bytes'] / MB:>10.1f}{result['seconds']:>10.2f}"
+              f"{result['throughput_mbps']:>10.1f}{result['peak_rss'] / MB:>10.1f}{result['ratio']:>8.3f}")
+
+
+def _compare(results: Dict, baseline: Dict, threshold: float) -> int:
+    """与基线比较，吞吐量下降或内存增长超过阈值、压缩率变差即视为回退"""
+    for key in ("scale", "seed", "sevenzip_preset", "verify"):
+        if results["settings"].get(key) != baseline["settings"].get(key):
+            print(f"error: baseline was run with {key}={baseline['settings'].get(key)}, "
+                  f"results with {key}={results['settings'].get(key)}", file=sys.stderr)
+            return EXIT_USAGE
+    if results.get("machine") != baseline.get("machine"):
+        print("warning: baseline was recorded on a different machine or Python", file=sys.stderr)
+
+    regressions = []
+    print(f"{'benchmark':<24}{'MB/s':>16}{'peak MB':>18}{'ratio':>16}")
+    for key, result in results["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"{key:<24}{'(not in baseline)':>16}")
+            continue
+        checks = [
+            ("throughput", result["throughput_mbps"] < base["throughput_mbps"] * (1 - threshold)),
+            ("peak memory", result["peak_rss"] > base["peak_rss"] * (1 + threshold)),
+            # Archive size is deterministic, so only allow rounding noise
+            ("ratio", result["ratio"] > base["ratio"] * 1.005 + 0.0001)
+        ]
+        failed = [name for name, regressed in checks if regressed]
+        regressions.extend(f"{key} {name}" for name in failed)
+        print(f"{key:<24}{_change(base['throughput_mbps'], result['throughput_mbps']):>16}"
+              f"{_change(base['peak_rss'] / MB, result['peak_rss'] / MB):>18}"
+              f"{_change(base['ratio'], result['ratio']):>16}"
+              f"{'  REGRESSION' if failed else ''}")
+
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+        return EXIT_REGRESSION
+    return EXIT_OK
+
+
+def _change(before: float, after: float) -> str:
+    """格式化变化百分比"""
+    if not before:
+        return f"{after:.3g}"
+    return f"{after:.3g} ({(after - before) / before:+.1%})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """基准测试主函数"""
+    args = _parse_args(argv)
+    if args.command == "worker":
+        return _run_worker(args.job, args.result)
+    if args.command == "compare":
+        results = _load_results(args.results)
+        baseline = _load_results(args.baseline)
+        if results is None or baseline is None:
+            return EXIT_USAGE
+        return _compare(results, baseline, args.threshold)
+    return _run_benchmarks(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# coding:utf-8
+"""
+Synthetic MODs
+基准测试用的合成MOD - 按固定随机种子生成可复现的文件树与构建数据
+"""
+import os
+import json
+import random
+from typing import Dict, List
+
+KB = 1024
+MB = 1024 * KB
+GENERATOR_VERSION = 1           # Bump when the generated content changes
+
+# Words for compressible text-like data (configs, scripts, localization)
+WORDS = ("mesh", "texture", "bone", "weight", "skin", "color", "shader", "normal", "alpha", "layer",
+         "index", "name", "value", "true", "false", "0.5", "1.0", "enabled", "slot", "material")
+
+# Every scenario is a list of modules; each module holds file groups:
+#   (count, size, kind, depth): `count` files of `size` bytes, `kind` is
+#   "text" (compressible), "random" (incompressible), "mixed" or "shared"
+#   (one of 8 blobs that repeat across modules), spread over folders nested
+#   `depth` levels deep.
+SCENARIOS = {
+    "tiny_files": {
+        "description": "20 000 files of 0.1-2 KB, mostly text",
+        "modules": [[(10000, 2 * KB, "text", 2)], [(10000, 2 * KB, "mixed", 2)]]
+    },
+    "huge_files": {
+        "description": "4 files of 256 MB, half text and half random",
+        "modules": [[(2, 256 * MB, "text", 0)], [(2, 256 * MB, "random", 0)]]
+    },
+    "compressible": {
+        "description": "400 text files of 1 MB",
+        "modules": [[(200, MB, "text", 1)], [(200, MB, "text", 1)]]
+    },
+    "incompressible": {
+        "description": "400 random files of 1 MB (already compressed textures)",
+        "modules": [[(200, MB, "random", 1)], [(200, MB, "random", 1)]]
+    },
+    "deep_tree": {
+        "description": "4 000 files of 8 KB in folders nested 24 levels deep",
+        "modules": [[(2000, 8 * KB, "mixed", 24)], [(2000, 8 * KB, "text", 24)]]
+    },
+    "typical_mod": {
+        "description": "a realistic MOD: textures, meshes, configs and shared files",
+        "modules": [[(40, 4 * MB, "random", 2), (60, 512 * KB, "mixed", 2), (300, 4 * KB, "text", 3),
+                     (16, 256 * KB, "shared", 1)],
+                    [(40, 4 * MB, "random", 2), (60, 512 * KB, "mixed", 2), (300, 4 * KB, "text", 3),
+                     (16, 256 * KB, "shared", 1)],
+                    [(10, 16 * MB, "random", 1), (200, 2 * KB, "text", 1)]]
+    }
+}
+
+
+def _scaled(value: int, scale: float) -> int:
+    """按比例缩放数量或大小（至少为1）"""
+    return max(1, int(value * scale))
+
+
+def _text_block(rng: random.Random, size: int) -> bytes:
+    """生成可压缩的类文本数据"""
+    lines = []
+    length = 0
+    while length < size:
+        line = " = ".join((rng.choice(WORDS), " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines).encode("ascii")[:size]
+
+
+def _file_data(rng: random.Random, size: int, kind: str, text: bytes, index: int) -> bytes:
+    """生成单个文件的内容"""
+    if kind == "shared":
+        return random.Random(f"shared:{size}:{index % 8}").randbytes(size)
+    if kind == "mixed":
+        kind = "text" if rng.random() < 0.5 else "random"
+    if kind == "random":
+        return rng.randbytes(size)
+    # Rotate a shared text block so files differ but generation stays fast
+    offset = rng.randrange(len(text))
+    data = text[offset:] + text[:offset]
+    while len(data) < size:
+        data += data
+    return data[:size]
+
+
+def _folder(rng: random.Random, depth: int) -> str:
+    """生成指定深度的相对目录"""
+    return "/".join(f"dir{level:02d}_{rng.randrange(4)}" for level in range(depth))
+
+
+def _write_cover(path: str):
+    """写入封面图片"""
+    from PIL import Image
+    Image.new("RGB", (640, 360), (16, 137, 62)).save(path, "PNG")
+
+
+def generate(scenario: str, root: str, scale: float = 1.0, seed: int = 0) -> Dict:
+    """生成合成MOD并返回构建数据（已生成且参数相同时直接复用）
+
+    `scale` multiplies the file counts, and the sizes of files of 64 KB or
+    more. The tree is written under `<root>/<scenario>-s<scale>-r<seed>`. A small
+    `build_data.json` next to it records the build data and total size;
+    if it exists with matching parameters the tree is not written again.
+    """
+    tree_dir = os.path.join(root, f"{scenario}-s{scale:g}-r{seed}")
+    data_path = os.path.join(tree_dir, "build_data.json")
+    params = {"scenario": scenario, "scale": scale, "seed": seed, "version": GENERATOR_VERSION}
+    if os.path.isfile(data_path):
+        with open(data_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get("params") == params:
+            return stored
+
+    rng = random.Random(f"{scenario}:{seed}")
+    text = _text_block(rng, 256 * KB)
+    os.makedirs(tree_dir, exist_ok=True)
+    cover_path = os.path.join(tree_dir, "cover.png")
+    _write_cover(cover_path)
+
+    blocks: List[Dict] = []
+    total_files = 0
+    total_bytes = 0
+    for module_index, groups in enumerate(SCENARIOS[scenario]["modules"], start=1):
+        module_dir = os.path.join(tree_dir, f"module{module_index}")
+        for group_index, (count, size, kind, depth) in enumerate(groups):
+            for file_index in range(_scaled(count, scale)):
+                file_size = rng.randint(max(1, size // 20), size) if size < 64 * KB else _scaled(size, scale)
+                folder = os.path.join(module_dir, _folder(rng, depth))
+                os.makedirs(folder, exist_ok=True)
+                with open(os.path.join(folder, f"g{group_index}_{file_index:05d}.dat"), 'wb') as f:
+                    f.write(_file_data(rng, file_size, kind, text, file_index))
+                total_files += 1
+                total_bytes += file_size
+        blocks.append({
+            "type": "mod_file",
+            "module_name": f"Module {module_index}",
+            "area_mark": "",
+            "image_path": "",
+            "description": f"{scenario} module {module_index}",
+            "files": [{"path": module_dir, "name": "data"}]
+        })
+
+    stored = {
+        "params": params,
+        "description": SCENARIOS[scenario]["description"],
+        "files": total_files,
+        "bytes": total_bytes,
+        "build_data": {
+            "mod_info": {"name": f"Bench {scenario}", "version": "1.0.0", "author": "benchmark", "category": ""},
+            "cover_data": {"image_path": cover_path, "description": scenario, "cover_tag": ""},
+            "sorted_blocks": blocks
+        }
+    }
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, ensure_ascii=False, indent=2)
+    return stored
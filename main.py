@@ -6,6 +6,7 @@ FMMxMOD Creator - Main Entry Point
 
 import os
 import sys
+import multiprocessing
 from pathlib import Path
 
 # 设置工作目录
@@ -45,4 +46,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Frozen builds start image optimizer workers through this executable
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+# coding:utf-8
+"""
+Test Configuration
+测试配置 - 让测试直接导入app包，并提供生成源文件与压缩条目的工具
+"""
+import os
+import sys
+import random
+from typing import Dict, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def read_entry(entry: Dict) -> bytes:
+    """条目的原始内容"""
+    if not entry["source"]:
+        return entry["data"]
+    with open(entry["source"], 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def make_entries(tmp_path):
+    """在tmp_path/src下生成一组源文件，返回条目列表的工厂（每次调用返回新的条目字典）"""
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    rng = random.Random(0)
+    contents = {
+        "cover/cover.png": bytes(rng.getrandbits(8) for _ in range(40000)),
+        "01 Mod/readme.txt": b"hello world\n" * 4000,
+        "01 Mod/data/table.ini": "".join(f"key{i}=value {i}\n" for i in range(3000)).encode(),
+        "01 Mod/data/blob.bin": bytes(rng.getrandbits(8) for _ in range(120000)),
+        "01 Mod/empty.txt": b"",
+        "02 Mod/notes.txt": "名前 Ünïcode\n".encode('utf-8') * 500,
+    }
+    for arcname, data in contents.items():
+        path = source_dir / arcname.replace("/", "_")
+        path.write_bytes(data)
+
+    def factory() -> List[Dict]:
+        entries = [{"arcname": arcname, "source": str(source_dir / arcname.replace("/", "_")), "data": None}
+                   for arcname in contents]
+        entries.append({"arcname": "01 Mod/modinfo.ini", "source": None, "data": b"\r\nname=01 Mod\r\n"})
+        return entries
+
+    factory.source_dir = source_dir
+    return factory
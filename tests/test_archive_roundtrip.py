@@ -0,0 +1,82 @@
+# coding:utf-8
+"""
+Archive Round-trip Tests
+压缩包往返测试 - ZIP与7z写入器写出的内容可被标准库与py7zr原样读回
+"""
+import os
+import zipfile
+
+import py7zr
+import pytest
+
+from app.service.content_dedup import ContentDedup
+from app.service.parallel_zip import ParallelZipWriter
+from app.service.sevenzip_writer import SevenZipWriter, SEVENZIP_PRESETS
+from conftest import read_entry
+
+
+def test_zip_round_trip(tmp_path, make_entries):
+    entries = make_entries()
+    archive_path = str(tmp_path / "out.zip")
+    with ParallelZipWriter(archive_path, workers=3) as writer:
+        writer.write_entries(entries)
+
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [entry["arcname"] for entry in entries]
+        for entry in entries:
+            assert archive.read(entry["arcname"]) == read_entry(entry)
+    assert set(writer.results) == {entry["arcname"] for entry in entries}
+
+
+@pytest.mark.parametrize("preset", sorted(SEVENZIP_PRESETS))
+def test_7z_round_trip(tmp_path, make_entries, preset):
+    entries = make_entries()
+    archive_path = str(tmp_path / "out.7z")
+    # Small solid blocks so the entries spread over several blocks
+    with SevenZipWriter(archive_path, preset, {"solid_block_mb": 0.05}, workers=2) as writer:
+        writer.write_entries(entries)
+
+    with py7zr.SevenZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+    extract_dir = tmp_path / "extracted"
+    with py7zr.SevenZipFile(archive_path) as archive:
+        archive.extractall(extract_dir)
+    for entry in entries:
+        assert (extract_dir / entry["arcname"]).read_bytes() == read_entry(entry)
+
+
+def test_7z_reports_compression_per_policy(tmp_path, make_entries):
+    entries = make_entries()
+    with SevenZipWriter(str(tmp_path / "out.7z"), "normal", workers=2) as writer:
+        writer.write_entries(entries)
+
+    report = writer.policy.report()
+    non_empty = [entry for entry in entries if read_entry(entry)]
+    assert sum(stats["files"] for stats in report.values()) == len(non_empty)
+    assert sum(stats["bytes_in"] for stats in report.values()) == sum(len(read_entry(entry)) for entry in non_empty)
+
+
+def test_7z_packs_repeated_stored_files_into_one_block(tmp_path):
+    entries = []
+    for index in range(3):
+        data = os.urandom(20000)
+        for module in ("01 Mod", "02 Mod"):
+            path = tmp_path / f"{module}_{index}.png"
+            path.write_bytes(data)
+            entries.append({"arcname": f"{module}/{index}.png", "source": str(path), "data": None,
+                            "size": len(data)})
+    ContentDedup().mark_duplicates(entries)
+    archive_path = str(tmp_path / "out.7z")
+    with SevenZipWriter(archive_path, "normal", workers=2) as writer:
+        writer.write_entries(entries)
+
+    # Every original and its copy share one LZMA2 block instead of a block per original
+    layout = writer.layout()
+    assert [block["method"] for block in layout] == ["lzma2"]
+    assert len(layout[0]["entries"]) == len(entries)
+    extract_dir = tmp_path / "extracted"
+    with py7zr.SevenZipFile(archive_path) as archive:
+        archive.extractall(extract_dir)
+    for entry in entries:
+        assert (extract_dir / entry["arcname"]).read_bytes() == read_entry(entry)
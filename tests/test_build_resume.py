@@ -0,0 +1,109 @@
+# coding:utf-8
+"""
+Build Resume Tests
+续建测试 - 取消或中断的ZIP写入留下日志，续建时从半成品压缩包拷贝已写入的条目
+"""
+import os
+import zipfile
+
+import pytest
+
+from app.service.build_journal import BuildJournal
+from app.service.build_progress import BuildProgress, BuildCancelled
+from app.service.entry_stream import source_stat
+from app.service.parallel_zip import ParallelZipWriter
+from conftest import read_entry
+
+
+class CancelAfter(BuildProgress):
+    """写完指定数量的条目后请求取消"""
+    def __init__(self, files: int):
+        super().__init__(lambda snapshot: None)
+        self.remaining = files
+
+    def file_done(self, current_file=None):
+        super().file_done(current_file)
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.cancel()
+
+
+def _interrupted_build(tmp_path, entries, files: int):
+    """写入files个条目后取消，返回日志与压缩包路径"""
+    cache_dir = str(tmp_path / "cache")
+    archive_path = str(tmp_path / "TestMod.zip")
+    journal = BuildJournal.create(cache_dir, "TestMod", str(tmp_path / "stage"), "zip")
+    journal.begin_archive(archive_path)
+    with pytest.raises(BuildCancelled):
+        with ParallelZipWriter(archive_path, workers=1, progress=CancelAfter(files), journal=journal) as writer:
+            writer.write_entries(entries)
+    journal.close()
+    return cache_dir, archive_path
+
+
+def test_resume_copies_journaled_entries(tmp_path, make_entries):
+    cache_dir, archive_path = _interrupted_build(tmp_path, make_entries(), 3)
+
+    journal = BuildJournal.load(cache_dir, "TestMod")
+    assert journal is not None and journal.archive_path == archive_path
+    assert len(journal.records) == 3
+
+    partial_path = f"{archive_path}.partial"
+    os.replace(archive_path, partial_path)
+    partial = journal.open_partial(partial_path)
+    entries = make_entries()
+    for entry in entries:
+        entry["reuse"] = journal.resume_candidate(entry)
+    journal.begin_archive(archive_path)
+    with ParallelZipWriter(archive_path, workers=2, resume_archive=partial, journal=journal) as writer:
+        writer.write_entries(entries)
+    journal.discard()
+
+    reused = {name for name, result in writer.results.items() if result["reused"]}
+    assert reused and reused <= {entry["arcname"] for entry in entries[:3]}
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        for entry in entries:
+            assert archive.read(entry["arcname"]) == read_entry(entry)
+    assert not os.path.exists(journal.journal_path)
+
+
+def test_changed_source_is_not_resumed(tmp_path, make_entries):
+    entries = make_entries()
+    cache_dir, _ = _interrupted_build(tmp_path, entries, 3)
+
+    journal = BuildJournal.load(cache_dir, "TestMod")
+    first = entries[0]
+    with open(first["source"], 'ab') as f:
+        f.write(b"more")
+    assert journal.resume_candidate(make_entries()[0]) is None
+    assert journal.resume_candidate(make_entries()[1]) is not None
+
+
+def test_edit_while_writing_is_not_resumed(tmp_path, make_entries):
+    entry = make_entries()[1]
+    journal = BuildJournal.create(str(tmp_path / "cache"), "TestMod", str(tmp_path / "stage"), "zip")
+    journal.begin_archive(str(tmp_path / "TestMod.zip"))
+    stat = source_stat(entry)
+    # Saved after the entry was read but before it was journaled
+    with open(entry["source"], 'wb') as f:
+        f.write(read_entry(entry).upper())
+    os.utime(entry["source"], ns=(stat[1], stat[1] + 2_000_000_000))
+    zinfo = zipfile.ZipInfo(entry["arcname"])
+    zinfo.CRC, zinfo.file_size, zinfo.header_offset = 0, stat[0], 0
+    journal.record(zinfo, entry["source"], "", stat)
+    journal.close()
+
+    assert BuildJournal.load(str(tmp_path / "cache"), "TestMod").resume_candidate(entry) is None
+
+
+def test_cancelled_archive_is_forgotten(tmp_path, make_entries):
+    cache_dir, _ = _interrupted_build(tmp_path, make_entries(), 3)
+
+    # BuildPipeline deletes a cancelled archive and keeps only the journal header
+    journal = BuildJournal.load(cache_dir, "TestMod")
+    journal.begin_archive("")
+    journal = BuildJournal.load(cache_dir, "TestMod")
+    assert journal.temp_dir == str(tmp_path / "stage")
+    assert not journal.records
+    assert all(journal.resume_candidate(entry) is None for entry in make_entries())
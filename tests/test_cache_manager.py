@@ -0,0 +1,112 @@
+# coding:utf-8
+"""
+Cache Manager Tests
+缓存管理测试 - 按时限与大小淘汰构建缓存，固定最新构建、可续建构建与正在使用的目录
+"""
+import os
+import json
+import time
+
+import pytest
+
+from app.service.cache_manager import CacheManager
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+def _age(path, days: float):
+    """把路径的修改时间设为days天前"""
+    stamp = time.time() - days * DAY
+    os.utime(path, (stamp, stamp))
+
+
+def _build_folder(cache_dir, name: str, days: float, size: int = 3000):
+    """创建一个构建缓存目录"""
+    folder = cache_dir / name
+    folder.mkdir(parents=True)
+    (folder / "file.bin").write_bytes(b"x" * size)
+    _age(folder, days)
+    return folder
+
+
+def _remaining(cache_dir):
+    return sorted(os.listdir(cache_dir))
+
+
+def test_scan_groups_folders_archives_and_images(cache_dir):
+    _build_folder(cache_dir, "ModA-20260101_000000", 40)
+    (cache_dir / "ModA-20260101_000000.zip.partial").write_bytes(b"p" * 500)
+    _build_folder(cache_dir, "ModA-20260102_0000", 30)
+    (cache_dir / "thumbnails").mkdir()
+    (cache_dir / "thumbnails" / "key.jpg").write_bytes(b"i" * 100)
+    (cache_dir / "manifests").mkdir()
+
+    items = {item.key: item for item in CacheManager(str(cache_dir)).scan()}
+    assert set(items) == {"ModA-20260101_000000", "ModA-20260102_0000", "thumbnails/key.jpg"}
+    assert items["ModA-20260101_000000"].size == 3500
+    # Folders named without seconds by older versions still sort by their stamp
+    assert items["ModA-20260102_0000"].pinned
+    assert not items["ModA-20260101_000000"].pinned
+
+
+def test_enforce_evicts_expired_items_but_keeps_pinned(cache_dir):
+    _build_folder(cache_dir, "ModA-20260101_000000", 40)
+    _build_folder(cache_dir, "ModA-20260102_000000", 35)
+    _build_folder(cache_dir, "ModB-20260101_000000", 50)
+    _build_folder(cache_dir, "ModC-20260101_000000", 60)
+    _build_folder(cache_dir, "ModC-20260102_000000", 60)
+    (cache_dir / "journals").mkdir()
+    header = {"version": 1, "temp_dir": str(cache_dir / "ModC-20260101_000000")}
+    (cache_dir / "journals" / "ModC.jsonl").write_text(json.dumps(header) + "\n", encoding='utf-8')
+
+    result = CacheManager(str(cache_dir), max_age_days=30).enforce()
+
+    assert result["removed"] == 1
+    # Newest build per MOD and the folder an interrupted build may resume stay
+    assert _remaining(cache_dir) == ["ModA-20260102_000000", "ModB-20260101_000000", "ModC-20260101_000000",
+                                     "ModC-20260102_000000", "journals"]
+
+
+def test_enforce_evicts_least_recently_used_until_under_size(cache_dir):
+    for day in range(1, 6):
+        _build_folder(cache_dir, f"ModA-2026010{day}_000000", 10 - day, size=4000)
+
+    manager = CacheManager(str(cache_dir))
+    manager.max_size = 9000
+    result = manager.enforce()
+
+    assert result["size"] <= 9000
+    assert _remaining(cache_dir) == ["ModA-20260104_000000", "ModA-20260105_000000"]
+
+
+def test_recently_used_and_in_use_items_are_kept(cache_dir):
+    _build_folder(cache_dir, "ModA-20260101_000000", 20)
+    _build_folder(cache_dir, "ModA-20260102_000000", 0)
+    in_use = _build_folder(cache_dir, "ModA-20260103_000000", 20)
+    _build_folder(cache_dir, "ModA-20260104_000000", 20)
+
+    result = CacheManager(str(cache_dir)).clear(in_use=[str(in_use)])
+
+    # The second folder was used a moment ago, so a parallel build may still read it
+    assert result["removed"] == 1
+    assert _remaining(cache_dir) == ["ModA-20260102_000000", "ModA-20260103_000000", "ModA-20260104_000000"]
+
+
+def test_clear_removes_every_unpinned_item(cache_dir):
+    _build_folder(cache_dir, "ModA-20260101_000000", 2)
+    _build_folder(cache_dir, "ModA-20260102_000000", 1)
+    (cache_dir / "images").mkdir()
+    image = cache_dir / "images" / "cover.webp"
+    image.write_bytes(b"i" * 10)
+    _age(image, 1)
+
+    result = CacheManager(str(cache_dir)).clear()
+
+    assert result["removed"] == 2
+    assert _remaining(cache_dir) == ["ModA-20260102_000000", "images"]
+    assert os.listdir(cache_dir / "images") == []
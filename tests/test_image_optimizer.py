@@ -0,0 +1,51 @@
+# coding:utf-8
+"""
+Image Optimizer Tests
+图片优化测试 - 无法解码的图片以原始扩展名打包，modinfo.ini中的图片名随之恢复
+"""
+import os
+
+from PIL import Image
+
+from app.service.build_plan import BuildPlanner, restore_image_names
+from app.service.image_optimizer import ImageOptimizer
+
+
+def _build_data(cover_path: str, screenshot_path: str) -> dict:
+    return {
+        "mod_info": {"name": "TestMod", "author": "me", "category": "Outfits", "version": "1.0"},
+        "cover_data": {"image_path": cover_path, "description": "cover"},
+        "sorted_blocks": [{"type": "mod_file", "module_name": "Mod", "image_path": screenshot_path, "files": []}]
+    }
+
+
+def _optimize(tmp_path, build_data):
+    """像构建流程一样规划并优化图片，返回条目表"""
+    optimizer = ImageOptimizer(str(tmp_path / "cache"), max_size=64, image_format="jpeg", workers=2)
+    plan = BuildPlanner("zip", optimizer).plan(build_data)
+    entries = {entry.arcname: entry.to_entry() for entry in plan.entries}
+    images = [entries[entry.arcname] for entry in plan.entries if entry.image]
+    renamed = optimizer.optimize(images)
+    return restore_image_names(entries, renamed), optimizer.report()
+
+
+def test_truncated_image_keeps_its_extension(tmp_path):
+    cover_path = str(tmp_path / "cover.png")
+    Image.new("RGB", (200, 100), (200, 40, 40)).save(cover_path)
+    screenshot_path = str(tmp_path / "shot.png")
+    Image.effect_noise((200, 200), 64).convert("RGB").save(screenshot_path)
+    with open(screenshot_path, 'r+b') as f:
+        f.truncate(os.path.getsize(screenshot_path) // 2)
+
+    entries, report = _optimize(tmp_path, _build_data(cover_path, screenshot_path))
+
+    assert report["failed"] == 1
+    # The readable cover is re-encoded, the truncated screenshot is shipped as it is
+    assert "00-cover/cover.jpg" in entries
+    assert "screenshot=cover.jpg" in entries["00-cover/modinfo.ini"]["data"].decode('utf-8')
+    assert "01-Mod/screenshot.jpg" not in entries
+    assert entries["01-Mod/screenshot.png"]["source"] == screenshot_path
+    modinfo = entries["01-Mod/modinfo.ini"]
+    assert f"screenshot=screenshot.png{os.linesep}" in modinfo["data"].decode('utf-8')
+    assert modinfo["size"] == len(modinfo["data"])
+    assert list(entries)[-2:] == ["01-Mod/screenshot.png", "01-Mod/modinfo.ini"]
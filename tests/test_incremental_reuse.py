@@ -0,0 +1,152 @@
+# coding:utf-8
+"""
+Incremental Reuse Tests
+增量复用测试 - 重新构建时未变化的ZIP条目与7z固实块从上一次的压缩包原样拷贝
+"""
+import os
+import zipfile
+
+import py7zr
+
+from app.service.build_manifest import BuildManifest
+from app.service.parallel_zip import ParallelZipWriter
+from app.service.sevenzip_writer import SevenZipWriter
+from conftest import read_entry
+
+
+def _mark_reuse(entries, manifest, build_types):
+    """按清单标记可复用的条目"""
+    previous = manifest.previous_archive(build_types)
+    for entry in entries:
+        entry["reuse"] = manifest.reuse_candidate(entry) if previous else None
+    return previous
+
+
+def _build_zip(tmp_path, entries, name):
+    """以上一次的清单为基础写入ZIP并刷新清单"""
+    manifest = BuildManifest.load(str(tmp_path / "cache"), "TestMod")
+    previous = _mark_reuse(entries, manifest, ("zip",))
+    archive_path = str(tmp_path / name)
+    with ParallelZipWriter(archive_path, workers=2, previous_archive=previous) as writer:
+        writer.write_entries(entries)
+    manifest.update(archive_path, "zip", entries, writer.results)
+    manifest.save()
+    return archive_path, writer.results
+
+
+def _build_7z(tmp_path, entries, name):
+    """以上一次的清单为基础写入7z并刷新清单"""
+    manifest = BuildManifest.load(str(tmp_path / "cache"), "TestMod")
+    previous = _mark_reuse(entries, manifest, ("7z",))
+    archive_path = str(tmp_path / name)
+    with SevenZipWriter(archive_path, "normal", {"solid_block_mb": 0.05}, workers=2,
+                        previous_archive=previous, previous_blocks=manifest.blocks) as writer:
+        writer.write_entries(entries)
+    manifest.update(archive_path, "7z", entries, writer.results, writer.layout())
+    manifest.save()
+    return archive_path, writer
+
+
+def _change(path, data):
+    """改写源文件并让修改时间明显变化"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def test_zip_reuses_unchanged_entries(tmp_path, make_entries):
+    _, results = _build_zip(tmp_path, make_entries(), "first.zip")
+    assert not any(result["reused"] for result in results.values())
+
+    entries = make_entries()
+    changed = next(entry for entry in entries if entry["arcname"] == "01 Mod/readme.txt")
+    _change(changed["source"], b"changed\n" * 100)
+    archive_path, results = _build_zip(tmp_path, entries, "second.zip")
+
+    reused = {name for name, result in results.items() if result["reused"]}
+    assert reused == {entry["arcname"] for entry in entries} - {changed["arcname"]}
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        for entry in entries:
+            assert archive.read(entry["arcname"]) == read_entry(entry)
+
+
+def test_zip_rehashes_touched_entries(tmp_path, make_entries):
+    _build_zip(tmp_path, make_entries(), "first.zip")
+
+    entries = make_entries()
+    touched = next(entry for entry in entries if entry["arcname"] == "01 Mod/data/table.ini")
+    same_size = next(entry for entry in entries if entry["arcname"] == "02 Mod/notes.txt")
+    _change(touched["source"], read_entry(touched))
+    _change(same_size["source"], read_entry(same_size).replace("名前".encode('utf-8'), "名称".encode('utf-8')))
+    _, results = _build_zip(tmp_path, entries, "second.zip")
+
+    assert results[touched["arcname"]]["reused"]
+    assert not results[same_size["arcname"]]["reused"]
+
+
+def test_edit_during_build_is_not_recorded_as_built(tmp_path, make_entries):
+    entries = make_entries()
+    edited = next(entry for entry in entries if entry["arcname"] == "01 Mod/readme.txt")
+    manifest = BuildManifest.load(str(tmp_path / "cache"), "TestMod")
+    archive_path = str(tmp_path / "first.zip")
+    with ParallelZipWriter(archive_path, workers=2) as writer:
+        writer.write_entries(entries)
+    # Saved after the entry was read but before the manifest is written
+    _change(edited["source"], read_entry(edited).upper())
+    manifest.update(archive_path, "zip", entries, writer.results)
+    manifest.save()
+
+    entries = make_entries()
+    archive_path, results = _build_zip(tmp_path, entries, "second.zip")
+
+    assert not results[edited["arcname"]]["reused"]
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.read(edited["arcname"]) == read_entry(edited)
+
+
+def test_in_memory_entries_are_compared_by_content(tmp_path, make_entries):
+    _build_zip(tmp_path, make_entries(), "first.zip")
+
+    entries = make_entries()
+    modinfo = next(entry for entry in entries if not entry["source"])
+    manifest = BuildManifest.load(str(tmp_path / "cache"), "TestMod")
+    assert manifest.reuse_candidate(modinfo) is not None
+    modinfo["data"] = modinfo["data"].replace(b"01 Mod", b"01 New")
+    assert manifest.reuse_candidate(modinfo) is None
+
+
+def test_7z_reuses_unchanged_solid_blocks(tmp_path, make_entries):
+    _, writer = _build_7z(tmp_path, make_entries(), "first.7z")
+    assert writer.report()["reuse"]["blocks"] == 0
+    block_count = len(writer.layout())
+
+    entries = make_entries()
+    changed = next(entry for entry in entries if entry["arcname"] == "01 Mod/data/blob.bin")
+    _change(changed["source"], os.urandom(1000))
+    archive_path, writer = _build_7z(tmp_path, entries, "second.7z")
+
+    reuse = writer.report()["reuse"]
+    assert 0 < reuse["blocks"] < block_count
+    assert not writer.results[changed["arcname"]]["reused"]
+    extract_dir = tmp_path / "extracted"
+    with py7zr.SevenZipFile(archive_path) as archive:
+        archive.extractall(extract_dir)
+    for entry in entries:
+        assert (extract_dir / entry["arcname"]).read_bytes() == read_entry(entry)
+
+
+def test_7z_does_not_reuse_blocks_under_other_settings(tmp_path, make_entries):
+    _build_7z(tmp_path, make_entries(), "first.7z")
+
+    entries = make_entries()
+    manifest = BuildManifest.load(str(tmp_path / "cache"), "TestMod")
+    previous = _mark_reuse(entries, manifest, ("7z",))
+    with SevenZipWriter(str(tmp_path / "second.7z"), "max", {"solid_block_mb": 0.05}, workers=2,
+                        previous_archive=previous, previous_blocks=manifest.blocks) as writer:
+        writer.write_entries(entries)
+
+    # Stored blocks carry no filter settings, every LZMA2 block is compressed anew
+    reused_methods = {writer.results[name]["method"] for name, result in writer.results.items() if result.get("reused")}
+    assert reused_methods <= {"copy"}
@@ -0,0 +1,112 @@
+# coding:utf-8
+"""
+Record Journal Tests
+构建记录日志测试 - 追加、编辑、删除的重放结果，以及压缩后记录与顺序不变
+"""
+import threading
+
+import pytest
+
+from app.service.record_journal import RecordJournal, COMPACT_MIN_GARBAGE
+
+
+def _record(name: str) -> dict:
+    return {"mod_info": {"name": name, "author": "me", "category": "Outfits"},
+            "build_info": {"build_time": "2026-01-01T00:00:00"}}
+
+
+def _names(records) -> list:
+    return [record["mod_info"]["name"] for record in records]
+
+
+def _line_count(path) -> int:
+    with open(path, 'rb') as f:
+        return f.read().count(b"\n")
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "records.jsonl")
+
+
+def test_replay_keeps_positions_of_edited_records(journal_path):
+    journal = RecordJournal(journal_path)
+    ids = [journal.append(_record(name)) for name in ("a", "b", "c")]
+    journal.load()
+    journal.update({**journal.get(ids[1]), "mod_info": _record("edited")["mod_info"]})
+    journal.delete(ids[0])
+
+    assert _names(RecordJournal(journal_path).load()) == ["edited", "c"]
+    assert journal.garbage == 3       # Old put of "b", put and tombstone of "a"
+
+
+def test_torn_last_line_is_ignored(journal_path):
+    journal = RecordJournal(journal_path)
+    journal.append(_record("a"))
+    with open(journal_path, 'ab') as f:
+        f.write(b'{"op": "put", "id": "torn", "rec')
+
+    assert _names(RecordJournal(journal_path).load()) == ["a"]
+
+
+def test_compaction_drops_dead_lines(journal_path):
+    journal = RecordJournal(journal_path)
+    for name in ("a", "b", "c"):
+        journal.append(_record(name))
+    journal.load()
+    last = journal.records()[-1]
+    for index in range(COMPACT_MIN_GARBAGE + 10):
+        journal.update({**last, "mod_info": _record(f"c{index}")["mod_info"]})
+    # The updates may have started a compaction that carried later puts over; wait for it, then compact again
+    journal.compact(wait=True)
+    journal.compact(wait=True)
+
+    assert _line_count(journal_path) == 1 + 3       # Header and one put per live record
+    assert journal.garbage == 0
+    assert _names(RecordJournal(journal_path).load()) == ["a", "b", f"c{COMPACT_MIN_GARBAGE + 9}"]
+    # Memory matched the file before the swap, so nothing has to be reloaded
+    assert journal.poll() == []
+
+
+def test_compaction_keeps_concurrent_appends(journal_path):
+    journal = RecordJournal(journal_path)
+    journal.append(_record("first"))
+    journal.load()
+    record = journal.records()[0]
+    for index in range(200):
+        journal.update({**record, "mod_info": _record(f"edit{index}")["mod_info"]})
+
+    stop = threading.Event()
+    appended = []
+
+    def append():
+        while not stop.is_set():
+            appended.append(f"bg{len(appended)}")
+            RecordJournal(journal_path).append(_record(appended[-1]))
+
+    thread = threading.Thread(target=append)
+    thread.start()
+    try:
+        journal.compact(wait=True)
+    finally:
+        stop.set()
+        thread.join()
+
+    names = _names(RecordJournal(journal_path).load())
+    assert names == ["edit199"] + appended
+
+
+def test_other_instance_sees_compacted_file(journal_path):
+    writer = RecordJournal(journal_path)
+    reader = RecordJournal(journal_path)
+    writer.append(_record("a"))
+    writer.load()
+    reader.load()
+    record = writer.records()[0]
+    for index in range(COMPACT_MIN_GARBAGE + 1):
+        writer.update({**record, "mod_info": _record(f"a{index}")["mod_info"]})
+    writer.compact(wait=True)
+
+    # The file was swapped, so the reader must load it again rather than apply a tail
+    assert reader.poll() is None
+    assert _names(reader.load()) == [f"a{COMPACT_MIN_GARBAGE}"]
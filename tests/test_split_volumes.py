@@ -0,0 +1,94 @@
+# coding:utf-8
+"""
+Split Volume Tests
+分卷测试 - 边写边切分的分卷按顺序拼接后即为完整的压缩包
+"""
+import io
+import os
+import zipfile
+
+import py7zr
+
+from app.service.parallel_zip import ParallelZipWriter
+from app.service.sevenzip_writer import SevenZipWriter
+from app.service.split_volumes import VolumeWriter, VolumeReader, list_volumes, open_archive, remove_archive
+from conftest import read_entry
+
+VOLUME_SIZE = 64 * 1024
+
+
+def _joined(archive_path: str) -> bytes:
+    """按顺序拼接全部分卷"""
+    return b"".join(open(path, 'rb').read() for path in list_volumes(archive_path))
+
+
+def test_volume_writer_seeks_back_across_volumes(tmp_path):
+    archive_path = str(tmp_path / "a.bin")
+    writer = VolumeWriter(archive_path, 10)
+    writer.write(b"x" * 25)
+    writer.seek(3)
+    writer.write(b"ABCDEFGHIJ")
+    writer.seek(0, io.SEEK_END)
+    writer.write(b"yz")
+    writer.close()
+
+    assert [os.path.getsize(path) for path in list_volumes(archive_path)] == [10, 10, 7]
+    assert _joined(archive_path) == b"xxxABCDEFGHIJ" + b"x" * 12 + b"yz"
+    reader = io.BufferedReader(VolumeReader(list_volumes(archive_path)))
+    reader.seek(8)
+    assert reader.read(6) == b"FGHIJx"
+
+
+def test_live_reader_follows_growing_volumes(tmp_path):
+    writer = VolumeWriter(str(tmp_path / "a.bin"), 10)
+    writer.write(b"0123456789ab")
+    writer.flush()
+    reader = io.BufferedReader(VolumeReader(writer.paths, writer.volume_size), 4)
+    reader.seek(8)
+    assert reader.read() == b"89ab"
+
+    writer.write(b"cdefghijklmnop")
+    writer.flush()
+    reader.seek(11)
+    assert reader.read() == b"bcdefghijklmnop"
+    assert reader.seek(0, io.SEEK_END) == 26
+    reader.close()
+    writer.close()
+
+
+def test_split_zip_reassembles(tmp_path, make_entries):
+    entries = make_entries()
+    # A copy of a large entry makes the writer read back across volume boundaries
+    blob = next(entry for entry in entries if entry["arcname"] == "01 Mod/data/blob.bin")
+    entries.append({"arcname": "02 Mod/blob copy.bin", "source": blob["source"], "data": None,
+                    "duplicate_of": blob["arcname"], "content": ""})
+    archive_path = str(tmp_path / "out.zip")
+    with ParallelZipWriter(archive_path, workers=2, volume_size=VOLUME_SIZE) as writer:
+        writer.write_entries(entries)
+
+    assert len(writer.volume_paths) > 1
+    assert all(os.path.getsize(path) == VOLUME_SIZE for path in writer.volume_paths[:-1])
+    with zipfile.ZipFile(io.BytesIO(_joined(archive_path))) as archive:
+        assert archive.testzip() is None
+        for entry in entries:
+            assert archive.read(entry["arcname"]) == read_entry(entry)
+    with open_archive(writer.volume_paths[0]) as f, zipfile.ZipFile(f) as archive:
+        assert archive.testzip() is None
+    assert writer.dedup["files"] == 1
+
+
+def test_split_7z_reassembles(tmp_path, make_entries):
+    entries = make_entries()
+    archive_path = str(tmp_path / "out.7z")
+    with SevenZipWriter(archive_path, "store", workers=2, volume_size=VOLUME_SIZE) as writer:
+        writer.write_entries(entries)
+
+    assert len(writer.volume_paths) > 1
+    extract_dir = tmp_path / "extracted"
+    with py7zr.SevenZipFile(io.BytesIO(_joined(archive_path))) as archive:
+        archive.extractall(extract_dir)
+    for entry in entries:
+        assert (extract_dir / entry["arcname"]).read_bytes() == read_entry(entry)
+
+    remove_archive(archive_path)
+    assert list_volumes(archive_path) == []